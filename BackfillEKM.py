@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+""" BackfillEKM.py
+
+Rebuild the meterdata table from the raw A frames.
+
+ReadEKM computes the meterdata columns live (makeMeterDataMsg) from the
+values of the previous cycle, so a gap, a restart or a formula change
+leaves rows missing or wrong for good.  This tool streams a time range of
+the raw A table, decodes the fields it needs for a whole batch of frames at
+once with ekmbulk, computes the same columns with vectorized differences
+over the stored ComputerTime of consecutive frames, and upserts meterdata
+in large batches, one commit per batch.  Existing meterdata rows in the
+rebuilt time range are replaced.
+
+    python BackfillEKM.py [-b START] [-e END] [-B BATCH] [-W]
+
+Database, meter_id, meter_table_a_suffix and meter_table come from the
+secrets.ini sections used by ReadEKM (host, ReadEKM.py and
+ReadEKM.py/host), which a BackfillEKM.py section may override.
+"""
+import argparse
+import configparser
+import datetime
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+import pymysql
+import pymysql.cursors
+
+from ekmbulk import ascii_to_int, decode_frames, frames_from_rows, read_block, verify_frames
+from ekmmeters import Field
+
+RequiredConfigParams = frozenset((
+    'inserter_host'
+  , 'inserter_schema'
+  , 'inserter_port'
+  , 'inserter_user'
+  , 'inserter_password'
+  , 'meter_id'
+  , 'meter_table_a_suffix'
+  , 'meter_table'
+))
+
+ProgName, ext = os.path.splitext(os.path.basename(sys.argv[0]))
+ProgPath = os.path.dirname(os.path.realpath(sys.argv[0]))
+
+logger = logging.getLogger(__name__)
+
+GallonsPerCuFt = 7.4805194703778
+
+MeterDataColumns = ('RecordId', 'Time', 'MeterTime', 'CuFtWater', 'GPM', 'HouseEnergyKWH', 'HousePowerW',
+                    'AvgPowerW', 'WaterSysKwh', 'AvgWaterPowerW', 'WaterEnable')
+
+
+def GetConfig():
+    ''' Merge the INI sections ReadEKM reads, then our own, into one dict. '''
+    config = configparser.ConfigParser(interpolation=configparser.ExtendedInterpolation())
+    fp = os.path.join(ProgPath, 'secrets.ini')
+    if not os.path.isfile(fp):
+        fp = os.environ['PrivateConfig']
+        if not os.path.isfile(fp):
+            raise UserWarning('No configuration file found.')
+    logger.info('Using configuration file at: %s', fp)
+    config.read(fp)
+    host = os.environ.get('HOST', '')
+    cfgDict = {}
+    for cfgSection in (host, 'ReadEKM.py', 'ReadEKM.py/' + host, ProgName + '.py', ProgName + '.py/' + host):
+        if cfgSection in config:
+            logger.info('Reading INI file section: %s', cfgSection)
+            cfgDict.update(config[cfgSection])
+    missing = RequiredConfigParams - set(cfgDict.keys())
+    if missing:
+        raise UserWarning('Config file is missing params: %s' % sorted(missing))
+    return cfgDict
+
+
+def meterTimes(frames, def_buf):
+    ''' Meter_Time of every frame as 'YYYY-MM-DD HH:MM:SS' strings, like getDatetimeFromEKM.
+        Returns (strings, ok mask); the EKM string is yymmddwwHHMMSS.
+    '''
+    layout = def_buf.layout()
+    offset, size = layout.m_offsets[Field.Meter_Time]
+    digits = frames[:, offset:offset + size]
+    parts = []
+    ok = np.ones(frames.shape[0], dtype=bool)
+    for start in (0, 2, 4, 8, 10, 12):
+        values, partOk = ascii_to_int(digits[:, start:start + 2])
+        parts.append(values)
+        ok &= partOk
+    year, month, day, hour, minute, second = parts
+    ok &= (month >= 1) & (month <= 12) & (day >= 1) & (day <= 31) & (hour < 24) & (minute < 60) & (second < 60)
+    month = np.where(ok, month, 1)
+    day = np.where(ok, day, 1)
+    stamps = ((year + 30).astype('datetime64[Y]').astype('datetime64[M]') + (month - 1).astype('timedelta64[M]')).astype('datetime64[D]')
+    stamps = stamps + (day - 1).astype('timedelta64[D]')
+    stamps = stamps.astype('datetime64[s]') + (hour * 3600 + minute * 60 + second).astype('timedelta64[s]')
+    strings = np.char.replace(np.datetime_as_string(stamps, unit='s'), 'T', ' ')
+    return strings, ok
+
+
+def deriveMeterData(epoch, columns):
+    ''' The makeMeterDataMsg columns for consecutive frames, as arrays.
+
+        Differences are taken between each frame and the one before it, over
+        the real time between them; the first frame is treated like the first
+        live cycle (no change over 60 seconds).  Intervals that are not
+        positive give None (NaN) for the rate columns.
+    '''
+    cuFtWater = columns[Field.Pulse_Cnt_3] * 0.1
+    waterWh = (columns[Field.Pulse_Cnt_1] + columns[Field.Pulse_Cnt_2]).astype(np.float64)
+    #  ekmbulk scales kWh by each frame's kWh_Scale, as the old meterdata trigger and
+    #  makeMeterDataMsg (getFieldANative) do.
+    houseKWH = columns[Field.kWh_Tot]
+    interval = np.diff(epoch, prepend=epoch[0] - 60.0)
+    interval[interval <= 0] = np.nan
+    hours = interval / 3600.0
+    derived = {}
+    derived['CuFtWater'] = np.round(cuFtWater, 2)
+    derived['GPM'] = np.round(np.diff(cuFtWater, prepend=cuFtWater[0]) / interval * 60 * GallonsPerCuFt, 3)
+    derived['HouseEnergyKWH'] = np.round(houseKWH, 3)
+    derived['HousePowerW'] = np.round(columns[Field.RMS_Watts_Tot].astype(np.float64), 0)
+    derived['AvgPowerW'] = np.round(np.diff(houseKWH, prepend=houseKWH[0]) / hours * 1000, 1)
+    derived['WaterSysKwh'] = np.round(waterWh / 1000, 3)
+    derived['AvgWaterPowerW'] = np.round(np.diff(waterWh, prepend=waterWh[0]) / hours, 1)
+    #  Relay 2 (the "1" bit of State_Out - 1) ON means the water valve is OFF.
+    derived['WaterEnable'] = (1 - ((columns[Field.State_Out] - 1) & 1)).astype(np.float64)
+    return derived
+
+
+def sqlValues(values):
+    ''' Python values for a column array, NaN as None. '''
+    if values.dtype.kind == 'f':
+        values = values.astype(object)
+        values[values != values] = None
+    return values.tolist()
+
+
+class MeterDataBackfill(object):
+    ''' Streams raw A frames and upserts the derived meterdata rows.
+
+        The last valid frame of each batch is carried into the next one, so
+        differences run across batch boundaries exactly as within a batch.
+    '''
+    def __init__(self, readConn, writeConn, schema, rawTable, meterTable, dontWrite=False):
+        self.m_read_conn = readConn
+        self.m_write_conn = writeConn
+        self.m_schema = schema
+        self.m_raw_table = rawTable
+        self.m_meter_table = meterTable
+        self.m_dont_write = dontWrite
+        self.m_def_buf = read_block('V4A')
+        self.m_carry = None
+        self.m_replace_from = None
+        self.m_rows_read = 0
+        self.m_rows_written = 0
+        self.m_rows_bad = 0
+        updates = ', '.join('`{col}` = VALUES(`{col}`)'.format(col=col) for col in MeterDataColumns if col != 'Time')
+        self.m_upsert = 'INSERT INTO `{schema}`.`{table}` ({cols}) VALUES ({params}) ON DUPLICATE KEY UPDATE {updates}'.format(
+            schema=schema, table=meterTable, cols=', '.join('`%s`' % col for col in MeterDataColumns),
+            params=', '.join(['%s'] * len(MeterDataColumns)), updates=updates)
+        self.m_delete = 'DELETE FROM `{schema}`.`{table}` WHERE {{where}}'.format(schema=schema, table=meterTable)
+        pass
+
+    def selectQuery(self, where):
+        return ('SELECT idRawMeterData, UNIX_TIMESTAMP(ComputerTime), ComputerTime, MeterData'
+                ' FROM `{schema}`.`{table}` WHERE {where}').format(schema=self.m_schema, table=self.m_raw_table, where=where)
+
+    def loadCarry(self, begin):
+        ''' Frame just before the range, so the first row gets real differences. '''
+        if begin is None:
+            return
+        with self.m_write_conn.cursor() as cursor:
+            cursor.execute(self.selectQuery('ComputerTime < %s ORDER BY ComputerTime DESC LIMIT 5'), (begin,))
+            rows = cursor.fetchall()
+        for row in rows:
+            batch = self.decodeBatch([row])
+            if batch is not None:
+                ids, epoch, times, columns = batch
+                self.m_carry = (epoch, columns)
+                return
+
+    def decodeBatch(self, rows):
+        ''' (ids, epoch, times, columns) of the valid frames in rows, or None. '''
+        frames = frames_from_rows(row[3] for row in rows)
+        valid = verify_frames(frames)
+        columns, ok = decode_frames(frames, self.m_def_buf)
+        stamps, timeOk = meterTimes(frames, self.m_def_buf)
+        keep = valid & ok & timeOk
+        if not keep.any():
+            return None
+        ids = np.array([row[0] for row in rows], dtype=np.int64)[keep]
+        epoch = np.array([float(row[1]) for row in rows], dtype=np.float64)[keep]
+        times = np.array([row[2] for row in rows], dtype=object)[keep]
+        columns = dict((fld, values[keep]) for fld, values in columns.items())
+        columns[Field.Meter_Time] = stamps[keep]
+        return ids, epoch, times, columns
+
+    def processBatch(self, rows):
+        self.m_rows_read += len(rows)
+        batch = self.decodeBatch(rows)
+        if batch is None:
+            self.m_rows_bad += len(rows)
+            return
+        ids, epoch, times, columns = batch
+        self.m_rows_bad += len(rows) - len(ids)
+        skip = 0
+        if self.m_carry is not None:
+            cEpoch, cColumns = self.m_carry
+            epoch = np.concatenate((cEpoch, epoch))
+            columns = dict((fld, np.concatenate((cColumns[fld], values))) for fld, values in columns.items())
+            skip = 1
+        self.m_carry = (epoch[-1:], dict((fld, values[-1:]) for fld, values in columns.items()))
+        derived = deriveMeterData(epoch, columns)
+        out = [ids.tolist(), times.tolist(), columns[Field.Meter_Time][skip:].tolist()]
+        out.extend(sqlValues(derived[col][skip:]) for col in MeterDataColumns[3:])
+        values = list(zip(*out))
+        #  Live rows are keyed by the time ReadEKM computed them, a little after the raw
+        #  ComputerTime, so replace whole Time ranges reaching halfway to the next read.
+        replaceTo = rows[-1][2] + datetime.timedelta(seconds=30)
+        if self.m_dont_write:
+            logger.debug('NOT upserting %d rows into %s.' % (len(values), self.m_meter_table))
+        else:
+            with self.m_write_conn.cursor() as cursor:
+                if self.m_replace_from is None:
+                    cursor.execute(self.m_delete.format(where='`Time` < %s'), (replaceTo,))
+                else:
+                    cursor.execute(self.m_delete.format(where='`Time` >= %s AND `Time` < %s'), (self.m_replace_from, replaceTo))
+                cursor.executemany(self.m_upsert, values)
+            self.m_write_conn.commit()
+        self.m_replace_from = replaceTo
+        self.m_rows_written += len(values)
+
+    def run(self, begin=None, end=None, batchSize=50000):
+        ''' Backfill [begin, end) of ComputerTime; None leaves that side open. '''
+        conditions, params = [], []
+        if begin is not None:
+            conditions.append('ComputerTime >= %s')
+            params.append(begin)
+        if end is not None:
+            conditions.append('ComputerTime < %s')
+            params.append(end)
+        where = (' AND '.join(conditions) or '1') + ' ORDER BY ComputerTime'
+        self.loadCarry(begin)
+        self.m_replace_from = begin
+        start = time.time()
+        with self.m_read_conn.cursor(pymysql.cursors.SSCursor) as cursor:
+            cursor.execute(self.selectQuery(where), params)
+            while True:
+                rows = cursor.fetchmany(batchSize)
+                if not rows:
+                    break
+                self.processBatch(rows)
+                elapsed = time.time() - start
+                logger.info('%d frames read, %d rows upserted, %d bad frames, %.0f rows/s' % (self.m_rows_read,
+                    self.m_rows_written, self.m_rows_bad, self.m_rows_read / elapsed if elapsed > 0 else 0))
+        return self.m_rows_written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recompute the meterdata table from raw A frames.')
+    parser.add_argument("-b", "--begin", dest="begin", action="store", help="First ComputerTime to rebuild, e.g. '2025-01-01'; default the start.")
+    parser.add_argument("-e", "--end", dest="end", action="store", help="ComputerTime to stop before; default the end.")
+    parser.add_argument("-B", "--batch", dest="batchSize", action="store", default='50000', help="Frames decoded and upserted per batch.")
+    parser.add_argument("-m", "--meterId", dest="meterId", action="store", help="Numeric Id of the EKM meter whose data to rebuild.")
+    parser.add_argument("-W", "--dontWriteToDB", dest="noWriteDb", action="store_true", default=False, help="Compute everything but don't write to database.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    cfg = GetConfig()
+    meterId = '%012d' % int(args.meterId if args.meterId is not None else cfg['meter_id'])
+    rawTable = meterId + cfg['meter_table_a_suffix']
+    connArgs = dict(host=cfg['inserter_host'], port=int(cfg['inserter_port']), user=cfg['inserter_user'],
+                    password=cfg['inserter_password'], database=cfg['inserter_schema'], binary_prefix=True, charset='utf8mb4')
+    readConn = pymysql.connect(**connArgs)
+    writeConn = pymysql.connect(**connArgs)
+    try:
+        backfill = MeterDataBackfill(readConn, writeConn, cfg['inserter_schema'], rawTable, cfg['meter_table'], args.noWriteDb)
+        start = time.time()
+        rows = backfill.run(args.begin, args.end, int(args.batchSize))
+        logger.info('Rebuilt %d %s rows from %s in %.1f s.' % (rows, cfg['meter_table'], rawTable, time.time() - start))
+    finally:
+        readConn.close()
+        writeConn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -27,7 +27,7 @@ import threading
 import socketserver
 import Messages     # My message definitions -- has messages as bytearrays.
 
-from ekmmeters import calc_crc16
+from ekmmeters import calc_crc16, Field, frame_schemas
 
 # GLOBAL DEFINITIONS
 DBConn = None
@@ -36,6 +36,7 @@ myMeterId = '000000000000'
 meterAtable = 'NotARealTableIHope'
 meterBtable = 'NotARealTableIHope'
 anyMeterOk = True
+wireBaud = 0        # > 0 => hold each response for its time on a 7E1 line at this baud rate
 
 # Configuration parameters without which we can do nothing.
 RequiredConfigParams = frozenset((
@@ -142,44 +143,36 @@ def GenerateV4BData(MeterId = bytearray(b'\x30\x30\x30\x30\x30\x30\x30\x30\x30\x
         Messages.ResponseMsg[Messages.CrcField] = a2b_hex(calc_crc16(Messages.ResponseMsg[Messages.CrcCalc]))
         return Messages.ResponseMsg
 
+def randomDigits(count=255):
+    #  Background for fake frames: random ASCII digits.
+    return bytes(random.choices(b'0123456789', k=count))
+
 def GenerateFakeV4AData(MeterId):
-    Messages.ResponseMsg = bytearray(255)
-    #  Fill the message with random digits
-    for i in range(len(Messages.ResponseMsg)):
-        Messages.ResponseMsg[i] = random.randint(0x30,0x39)
-    # Put in known fields
-    Messages.ResponseMsg[Messages.ResponseV4_STX] = Messages.STX
-    Messages.ResponseMsg[Messages.ResponseV4_model] = Messages.ResponseV4model
-    Messages.ResponseMsg[Messages.ResponseV3_FWver] = Messages.ResponseV4FWver
-    Messages.ResponseMsg[Messages.ResponseV4_meterNo] = MeterId
-    Messages.ResponseMsg[Messages.ResponseV4_postamble] = Messages.ResponseV4postamble
-    Messages.ResponseMsg[Messages.ResponseV4_time] = makeEkmDateTime()
-    Messages.ResponseMsg[Messages.ResponseV4_respKind] =Messages.RequestMsgV4ReqTypeB
-    Messages.ResponseMsg[Messages.ResponseV4AData_kwhDecimals] = b'\x32'
-    Messages.ResponseMsg[Messages.CrcField] = a2b_hex(calc_crc16(Messages.ResponseMsg[Messages.CrcCalc]))
-    return Messages.ResponseMsg
+    #  Frame layout, STX, postamble and CRC come from the ekmmeters schema.
+    return frame_schemas["V4A"].buildFrame({
+        Field.Model: Messages.ResponseV4model,
+        Field.Firmware: Messages.ResponseV4FWver,
+        Field.Meter_Address: bytes(MeterId),
+        Field.Meter_Time: makeEkmDateTime(),
+        Field.kWh_Scale: b'\x32',
+        "reserved_3": Messages.RequestMsgV4ReqTypeA}, randomDigits())
 
 def GenerateFakeV4BData(MeterId):
-    Messages.ResponseMsg = GenerateV4AData(MeterId)
-    Messages.ResponseMsg[Messages.ResponseV4_respKind] = Messages.RequestMsgV4ReqTypeB
-    Messages.ResponseMsg[Messages.CrcField] = a2b_hex(calc_crc16(Messages.ResponseMsg[Messages.CrcCalc]))
-    return Messages.ResponseMsg
+    return frame_schemas["V4B"].buildFrame({
+        Field.Model: Messages.ResponseV4model,
+        Field.Firmware: Messages.ResponseV4FWver,
+        Field.Meter_Address: bytes(MeterId),
+        Field.Meter_Time: makeEkmDateTime(),
+        "reserved_8": Messages.RequestMsgV4ReqTypeB}, randomDigits())
 
 def GenerateV3Data(MeterId=bytearray(b'\x30\x30\x30\x30\x30\x30\x30\x30\x30\x30\x30\x30')):
-    Messages.ResponseMsg = bytearray(255)
-    #  Fill the message with random digits
-    for i in range(len(Messages.ResponseMsg)):
-        Messages.ResponseMsg[i] = random.randint(0x30,0x39)
-    # Put in known fields
-    Messages.ResponseMsg[Messages.ResponseV3_STX] = Messages.STX
-    Messages.ResponseMsg[Messages.ResponseV3_model] = Messages.ResponseV3model
-    Messages.ResponseMsg[Messages.ResponseV3_FWver] = Messages.ResponseV3FWver
-    Messages.ResponseMsg[Messages.ResponseV3_meterNo] = MeterId
-    Messages.ResponseMsg[Messages.ResponseV3_time] = makeEkmDateTime()
-    Messages.ResponseMsg[Messages.ResponseV3_reserved] = bytearray(len(Messages.ResponseMsg[Messages.ResponseV3_reserved]))
-    Messages.ResponseMsg[Messages.ResponseV3_postamble] = Messages.ResponseV3postamble
-    Messages.ResponseMsg[Messages.CrcField] = a2b_hex(calc_crc16(Messages.ResponseMsg[Messages.CrcCalc]))
-    return Messages.ResponseMsg
+    return frame_schemas["V3"].buildFrame({
+        Field.Model: Messages.ResponseV3model,
+        Field.Firmware: Messages.ResponseV3FWver,
+        Field.Meter_Address: bytes(MeterId),
+        Field.Meter_Time: makeEkmDateTime(),
+        "reserved_11": bytes(19),
+        Field.Status_A: bytes(1)}, randomDigits())
 
 def GenerateRandomDataTable(tableId=b'\x30\x30\x30\x30'):
     Messages.ResponseMsg = bytearray(255)
@@ -267,6 +260,8 @@ class ThreadedTCPRequestHandler(socketserver.BaseRequestHandler):
                 logger.warning('Got unrecognized message.')
                 pass
             logger.debug('Sending response: %s'%response)
+            if wireBaud > 0:
+                time.sleep(len(response) * 10.0 / wireBaud)
             self.request.sendall(response)
 
 class ThreadedTCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
@@ -276,7 +271,7 @@ class ThreadedTCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
 
 # MAIN
 def main():
-    global DBConn, minutesOffset, myMeterId, meterAtable, meterBtable, anyMeterOk
+    global DBConn, minutesOffset, myMeterId, meterAtable, meterBtable, anyMeterOk, wireBaud
     # Determine the complete file paths for the config file and the graph definitions file.
     config = configparser.ConfigParser(
         interpolation=configparser.ExtendedInterpolation())
@@ -315,10 +310,13 @@ def main():
         help="Time offset from NOW to retrieve send data to client.  Negative values access database, positive values send random digits.")
     parser.add_argument("-a", "--anyMeter", dest="anyMeter", action="store_true",
                         default=None, help="Accept any meter Id.")
+    parser.add_argument("-b", "--baud", dest="baud", action="store", default='0',
+                        help="Delay responses by their time on a serial line at this baud rate; 0 => send at once.")
     parser.add_argument("-v", "--verbosity", dest="verbosity",
                         action="count", help="increase output verbosity", default=0)
     args = parser.parse_args()
     Verbosity = args.verbosity
+    wireBaud = int(args.baud)
     startTime = None
     minutesOffset = None
     if (args.hourOffset is None) and (args.startTime is None):
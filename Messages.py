@@ -60,149 +60,158 @@ RequestMsgV4Def_meterId = slice(2,14)
 RequestMsgV4Def_reqType = slice(14,16)     # '\x30', '\x30' for Request A  OR  '\x30', '\x31' for Request B
 RequestMsgV4Def_fixedEnd = slice(16,19)
 
+#  Read response offsets are compiled from the frame schemas in ekmmeters.py,
+#  which also define the meter decoder, so the two can not drift apart.
+#  SQL offset of a field is its slice start + 1.
+from ekmmeters import Field, frame_schemas
+
+_V3 = frame_schemas["V3"].m_slices
+_V4A = frame_schemas["V4A"].m_slices
+_V4B = frame_schemas["V4B"].m_slices
+
 #  Response fields common to V3 and V4
-ResponseData_fixed02 = slice(0,1)                 # SQL offset   1
-ResponseData_model = slice(1,3)                   # SQL offset   2
-ResponseData_firmwareVer = slice(3,4)             # SQL offset   4
-ResponseData_meterId = slice(4,16)                # SQL offset   5
-
-ResponseV3Data_fixed02 = slice(0,1)                 # SQL offset   1
-ResponseV3Data_model = slice(1,3)                   # SQL offset   2
-ResponseV3Data_firmwareVer = slice(3,4)             # SQL offset   4
-ResponseV3Data_meterId = slice(4,16)                # SQL offset   5
-ResponseV3Data_totalKwh = slice(16,24)                # SQL offset  17
-ResponseV3Data_time1Kwh = slice(24,32)                # SQL offset  25
-ResponseV3Data_time2Kwh = slice(32,40)                # SQL offset  33
-ResponseV3Data_time3Kwh = slice(40,48)                # SQL offset  41
-ResponseV3Data_time4Kwh = slice(48,56)                # SQL offset  49
-ResponseV3Data_totalRevKwh = slice(56,64)             # SQL offset  57
-ResponseV3Data_time1RevKwh = slice(64,72)             # SQL offset  65
-ResponseV3Data_time2RevKwh = slice(72,80)             # SQL offset  73
-ResponseV3Data_time3RevKwh = slice(80,88)             # SQL offset  81
-ResponseV3Data_time4RevKwh = slice(88,96)             # SQL offset  89
-ResponseV3Data_volts1 = slice(96,100)                  # SQL offset  97
-ResponseV3Data_volts2 = slice(100,104)                  # SQL offset 101
-ResponseV3Data_volts3 = slice(104,108)                  # SQL offset 105
-ResponseV3Data_amps1 = slice(108,113)                   # SQL offset 109
-ResponseV3Data_amps2 = slice(113,118)                   # SQL offset 114
-ResponseV3Data_amps3 = slice(118,123)                   # SQL offset 119
-ResponseV3Data_watts1 = slice(123,130)                  # SQL offset 124
-ResponseV3Data_watts2 = slice(130,137)                  # SQL offset 131
-ResponseV3Data_watts3 = slice(137,144)                  # SQL offset 138
-ResponseV3Data_wattsTotal = slice(144,151)              # SQL offset 145
-ResponseV3Data_cos1 = slice(151,155)                    # SQL offset 152
-ResponseV3Data_cos2 = slice(155,159)                    # SQL offset 156
-ResponseV3Data_cos3 = slice(159,163)                    # SQL offset 160
-ResponseV3Data_maxDemand = slice(163,171)               # SQL offset 164
-ResponseV3Data_demandPeriod = slice(171,172)            # SQL offset 172
-ResponseV3Data_meterDateTime = slice(172,186)             # SQL offset 173
-ResponseV3Data_currentTransformer = slice(186,190)      # SQL offset 187
-ResponseV3Data_pulseCount1 = slice(190,198)             # SQL offset 191
-ResponseV3Data_pulseCount2 = slice(198,206)             # SQL offset 199
-ResponseV3Data_pulseCount3 = slice(206,214)             # SQL offset 207
-ResponseV3Data_pulseRatio1 = slice(214,218)             # SQL offset 215
-ResponseV3Data_pulseRatio2 = slice(218,222)             # SQL offset 219
-ResponseV3Data_pulseRatio3 = slice(222,226)             # SQL offset 223
-ResponseV3Data_PulseState = slice(226,229)              # SQL offset 227
-ResponseV3Data_reserved = slice(229,249)               # SQL offset 230
-ResponseV3Data_fixedEnd = slice(249,253)                # SQL offset 250
-ResponseV3Data_crc = slice(253,255)                     # SQL offset 254
+ResponseData_fixed02 = _V4A["reserved_1"]
+ResponseData_model = _V4A[Field.Model]
+ResponseData_firmwareVer = _V4A[Field.Firmware]
+ResponseData_meterId = _V4A[Field.Meter_Address]
+
+ResponseV3Data_fixed02 = _V3["reserved_10"]
+ResponseV3Data_model = _V3[Field.Model]
+ResponseV3Data_firmwareVer = _V3[Field.Firmware]
+ResponseV3Data_meterId = _V3[Field.Meter_Address]
+ResponseV3Data_totalKwh = _V3[Field.kWh_Tot]
+ResponseV3Data_time1Kwh = _V3[Field.kWh_Tariff_1]
+ResponseV3Data_time2Kwh = _V3[Field.kWh_Tariff_2]
+ResponseV3Data_time3Kwh = _V3[Field.kWh_Tariff_3]
+ResponseV3Data_time4Kwh = _V3[Field.kWh_Tariff_4]
+ResponseV3Data_totalRevKwh = _V3[Field.Rev_kWh_Tot]
+ResponseV3Data_time1RevKwh = _V3[Field.Rev_kWh_Tariff_1]
+ResponseV3Data_time2RevKwh = _V3[Field.Rev_kWh_Tariff_2]
+ResponseV3Data_time3RevKwh = _V3[Field.Rev_kWh_Tariff_3]
+ResponseV3Data_time4RevKwh = _V3[Field.Rev_kWh_Tariff_4]
+ResponseV3Data_volts1 = _V3[Field.RMS_Volts_Ln_1]
+ResponseV3Data_volts2 = _V3[Field.RMS_Volts_Ln_2]
+ResponseV3Data_volts3 = _V3[Field.RMS_Volts_Ln_3]
+ResponseV3Data_amps1 = _V3[Field.Amps_Ln_1]
+ResponseV3Data_amps2 = _V3[Field.Amps_Ln_2]
+ResponseV3Data_amps3 = _V3[Field.Amps_Ln_3]
+ResponseV3Data_watts1 = _V3[Field.RMS_Watts_Ln_1]
+ResponseV3Data_watts2 = _V3[Field.RMS_Watts_Ln_2]
+ResponseV3Data_watts3 = _V3[Field.RMS_Watts_Ln_3]
+ResponseV3Data_wattsTotal = _V3[Field.RMS_Watts_Tot]
+ResponseV3Data_cos1 = _V3[Field.Cos_Theta_Ln_1]
+ResponseV3Data_cos2 = _V3[Field.Cos_Theta_Ln_2]
+ResponseV3Data_cos3 = _V3[Field.Cos_Theta_Ln_3]
+ResponseV3Data_maxDemand = _V3[Field.Max_Demand]
+ResponseV3Data_demandPeriod = _V3[Field.Max_Demand_Period]
+ResponseV3Data_meterDateTime = _V3[Field.Meter_Time]
+ResponseV3Data_currentTransformer = _V3[Field.CT_Ratio]
+ResponseV3Data_pulseCount1 = _V3[Field.Pulse_Cnt_1]
+ResponseV3Data_pulseCount2 = _V3[Field.Pulse_Cnt_2]
+ResponseV3Data_pulseCount3 = _V3[Field.Pulse_Cnt_3]
+ResponseV3Data_pulseRatio1 = _V3[Field.Pulse_Ratio_1]
+ResponseV3Data_pulseRatio2 = _V3[Field.Pulse_Ratio_2]
+ResponseV3Data_pulseRatio3 = _V3[Field.Pulse_Ratio_3]
+ResponseV3Data_PulseState = _V3[Field.State_Inputs]
+ResponseV3Data_reserved = slice(_V3["reserved_11"].start, _V3[Field.Status_A].stop)
+ResponseV3Data_fixedEnd = _V3["reserved_12"]
+ResponseV3Data_crc = _V3["crc16"]
 
 #  V4 fields common to V4A and V4B
-ResponseV4Data_fixed02 = slice(0,1)                 # SQL offset   1
-ResponseV4Data_model = slice(1,3)                   # SQL offset   2
-ResponseV4Data_firmwareVer = slice(3,4)             # SQL offset   4
-ResponseV4Data_meterId = slice(4,16)                # SQL offset   5
-ResponseV4Data_reserved = slice(16,233)              # SQL offset  17
-ResponseV4Data_meterDateTime = slice(233,247)             # SQL offset 234
-ResponseV4Data_msgType = slice(247,249)                 # SQL offset 248
-ResponseV4Data_fixedEnd = slice(249,253)                # SQL offset 250
-ResponseV4Data_crc = slice(253,255)                     # SQL offset 254
-
-ResponseV4AData_fixed02 = ResponseV4Data_fixed02                 # SQL offset   1
-ResponseV4AData_model = ResponseV4Data_model                   # SQL offset   2
-ResponseV4AData_firmwareVer = ResponseV4Data_firmwareVer             # SQL offset   4
-ResponseV4AData_meterId = ResponseV4Data_meterId                # SQL offset   5
-ResponseV4AData_totalKwh = slice(16,24)                # SQL offset  17
-ResponseV4AData_totalKVARh = slice(24,32)              # SQL offset  25
-ResponseV4AData_totalRevKwh = slice(32,40)             # SQL offset  33
-ResponseV4AData_totalKwhL1 = slice(40,48)              # SQL offset  41
-ResponseV4AData_totalKwhL2 = slice(48,56)              # SQL offset  49
-ResponseV4AData_totalKwhL3 = slice(56,64)              # SQL offset  57
-ResponseV4AData_reverseKwhL1 = slice(64,72)            # SQL offset  65
-ResponseV4AData_reverseKwhL2 = slice(72,80)            # SQL offset  73
-ResponseV4AData_reverseKwhL3 = slice(80,88)            # SQL offset  81
-ResponseV4AData_resettableTotalKwh = slice(88,96)      # SQL offset  89
-ResponseV4AData_resettableReverseKwh = slice(96,104)    # SQL offset  97
-ResponseV4AData_volts1 = slice(104,108)                  # SQL offset 105
-ResponseV4AData_volts2 = slice(108,112)                  # SQL offset 109
-ResponseV4AData_volts3 = slice(112,116)                  # SQL offset 113
-ResponseV4AData_amps1 = slice(116,121)                   # SQL offset 117
-ResponseV4AData_amps2 = slice(121,126)                   # SQL offset 122
-ResponseV4AData_amps3 = slice(126,131)                   # SQL offset 127
-ResponseV4AData_watts1 = slice(131,138)                  # SQL offset 132
-ResponseV4AData_watts2 = slice(138,145)                  # SQL offset 139
-ResponseV4AData_watts3 = slice(145,152)                  # SQL offset 146
-ResponseV4AData_wattsTotal = slice(152,159)              # SQL offset 153
-ResponseV4AData_cos1 = slice(159,163)                    # SQL offset 160
-ResponseV4AData_cos2 = slice(163,167)                    # SQL offset 164
-ResponseV4AData_cos3 = slice(167,171)                    # SQL offset 168
-ResponseV4AData_varL1 = slice(171,178)                   # SQL offset 172
-ResponseV4AData_varL2 = slice(178,185)                   # SQL offset 179
-ResponseV4AData_varL3 = slice(185,192)                   # SQL offset 186
-ResponseV4AData_varL123 = slice(192,199)                 # SQL offset 193
-ResponseV4AData_frequency = slice(199,203)               # SQL offset 200
-ResponseV4AData_pulseCount1 = slice(103,211)             # SQL offset 204
-ResponseV4AData_pulseCount2 = slice(211,219)             # SQL offset 212
-ResponseV4AData_pulseCount3 = slice(219,227)             # SQL offset 220
-ResponseV4AData_pulseState = slice(227,228)              # SQL offset 228
-ResponseV4AData_currentDir123 = slice(228,229)           # SQL offset 229
-ResponseV4AData_outState = slice(229,230)                # SQL offset 230
-ResponseV4AData_kwhDecimals = slice(230,231)             # SQL offset 231
-ResponseV4AData_reserved = slice(231,233)                # SQL offset 232
-ResponseV4AData_meterDateTime = ResponseV4Data_meterDateTime             # SQL offset 234
-ResponseV4AData_msgType = ResponseV4Data_msgType                 # SQL offset 248
-ResponseV4AData_fixedEnd = ResponseV4Data_fixedEnd                # SQL offset 250
-ResponseV4AData_crc = ResponseV4Data_crc                     # SQL offset 254
-
-ResponseV4BData_fixed02 = ResponseV4Data_fixed02                 # SQL offset   1
-ResponseV4BData_model = ResponseV4Data_model                   # SQL offset   2
-ResponseV4BData_firmwareVer = ResponseV4Data_firmwareVer             # SQL offset   4
-ResponseV4BData_meterId = ResponseV4Data_meterId                # SQL offset   5
-ResponseV4BData_time1Kwh = slice(16,24)                # SQL offset  17
-ResponseV4BData_time2Kwh = slice(24,32)                # SQL offset  25
-ResponseV4BData_time3Kwh = slice(32,40)                # SQL offset  33
-ResponseV4BData_time4Kwh = slice(40,48)                # SQL offset  41
-ResponseV4BData_time1RevKwh = slice(48,56)             # SQL offset  49
-ResponseV4BData_time2RevKwh = slice(56,64)             # SQL offset  57
-ResponseV4BData_time3RevKwh = slice(64,72)             # SQL offset  65
-ResponseV4BData_time4RevKwh = slice(72,80)             # SQL offset  73
-ResponseV4BData_volts1 = slice(80,84)                  # SQL offset  81
-ResponseV4BData_volts2 = slice(84,88)                  # SQL offset  85
-ResponseV4BData_volts3 = slice(88,92)                  # SQL offset  89
-ResponseV4BData_amps1 = slice(92,97)                   # SQL offset  93
-ResponseV4BData_amps2 = slice(97,102)                   # SQL offset  98
-ResponseV4BData_amps3 = slice(102,107)                   # SQL offset 103
-ResponseV4BData_watts1 = slice(107,114)                  # SQL offset 108
-ResponseV4BData_watts2 = slice(114,121)                  # SQL offset 115
-ResponseV4BData_watts3 = slice(121,128)                  # SQL offset 122
-ResponseV4BData_wattsTotal = slice(128,135)              # SQL offset 129
-ResponseV4BData_cos1 = slice(135,139)                    # SQL offset 136
-ResponseV4BData_cos2 = slice(139,143)                    # SQL offset 140
-ResponseV4BData_cos3 = slice(143,147)                    # SQL offset 144
-ResponseV4BData_maxDemand = slice(147,155)               # SQL offset 148
-ResponseV4BData_demandPeriod = slice(155,156)            # SQL offset 156
-ResponseV4BData_PRatio1 = slice(156,160)                 # SQL offset 157
-ResponseV4BData_PRatio2 = slice(160,164)                 # SQL offset 161
-ResponseV4BData_PRatio3 = slice(164,168)                 # SQL offset 165
-ResponseV4BData_CTRatio = slice(168,172)                 # SQL offset 169
-ResponseV4BData_autoResetMaxDemand = slice(172,173)      # SQL offset 173
-ResponseV4BData_CFRatio = slice(173,177)                 # SQL offset 174
-ResponseV4BData_reserved = slice(177,233)               # SQL offset 178
-ResponseV4BData_meterDateTime = ResponseV4Data_meterDateTime             # SQL offset 234
-ResponseV4BData_msgType = ResponseV4Data_msgType                 # SQL offset 248
-ResponseV4BData_fixedEnd = ResponseV4Data_fixedEnd                # SQL offset 250
-ResponseV4BData_crc = ResponseV4Data_crc                     # SQL offset 254
+ResponseV4Data_fixed02 = _V4A["reserved_1"]
+ResponseV4Data_model = _V4A[Field.Model]
+ResponseV4Data_firmwareVer = _V4A[Field.Firmware]
+ResponseV4Data_meterId = _V4A[Field.Meter_Address]
+ResponseV4Data_reserved = slice(_V4A[Field.Meter_Address].stop, _V4A[Field.Meter_Time].start)
+ResponseV4Data_meterDateTime = _V4A[Field.Meter_Time]
+ResponseV4Data_msgType = _V4A["reserved_3"]
+ResponseV4Data_fixedEnd = _V4A["reserved_4"]
+ResponseV4Data_crc = _V4A["crc16"]
+
+ResponseV4AData_fixed02 = ResponseV4Data_fixed02
+ResponseV4AData_model = ResponseV4Data_model
+ResponseV4AData_firmwareVer = ResponseV4Data_firmwareVer
+ResponseV4AData_meterId = ResponseV4Data_meterId
+ResponseV4AData_totalKwh = _V4A[Field.kWh_Tot]
+ResponseV4AData_totalKVARh = _V4A[Field.Reactive_Energy_Tot]
+ResponseV4AData_totalRevKwh = _V4A[Field.Rev_kWh_Tot]
+ResponseV4AData_totalKwhL1 = _V4A[Field.kWh_Ln_1]
+ResponseV4AData_totalKwhL2 = _V4A[Field.kWh_Ln_2]
+ResponseV4AData_totalKwhL3 = _V4A[Field.kWh_Ln_3]
+ResponseV4AData_reverseKwhL1 = _V4A[Field.Rev_kWh_Ln_1]
+ResponseV4AData_reverseKwhL2 = _V4A[Field.Rev_kWh_Ln_2]
+ResponseV4AData_reverseKwhL3 = _V4A[Field.Rev_kWh_Ln_3]
+ResponseV4AData_resettableTotalKwh = _V4A[Field.Resettable_kWh_Tot]
+ResponseV4AData_resettableReverseKwh = _V4A[Field.Resettable_Rev_kWh_Tot]
+ResponseV4AData_volts1 = _V4A[Field.RMS_Volts_Ln_1]
+ResponseV4AData_volts2 = _V4A[Field.RMS_Volts_Ln_2]
+ResponseV4AData_volts3 = _V4A[Field.RMS_Volts_Ln_3]
+ResponseV4AData_amps1 = _V4A[Field.Amps_Ln_1]
+ResponseV4AData_amps2 = _V4A[Field.Amps_Ln_2]
+ResponseV4AData_amps3 = _V4A[Field.Amps_Ln_3]
+ResponseV4AData_watts1 = _V4A[Field.RMS_Watts_Ln_1]
+ResponseV4AData_watts2 = _V4A[Field.RMS_Watts_Ln_2]
+ResponseV4AData_watts3 = _V4A[Field.RMS_Watts_Ln_3]
+ResponseV4AData_wattsTotal = _V4A[Field.RMS_Watts_Tot]
+ResponseV4AData_cos1 = _V4A[Field.Cos_Theta_Ln_1]
+ResponseV4AData_cos2 = _V4A[Field.Cos_Theta_Ln_2]
+ResponseV4AData_cos3 = _V4A[Field.Cos_Theta_Ln_3]
+ResponseV4AData_varL1 = _V4A[Field.Reactive_Pwr_Ln_1]
+ResponseV4AData_varL2 = _V4A[Field.Reactive_Pwr_Ln_2]
+ResponseV4AData_varL3 = _V4A[Field.Reactive_Pwr_Ln_3]
+ResponseV4AData_varL123 = _V4A[Field.Reactive_Pwr_Tot]
+ResponseV4AData_frequency = _V4A[Field.Line_Freq]
+ResponseV4AData_pulseCount1 = _V4A[Field.Pulse_Cnt_1]
+ResponseV4AData_pulseCount2 = _V4A[Field.Pulse_Cnt_2]
+ResponseV4AData_pulseCount3 = _V4A[Field.Pulse_Cnt_3]
+ResponseV4AData_pulseState = _V4A[Field.State_Inputs]
+ResponseV4AData_currentDir123 = _V4A[Field.State_Watts_Dir]
+ResponseV4AData_outState = _V4A[Field.State_Out]
+ResponseV4AData_kwhDecimals = _V4A[Field.kWh_Scale]
+ResponseV4AData_reserved = _V4A["reserved_2"]
+ResponseV4AData_meterDateTime = ResponseV4Data_meterDateTime
+ResponseV4AData_msgType = ResponseV4Data_msgType
+ResponseV4AData_fixedEnd = ResponseV4Data_fixedEnd
+ResponseV4AData_crc = ResponseV4Data_crc
+
+ResponseV4BData_fixed02 = ResponseV4Data_fixed02
+ResponseV4BData_model = ResponseV4Data_model
+ResponseV4BData_firmwareVer = ResponseV4Data_firmwareVer
+ResponseV4BData_meterId = ResponseV4Data_meterId
+ResponseV4BData_time1Kwh = _V4B[Field.kWh_Tariff_1]
+ResponseV4BData_time2Kwh = _V4B[Field.kWh_Tariff_2]
+ResponseV4BData_time3Kwh = _V4B[Field.kWh_Tariff_3]
+ResponseV4BData_time4Kwh = _V4B[Field.kWh_Tariff_4]
+ResponseV4BData_time1RevKwh = _V4B[Field.Rev_kWh_Tariff_1]
+ResponseV4BData_time2RevKwh = _V4B[Field.Rev_kWh_Tariff_2]
+ResponseV4BData_time3RevKwh = _V4B[Field.Rev_kWh_Tariff_3]
+ResponseV4BData_time4RevKwh = _V4B[Field.Rev_kWh_Tariff_4]
+ResponseV4BData_volts1 = _V4B[Field.RMS_Volts_Ln_1]
+ResponseV4BData_volts2 = _V4B[Field.RMS_Volts_Ln_2]
+ResponseV4BData_volts3 = _V4B[Field.RMS_Volts_Ln_3]
+ResponseV4BData_amps1 = _V4B[Field.Amps_Ln_1]
+ResponseV4BData_amps2 = _V4B[Field.Amps_Ln_2]
+ResponseV4BData_amps3 = _V4B[Field.Amps_Ln_3]
+ResponseV4BData_watts1 = _V4B[Field.RMS_Watts_Ln_1]
+ResponseV4BData_watts2 = _V4B[Field.RMS_Watts_Ln_2]
+ResponseV4BData_watts3 = _V4B[Field.RMS_Watts_Ln_3]
+ResponseV4BData_wattsTotal = _V4B[Field.RMS_Watts_Tot]
+ResponseV4BData_cos1 = _V4B[Field.Cos_Theta_Ln_1]
+ResponseV4BData_cos2 = _V4B[Field.Cos_Theta_Ln_2]
+ResponseV4BData_cos3 = _V4B[Field.Cos_Theta_Ln_3]
+ResponseV4BData_maxDemand = _V4B[Field.RMS_Watts_Max_Demand]
+ResponseV4BData_demandPeriod = _V4B[Field.Max_Demand_Period]
+ResponseV4BData_PRatio1 = _V4B[Field.Pulse_Ratio_1]
+ResponseV4BData_PRatio2 = _V4B[Field.Pulse_Ratio_2]
+ResponseV4BData_PRatio3 = _V4B[Field.Pulse_Ratio_3]
+ResponseV4BData_CTRatio = _V4B[Field.CT_Ratio]
+ResponseV4BData_autoResetMaxDemand = _V4B["reserved_6"]
+ResponseV4BData_CFRatio = _V4B[Field.Pulse_Output_Ratio]
+ResponseV4BData_reserved = slice(_V4B["reserved_7"].start, _V4B[Field.Meter_Time].start)
+ResponseV4BData_meterDateTime = ResponseV4Data_meterDateTime
+ResponseV4BData_msgType = ResponseV4Data_msgType
+ResponseV4BData_fixedEnd = ResponseV4Data_fixedEnd
+ResponseV4BData_crc = ResponseV4Data_crc
 
 MeterDateTime_year = slice(0,2)
 MeterDateTime_month = slice(2,4)
@@ -288,14 +297,14 @@ RespondTablepostamble = bytearray(b'\x29')
 
 ResponseMsg =   bytearray(255)
 
-ResponseV3_STX    = slice(0,1)
-ResponseV3_model  = slice(1,3)
-ResponseV3_FWver  = slice(3,4)
-ResponseV3_meterNo = slice(4,16)
-ResponseV3_body   = slice(16,229)
-ResponseV3_time   = slice(172,186)
-ResponseV3_reserved = slice(229,249)
-ResponseV3_postamble    = slice(249,253)
+ResponseV3_STX    = ResponseV3Data_fixed02
+ResponseV3_model  = ResponseV3Data_model
+ResponseV3_FWver  = ResponseV3Data_firmwareVer
+ResponseV3_meterNo = ResponseV3Data_meterId
+ResponseV3_body   = slice(ResponseV3Data_meterId.stop, ResponseV3Data_reserved.start)
+ResponseV3_time   = ResponseV3Data_meterDateTime
+ResponseV3_reserved = ResponseV3Data_reserved
+ResponseV3_postamble    = ResponseV3Data_fixedEnd
 ResponseV3postamble  = bytearray(b'\x21\x0d\x0a\x03')
 
 SOH    = bytearray(b'\x01')
@@ -307,14 +316,14 @@ ResponseV4FWver  = bytearray(b'\x15')
 ResponseV3model  = bytearray(b'\x10\x17')
 ResponseV3FWver  = bytearray(b'\x13')
 
-ResponseV4_STX    = slice(0,1)
-ResponseV4_model  = slice(1,3)
-ResponseV4_FWver  = slice(3,4)
-ResponseV4_meterNo = slice(4,16)
-ResponseV4_body   = slice(16,233)
-ResponseV4_time     = slice(233,247)
-ResponseV4_respKind = slice(247,249)
-ResponseV4_postamble    = slice(249,253)
+ResponseV4_STX    = ResponseV4Data_fixed02
+ResponseV4_model  = ResponseV4Data_model
+ResponseV4_FWver  = ResponseV4Data_firmwareVer
+ResponseV4_meterNo = ResponseV4Data_meterId
+ResponseV4_body   = ResponseV4Data_reserved
+ResponseV4_time     = ResponseV4Data_meterDateTime
+ResponseV4_respKind = ResponseV4Data_msgType
+ResponseV4_postamble    = ResponseV4Data_fixedEnd
 ResponseV4postamble  = bytearray(b'\x21\x0d\x0a\x03')
 
 
@@ -18,9 +18,11 @@ High level program flow:
 13          update database to reflect new valve state
 14          publish selected/computed A data to MQTT
 15          if "time to read B"
-16              update "time to read B"
+16              (B reads are scheduled by the bus poller)
 17              read B data
 18              log raw B data to database
+18a         log raw A/B data of any extra meters on the same bus
+18b         log raw A/B data of meters on any extra serial ports
 19          if it is a new day
 20              set local standard time to meter
 21          if magic shutdown file exists, exit loop, cleanup and exit
@@ -73,14 +75,16 @@ import logging.config
 import logging.handlers
 import json
 import serial
-from ekmmeters import ekm_set_log, ekm_set_log_level, Field, SerialPort, V4Meter, RelayInterval, Relay, RelayState
+from ekmmeters import ekm_set_log, ekm_set_log_level, Field, LatencyHistogram, SerialPort, ReplaySerialPort, V4Meter, MeterReading, RelayInterval, Relay, RelayState
+from ekmpoller import BusPoller, PortSupervisor, meter_address
 import binascii
 from binascii import a2b_hex
 
 #from Messages import *
 import pymysql
 
-import paho.mqtt.publish as publish
+from ekmmqtt import MqttPublisher
+from ekmschedule import IntervalScheduler, OverrunPolicy
 
 #######################  GLOBAL DEFINITIONS
 
@@ -287,7 +291,7 @@ def makeMeterDataMsg(myMeter = None):
     logger.debug('Pulse count 3 (as str): "%s"; (as int) %s'%(myMeter.getFieldA(Field.Pulse_Cnt_3), myMeter.getFieldANative(Field.Pulse_Cnt_3)))
     cuFtWater          = myMeter.getFieldANative(Field.Pulse_Cnt_3) * 0.1
     waterSysKwh        = myMeter.getFieldANative(Field.Pulse_Cnt_1) + myMeter.getFieldANative(Field.Pulse_Cnt_2)
-    HouseKWH           = myMeter.getFieldANative(Field.kWh_Tot) * .01       #  Automatic scaling doesn't seem to be working
+    HouseKWH           = myMeter.getFieldANative(Field.kWh_Tot)             #  Already scaled by kWh_Scale
     #  waterSysKwh is actually WattHours at this point.
 
     #  Save previous values if this is the first time this function is called.
@@ -342,6 +346,122 @@ def makeMeterDataMsg(myMeter = None):
     return outputDict
 
 
+def createRawTables(cursor, schema, tableNames):
+    ''' Create any missing raw meter data tables, like `RawMeterData`.
+    '''
+    for tableName in tableNames:
+        cursor.execute("SHOW TABLES LIKE '%s'"%tableName)
+        if cursor.fetchone() is not None:
+            logger.debug('Table %s is in the database.'%tableName)
+            continue
+        query = 'CREATE TABLE `{schema}`.`{newTableName}` LIKE `{schema}`.`RawMeterData`'.format(schema=schema, newTableName=tableName)
+        logger.debug('Creating table with query: "%s"'%query)
+        cursor.execute(query)
+
+class CycleWriter(object):
+    ''' Writes all database rows of one read cycle in one transaction.
+
+        The id of a raw frame comes from cursor.lastrowid instead of reading it back, and
+        the cycle ends with a single commit.  Query text is built once per table; pymysql
+        has no server side prepared statements, so it only binds values client side.
+        Per cycle database time (statements plus commit) goes into a LatencyHistogram.
+    '''
+    def __init__(self, conn, schema, dontWrite):
+        self.m_conn = conn
+        self.m_schema = schema
+        self.m_dont_write = dontWrite
+        self.m_queries = {}
+        self.m_rows = 0
+        self.m_db_sec = 0.0
+        self.m_latency = LatencyHistogram()
+        pass
+
+    def rawFrameQuery(self, table):
+        query = self.m_queries.get(('raw', table))
+        if query is None:
+            query = """INSERT INTO `{schema}`.`{table}`
+    (MeterTime, MeterId, DataType, MeterType, WaterOff, MeterData)
+    VALUES (%(MeterTime)s, %(MeterId)s, %(DataType)s, %(MeterType)s, %(WaterOff)s, %(MeterData)s)""".format(schema = self.m_schema,
+                table = table)
+            self.m_queries[('raw', table)] = query
+        return query
+
+    def meterDataQuery(self, table):
+        query = self.m_queries.get(('meterdata', table))
+        if query is None:
+            query = """ INSERT IGNORE INTO  `{schema}`.`{table}`
+    (RecordId, Time, MeterTime, CuFtWater, GPM, HouseEnergyKWH, HousePowerW, AvgPowerW, WaterSysKwh, AvgWaterPowerW, WaterEnable)
+    VALUES (%(RecordId)s, %(ComputerTime)s, %(MeterTime)s, %(CuFtWater)s, %(GalPerMin)s, %(HouseKWH)s, %(HouseWatts)s, %(HouseAvgPowerW)s, %(WaterKWH)s, %(WaterWatts)s, %(MainWaterValve)s)
+    """.format(schema = self.m_schema, table = table)
+            self.m_queries[('meterdata', table)] = query
+        return query
+
+    def execute(self, cursor, table, query, values):
+        ''' Run one statement of the cycle; returns its lastrowid, -1 when not writing. '''
+        if self.m_dont_write:
+            logger.debug('NOT inserting into %s with query: "%s"'%(table, cursor.mogrify(query, values)))
+            return -1
+        logger.debug('Inserting into %s with query: "%s"'%(table, cursor.mogrify(query, values)))
+        start = time.perf_counter()
+        cursor.execute(query, values)
+        self.m_db_sec += time.perf_counter() - start
+        self.m_rows += 1
+        return cursor.lastrowid
+
+    def insertRawFrame(self, cursor, table, meter, dataType, waterOff):
+        ''' Insert the last raw frame of type dataType ('V4A', 'V4B' or 'V3') read by meter,
+            or held by a MeterReading snapshot from another serial port's worker.
+            Returns the new idRawMeterData, -1 when not writing.
+        '''
+        if isinstance(meter, MeterReading):
+            getField = meter.getField
+            meterData = meter.getRawReadB() if dataType == 'V4B' else meter.getRawReadA()
+        elif dataType == 'V4B':
+            getField, meterData = meter.getFieldB, meter.m_raw_bytes_b
+        elif dataType == 'V4A':
+            getField, meterData = meter.getFieldA, meter.m_raw_bytes_a
+        else:
+            getField, meterData = meter.getField, meter.m_raw_bytes_a
+        queryValueDict = {}
+        queryValueDict['MeterTime'] = getDatetimeFromEKM(getField(Field.Meter_Time))
+        queryValueDict['MeterId'] = getField(Field.Meter_Address)
+        queryValueDict['DataType'] = dataType
+        queryValueDict['MeterType'] = getField(Field.Model)
+        queryValueDict['MeterData'] = meterData
+        queryValueDict['WaterOff'] = waterOff
+        return self.execute(cursor, table, self.rawFrameQuery(table), queryValueDict)
+
+    def insertMeterData(self, cursor, table, recordId, outputDict):
+        ''' Insert selected/computed data, linked to raw frame recordId. '''
+        values = dict(outputDict)
+        values['RecordId'] = recordId
+        return self.execute(cursor, table, self.meterDataQuery(table), values)
+
+    def commit(self):
+        ''' End the cycle's transaction; rolls back and re-raises if the commit fails. '''
+        rows, self.m_rows = self.m_rows, 0
+        if rows == 0:
+            self.m_db_sec = 0.0
+            return
+        start = time.perf_counter()
+        try:
+            self.m_conn.commit()
+        except Exception:
+            self.m_conn.rollback()
+            raise
+        finally:
+            commitSec = time.perf_counter() - start
+            dbSec, self.m_db_sec = self.m_db_sec + commitSec, 0.0
+            self.m_latency.add(dbSec)
+        logger.debug('Cycle database write: %d rows in %.1f ms (commit %.1f ms).'%(rows, dbSec * 1000.0, commitSec * 1000.0))
+
+    def getStats(self):
+        ''' Per cycle database latency: count, mean, p50, p95 and max ms. '''
+        stats = self.m_latency.getStats()
+        del stats['counts']
+        return stats
+
+
 ##########################   MAIN
 def main():
 
@@ -353,6 +473,7 @@ def main():
         mqttTopic  = cfg.get('mqtt_topic')
         mqttPort   = int(cfg.get('mqtt_port'))
         mqttHost   = cfg.get('mqtt_host')
+        mqttQueueSize = int(cfg.get('mqtt_queue_size', 1000))
 
         ############  setup database connection
         user = cfg.get('inserter_user')
@@ -363,6 +484,8 @@ def main():
 
         ############  other parameters from config
         myMeterIdStr = cfg.get('meter_id')
+        extraMeterIdsStr = cfg.get('extra_meter_ids', '')
+        extraPortsStr = cfg.get('extra_ports', '')
         meterSerialPort = cfg.get('meter_serial_port')
 
     except UserWarning as w:
@@ -375,7 +498,15 @@ def main():
     parser.add_argument("-r", "--repeatCount", dest="repeatCount", action="store", default='0', help="Number of times to read meters; 0 => forever.")
     parser.add_argument("-n", "--a_to_b_ratio", dest="aToBRatio", action="store", default='15', help="Number of times to read A data from V4 meters before reading B data.\n"
                                                                                                     "If zero don't read B data.")
+    parser.add_argument("-x", "--extraMeterIds", dest="extraMeterIds", action="store", help="Comma separated numeric Ids of more EKM meters on the same serial port;\n"
+                                                                                                    "their raw data is logged to their own tables.")
+    parser.add_argument("-P", "--extraPort", dest="extraPorts", action="append", help="PORT=ID,ID,... : another serial port and the EKM meters on it,\n"
+                                                                                                    "polled in its own thread; may be repeated.")
+    parser.add_argument("-k", "--catchUp", dest="catchUp", action="store_true", default=False, help="After an overrun, read the missed intervals late instead of skipping them.")
     parser.add_argument("-s", "--serial_port", dest="serialPort", action="store", help="The serial port to which the EKM meter is connected.")
+    parser.add_argument("-C", "--capture", dest="captureFile", action="store", help="Record all traffic on the meter serial port to this capture file.")
+    parser.add_argument("-R", "--replay", dest="replayFile", action="store", help="Serve the meter serial port from this capture file instead of a meter.")
+    parser.add_argument("-F", "--replayFast", dest="replayFast", action="store_true", default=False, help="Replay the capture without its recorded delays.")
     parser.add_argument("-W", "--dontWriteToDB", dest="noWriteDb", action="store_true", default=False, help="Don't write to database [during debug defaults to True].")
     parser.add_argument("-v", "--verbosity", dest="verbosity", action="count", help="increase output verbosity", default=0)
     args = parser.parse_args()
@@ -387,6 +518,11 @@ def main():
     if args.serialPort is not None:
         meterSerialPort = args.serialPort
     logger.debug('Connecting to meter on serial port: %s'%meterSerialPort)
+    if args.replayFile is not None:
+        meterPort = ReplaySerialPort(args.replayFile, realtime=not args.replayFast)
+        logger.debug('Replaying meter serial port from capture: %s'%args.replayFile)
+    else:
+        meterPort = SerialPort(meterSerialPort)
 
     if args.meterId is not None:
         myMeterIdStr = args.meterId
@@ -399,6 +535,25 @@ def main():
 
     meterAtable = myMeterId + cfg.get('meter_table_a_suffix')
     meterBtable = myMeterId + cfg.get('meter_table_b_suffix')
+
+    if args.extraMeterIds is not None:
+        extraMeterIdsStr = args.extraMeterIds
+    extraMeterIds = [meter_address(m) for m in extraMeterIdsStr.split(',') if m.strip()]
+    extraTables = {}
+    for extraId in extraMeterIds:
+        extraTables[extraId] = (extraId + cfg.get('meter_table_a_suffix'), extraId + cfg.get('meter_table_b_suffix'))
+    logger.debug('Extra meters on the bus: %s'%extraMeterIds)
+
+    if args.extraPorts is None:
+        args.extraPorts = [p for p in extraPortsStr.split(';') if p.strip()]
+    extraPorts = []
+    for portSpec in args.extraPorts:
+        portName, portIds = portSpec.strip().rsplit('=', 1)
+        portIds = [meter_address(m) for m in portIds.split(',') if m.strip()]
+        extraPorts.append((portName, portIds))
+        for extraId in portIds:
+            extraTables[extraId] = (extraId + cfg.get('meter_table_a_suffix'), extraId + cfg.get('meter_table_b_suffix'))
+    logger.debug('Extra serial ports: %s'%extraPorts)
     logger.debug('meterAtable is "%s"'%meterAtable)
     logger.debug('meterBtable is "%s"'%meterBtable)
     meterTable = cfg.get('meter_table')
@@ -471,6 +626,8 @@ def main():
                 logger.debug('Created required database meterdata table.')
             else:
                 logger.debug('Found all required tables in database.')
+            for extraId in extraTables:
+                createRawTables(cursor, schema, extraTables[extraId])
 
     #  Generate a timezone for  LocalStandardTime
     #  Leaving off zone name from timezone creator generates UTC based name which may be more meaningful.
@@ -482,17 +639,61 @@ def main():
     if intervalSec < 60:
         logger.warning('Looping intervals less than 1 minute not supported.  Set to 1 minute.')
         intervalSec = 60
-    secSinceEpoch = time.time()
-    sleepLength = intervalSec - secSinceEpoch % intervalSec
-    bIntervalSec = intervalSec * int(args.aToBRatio)
-    nextBTime = int(secSinceEpoch + (bIntervalSec - secSinceEpoch  % bIntervalSec)) - 10        # 10 sec fudge factor
-    logger.debug("   ###########   Sleep for %s sec."%sleepLength)
-    time.sleep(sleepLength)
-    logger.debug('Slept for %s seconds.  It is now: %s'%(sleepLength, datetime.datetime.now().isoformat()))
-
-    dayNumber = int(secSinceEpoch / 86400) - 1      #  number of days since epoch till yesterday
-
-    with DBConn.cursor() as cursor, SerialPort(meterSerialPort) as sp, V4Meter(myMeterId, sp) as myMeter:
+####            Deadlines are kept on the monotonic clock, aligned to the interval boundaries
+####            of the wall clock, so clock steps and slow cycles don't double or drift the reads.
+    scheduler = IntervalScheduler(intervalSec, policy=OverrunPolicy.CatchUp if args.catchUp else OverrunPolicy.Skip)
+    tick = scheduler.wait()
+    logger.debug('Interval %s starts; it is now: %s'%(tick.interval, datetime.datetime.now().isoformat()))
+
+    dayNumber = int(tick.wall_time / 86400) - 1      #  number of days since epoch till yesterday
+
+####            One MQTT connection for the whole run; its network thread reconnects on its own
+####            and publishes waiting while the broker is away are sent when it is back.
+    mqttPublisher = MqttPublisher(mqttHost, mqttPort, client_id=ProgName + '-' + myMeterId, queue_size=mqttQueueSize)
+
+    writer = CycleWriter(DBConn, schema, dontWriteDb)
+
+    with DBConn.cursor() as cursor, meterPort as sp, V4Meter(myMeterId, sp) as myMeter, mqttPublisher:
+        myMeter.setLazyDecode(True)     #  Only a handful of fields are used each cycle
+        sp.setStatsLogInterval(3600)    #  Hourly per command bus accounting summary in the log
+        if args.captureFile is not None:
+            sp.startCapture(args.captureFile)
+            logger.debug('Capturing meter serial port traffic to: %s'%args.captureFile)
+
+####            All meter traffic for the cycle goes in one session per meter:  the opening read
+####            ("A", plus "B" when it is due), and for our meter the relay set and daily time set,
+####            share one open, one password exchange and one termination string.
+        waterOff = None
+        def meterCycleCommands(meter, readB):
+            nonlocal waterOff, dayNumber
+            if itsWet:
+                logger.debug('It is wet out there; turn OFF main water valve.')
+                meter.setRelay(RelayInterval.Hold, Relay.Relay2, RelayState.RelayClose)
+                waterOff = 1
+            else:
+                logger.debug('It is dry out there; turn ON main water valve.')
+                meter.setRelay(RelayInterval.Hold, Relay.Relay2, RelayState.RelayOpen)
+                waterOff = 0
+
+####    19              if it is a new day
+            today = int(tick.wall_time / 86400)
+            if today != dayNumber:
+                logger.debug("It's a new day; set the time in the meter.")
+                dayNumber = today
+####    20                  set local standard time to meter
+                meter.setTimeFromDateTime(datetime.datetime.now(localStandardTimeZone))
+
+        poller = BusPoller(sp, intervalSec)
+        poller.addMeter(myMeter, b_every=int(args.aToBRatio), offset=0, cycle_commands=meterCycleCommands)
+        for extraId in extraMeterIds:
+            poller.addMeterId(extraId, b_every=int(args.aToBRatio))
+
+####            Other serial ports are polled in worker threads; their readings come back
+####            here so this thread stays the only database writer.
+        supervisor = PortSupervisor(intervalSec)
+        for portName, portIds in extraPorts:
+            supervisor.addPort(portName, portIds, b_every=int(args.aToBRatio))
+        supervisor.start()
         try:
 ####    10      Loop the number of times specified
             loopCount = int(args.repeatCount)
@@ -523,103 +724,66 @@ def main():
                     itsWet = False
                     logger.debug('The water valve control file does not exist, assume it is dry out there.')
                 waterOff = None
-                if itsWet:
-                    logger.debug('It is wet out there; turn OFF main water valve.')
-                    myMeter.setRelay(RelayInterval.Hold, Relay.Relay2, RelayState.RelayClose)
-                    waterOff = 1
-                else:
-                    logger.debug('It is dry out there; turn ON main water valve.')
-                    myMeter.setRelay(RelayInterval.Hold, Relay.Relay2, RelayState.RelayOpen)
-                    waterOff = 0
+####    15/16           read A for every meter on the bus, and B where it is due (B reads
+####                    of the meters are staggered over the B period by the poller).
+                supervisor.startPoll(tick.interval)
+                pollResults = poller.pollOnce(tick.interval)
+                readB = pollResults[0].read_b
+                if readB:
+                    logger.debug('It is %s, "B" data was read.'%datetime.datetime.now().isoformat())
+                utilization = poller.getUtilization()
+                logger.debug('Bus poll of %s meters took %.0f ms, %.2f%% of the interval.'%(len(pollResults), utilization['busy_ms'], utilization['utilization'] * 100.0))
 
 ####    12          log raw A data to database
 ####    13          update database to reflect new valve state
-                logger.debug('Length of response A is: %s'%len(myMeter.m_raw_read_a))
-                queryValueDict = {}
-                queryValueDict['MeterTime'] = getDatetimeFromEKM(myMeter.getFieldA(Field.Meter_Time))
-                queryValueDict['MeterId'] = myMeter.getFieldA(Field.Meter_Address)
-                queryValueDict['DataType'] = 'V4A'
-                queryValueDict['MeterType'] = myMeter.getFieldA(Field.Model)
-                queryValueDict['MeterData'] = myMeter.m_raw_read_a.encode('ascii')
-                queryValueDict['WaterOff'] = waterOff
-
-                query = """INSERT INTO `{schema}`.`{table}`
-                (MeterTime, MeterId, DataType, MeterType, WaterOff, MeterData)
-                VALUES (%(MeterTime)s, %(MeterId)s, %(DataType)s, %(MeterType)s, %(WaterOff)s, %(MeterData)s)""".format(schema = schema,
-                    table = meterAtable)
-                logger.debug('Response A insertion query is: %s'%query)
-                if dontWriteDb:
-                    logger.debug('NOT inserting into A table with query: "%s"'%cursor.mogrify(query, queryValueDict))
-                    idRawMeterData = -1
-                else:
-                    logger.debug('Inserting into A table with query: "%s"'%cursor.mogrify(query, queryValueDict))
-                    cursor.execute(query, queryValueDict)
-                    DBConn.commit()
-                    cursor.execute('SELECT idRawMeterData FROM `{schema}`.`{table}` ORDER BY ComputerTime DESC LIMIT 1'.format(schema = schema,
-                    table = meterAtable))
-                    for r in cursor:
-                        idRawMeterData = r[0]
-                        logger.debug('Record id for raw data just inserted is: %s'%idRawMeterData)
+                logger.debug('Length of response A is: %s'%len(myMeter.m_raw_bytes_a))
+                idRawMeterData = writer.insertRawFrame(cursor, meterAtable, myMeter, 'V4A', waterOff)
+                logger.debug('Record id for raw data just inserted is: %s'%idRawMeterData)
 
 
 ####    14          publish selected/computed A data to MQTT
                 outputDict = makeMeterDataMsg(myMeter)
                 outMsg = json.JSONEncoder().encode(outputDict)
                 logger.debug('Publishing meter data: "%s"'%outMsg)
-                publish.single(mqttTopic, payload = outMsg, hostname = mqttHost, port = mqttPort)
+                if not mqttPublisher.publish(mqttTopic, outMsg):
+                    logger.debug('MQTT broker not connected; message queued.')
 
 ####    14a          insert selected/computed data to database
                 if haveMeterTable:
                     # Convert MainWaterValve from text 'ON'/'OFF' to 1 or 0   NOTE:  This is the state of the valve BEFORE we posibly change it.
                     # To get the expected NEW value look at the waterOff variable.  I believe the correct value is: (1-waterOff).
                     outputDict['MainWaterValve'] = 1 if outputDict['MainWaterValve'] == 'ON' else 0
-                    query = """ INSERT IGNORE INTO  `{schema}`.`{table}`
-                    (RecordId, Time, MeterTime, CuFtWater, GPM, HouseEnergyKWH, HousePowerW, AvgPowerW, WaterSysKwh, AvgWaterPowerW, WaterEnable)
-                    VALUES ({id}, %(ComputerTime)s, %(MeterTime)s, %(CuFtWater)s, %(GalPerMin)s, %(HouseKWH)s, %(HouseWatts)s, %(HouseAvgPowerW)s, %(WaterKWH)s, %(WaterWatts)s, %(MainWaterValve)s)
-                    """.format(schema = schema, table = meterTable, id = idRawMeterData)
-                    if dontWriteDb:
-                        logger.debug('NOT inserting into meter data table with query: "%s"'%cursor.mogrify(query, outputDict))
-                    else:
-                        logger.debug('Inserting into meter data table with query: "%s"'%cursor.mogrify(query, outputDict))
-                        cursor.execute(query, outputDict)
-                        DBConn.commit()
+                    writer.insertMeterData(cursor, meterTable, idRawMeterData, outputDict)
                 else:
                     logger.debug("Don't have a meterdata table to which to write.")
 
-####    15          if "time to read B"
-                if time.time() > nextBTime:
-                    logger.debug('It is %s, time to read "B" data.'%datetime.datetime.now().isoformat())
-####    16              update "time to read B"
-                    nextBTime += bIntervalSec
-####    17              read B data
-                    myMeter.request()           # gets A and B
+####    15          if "B" was read this cycle (step 17 is the session's opening read)
+                if readB:
 ####    18              log raw B data to database
-                    queryValueDict = {}
-                    queryValueDict['MeterTime'] = getDatetimeFromEKM(myMeter.getFieldB(Field.Meter_Time))
-                    queryValueDict['MeterId'] = myMeter.getFieldB(Field.Meter_Address)
-                    queryValueDict['DataType'] = 'V4B'
-                    queryValueDict['MeterType'] = myMeter.getFieldB(Field.Model)
-                    queryValueDict['MeterData'] = myMeter.m_raw_read_b.encode('ascii')
-                    queryValueDict['WaterOff'] = 0
-                    query = """INSERT INTO `{schema}`.`{table}`
-                    (MeterTime, MeterId, DataType, MeterType, WaterOff, MeterData)
-                    VALUES (%(MeterTime)s, %(MeterId)s, %(DataType)s, %(MeterType)s, %(WaterOff)s, %(MeterData)s)""".format(schema = schema,
-                        table = meterBtable)
-                    logger.debug('Response B insertion query is: %s'%query)
-                    if dontWriteDb:
-                        logger.debug('NOT inserting into B table with query: "%s"'%cursor.mogrify(query, queryValueDict))
-                    else:
-                        logger.debug('Inserting into B table with query: "%s"'%cursor.mogrify(query, queryValueDict))
-                        cursor.execute(query, queryValueDict)
-                        DBConn.commit()
-
-####    19          if it is a new day
-                today = int(secSinceEpoch / 86400)
-                if today != dayNumber:
-                    logger.debug("It's a new day; set the time in the meter.")
-                    dayNumber = today
-####    20              set local standard time to meter
-                    myMeter.setTimeFromDateTime(datetime.datetime.now(localStandardTimeZone))
+                    writer.insertRawFrame(cursor, meterBtable, myMeter, 'V4B', 0)
+
+####    18a         log raw data of the other meters on the bus
+                for result in pollResults[1:]:
+                    if not result.ok:
+                        logger.warning('Read of meter %s failed.'%result.meter_id)
+                        continue
+                    aTable, bTable = extraTables[result.meter_id]
+                    writer.insertRawFrame(cursor, aTable, result.meter, 'V4A' if isinstance(result.meter, V4Meter) else 'V3', 0)
+                    if result.read_b:
+                        writer.insertRawFrame(cursor, bTable, result.meter, 'V4B', 0)
+
+####    18b         log raw data of the meters on the other serial ports
+                for reading in supervisor.waitPoll():
+                    if not reading.ok:
+                        logger.warning('Read of meter %s on %s failed.'%(reading.meter_id, reading.port_name))
+                        continue
+                    aTable, bTable = extraTables[reading.meter_id]
+                    writer.insertRawFrame(cursor, aTable, reading.reading, 'V4A' if int(reading.meter_id) >= 300000000 else 'V3', 0)
+                    if reading.read_b:
+                        writer.insertRawFrame(cursor, bTable, reading.reading, 'V4B', 0)
+
+####    18c         one commit for everything written this cycle
+                writer.commit()
 
 ####    21          if magic shutdown file exists, exit loop, cleanup and exit
                 magicQuitPath = os.path.expandvars('${HOME}/.CloseReadEKM')
@@ -637,13 +801,19 @@ def main():
                     logger.debug('Keep going %s more times.'%loopCount)
 
 ####    22          wait till next time to read A
-                sleepLength = intervalSec - time.time() % intervalSec
-                logger.debug("##############   Sleep for %s sec."%sleepLength)
-                time.sleep(sleepLength)
-                logger.debug('Slept for %s seconds.  It is now: %s'%(sleepLength, datetime.datetime.now().isoformat()))
+                tick = scheduler.wait()
+                if tick.skipped:
+                    logger.warning('Cycle overran; skipped %s interval(s).'%tick.skipped)
+                elif tick.catch_up:
+                    logger.warning('Cycle overran; reading interval %s %.1f sec late.'%(tick.interval, tick.late_sec))
+                logger.debug('Interval %s starts %.3f sec after its deadline; it is now: %s'%(tick.interval, tick.late_sec, datetime.datetime.now().isoformat()))
 
         finally:
-            pass
+            supervisor.stop()
+            sp.stopCapture()
+            logger.info('MQTT publisher: %s'%mqttPublisher.getStats())
+            logger.info('Cycle database writes: %s'%writer.getStats())
+            logger.info('Scheduler: %s'%scheduler.getStats())
 
     DBConn.close()
     # if sp.m_ser.is_open:
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+""" benchEKM.py
+
+Micro benchmarks for the ekmmeters frame handling hot paths.
+
+No meter or serial port needed; frames are synthesized in memory.  The
+multi-port benchmark polls FakeEKM servers on local sockets (needs the
+FakeEKM dependencies), and the replay benchmark re-runs the reads of a
+serial capture recorded with ReadEKM -C.
+
+    python benchEKM.py [-n FRAMES] [-p MAX_PORTS] [-R CAPTURE]
+"""
+import argparse
+import random
+import threading
+import time
+
+from ekmmeters import (V3Meter, V4Meter, Field, MeterData, ReplaySerialPort, ScaleKWH, calc_crc16_as_bytes,
+                       capture_write, read_capture)
+
+
+def makeFrame(seed=None):
+    """ Synthetic 255 byte Omnimeter response which unpacks and converts.
+
+    Args:
+        seed (int): Optional random seed.
+
+    Returns:
+        str: Frame with implicit string cast, as returned by getResponse().
+    """
+    rnd = random.Random(seed)
+    frame = bytearray(rnd.randint(0x30, 0x39) for _ in range(255))
+    frame[0] = 0x02
+    frame[249:253] = b'!\r\n\x03'
+    frame[253:255] = calc_crc16_as_bytes(frame[1:-2])
+    return frame.decode('ascii')
+
+
+def timeDecode(meter, def_buf, frames, convert):
+    """ Seconds per frame for unpack plus convert.
+
+    The kWh scale is resolved here, as convertData does, so both decoders
+    scale the same way.
+
+    Args:
+        meter (Meter): Meter object owning def_buf.
+        def_buf (SerialBlock): Block to decode into.
+        frames (list): Frames from makeFrame().
+        convert (function): Meter conversion method to time.
+
+    Returns:
+        float: Mean seconds per frame.
+    """
+    start = time.perf_counter()
+    for frame in frames:
+        contents = meter.unpackStruct(frame, def_buf)
+        convert(contents, def_buf, meter.resolveKwhScale(contents, def_buf, ScaleKWH.EmptyScale))
+    return (time.perf_counter() - start) / len(frames)
+
+
+def benchDecode(count):
+    """ Compare generic and generated decoders on V4 A, V4 B and V3 blocks. """
+    frames = [makeFrame(i) for i in range(count)]
+    v4 = V4Meter("000000000001", None)
+    v3 = V3Meter("000000000001", None)
+    print("Decode cost per frame, %d frames" % count)
+    print("%-6s %12s %12s %8s" % ("block", "generic us", "generated us", "speedup"))
+    for name, meter, def_buf in (("V4 A", v4, v4.m_blk_a),
+                                 ("V4 B", v4, v4.m_blk_b),
+                                 ("V3", v3, v3.m_blk_a)):
+        meter.m_kwh_precision = 1
+        generic = timeDecode(meter, def_buf, frames, meter.convertDataGeneric)
+        generic_values = [def_buf[fld][MeterData.StringValue] for fld in def_buf]
+        generated = timeDecode(meter, def_buf, frames, meter.convertData)
+        generated_values = [def_buf[fld][MeterData.StringValue] for fld in def_buf]
+        if generic_values != generated_values:
+            print("%-6s decoders disagree" % name)
+        print("%-6s %12.1f %12.1f %7.1fx" % (name, generic * 1e6, generated * 1e6, generic / generated))
+
+
+def benchLazy(count):
+    """ V4 A read cost when only the fields ReadEKM publishes are used. """
+    frames = [makeFrame(i) for i in range(count)]
+    fields = (Field.Meter_Time, Field.Meter_Address, Field.Model, Field.kWh_Tot,
+              Field.Pulse_Cnt_1, Field.Pulse_Cnt_2, Field.Pulse_Cnt_3, Field.RMS_Watts_Tot)
+    v4 = V4Meter("000000000001", None)
+    v4.m_kwh_precision = 1
+    results = []
+    for lazy in (False, True):
+        start = time.perf_counter()
+        for frame in frames:
+            contents = v4.unpackStruct(frame, v4.m_blk_a)
+            if lazy:
+                v4.deferData(contents, v4.m_blk_a)
+            else:
+                v4.convertData(contents, v4.m_blk_a)
+            for fld in fields:
+                v4.getFieldANative(fld)
+        results.append((time.perf_counter() - start) / count)
+    print("V4 A read, %d fields used: eager %.1f us, lazy %.1f us" %
+          (len(fields), results[0] * 1e6, results[1] * 1e6))
+
+
+def startFakeMeters(count, baud):
+    """ Start FakeEKM servers on free localhost ports.
+
+    Args:
+        count (int): Number of servers.
+        baud (int): Line speed the servers emulate, 0 for none.
+
+    Returns:
+        list: socket:// port names.
+    """
+    import FakeEKM
+    FakeEKM.minutesOffset = 1       # random data, no database
+    FakeEKM.wireBaud = baud
+    names = []
+    for _ in range(count):
+        server = FakeEKM.ThreadedTCPServer(('localhost', 0), FakeEKM.ThreadedTCPRequestHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        names.append('socket://localhost:%d' % server.server_address[1])
+    return names
+
+
+def benchPorts(max_ports, meters_per_port=4, polls=3, baud=9600):
+    """ Supervised polling throughput for 1, 2, 4 ... max_ports ports.
+
+    Every FakeEKM server holds its responses for their time on the wire,
+    so a port behaves like a real 9600 baud line.
+    """
+    from ekmpoller import PortSupervisor
+    port_names = startFakeMeters(max_ports, baud)
+    print("Supervised poll, %d V4 meters per port, A+B reads, %d baud lines" % (meters_per_port, baud))
+    print("%5s %10s %12s %10s" % ("ports", "poll ms", "meters/sec", "scaling"))
+    single_rate = None
+    ports = 1
+    while ports <= max_ports:
+        supervisor = PortSupervisor(60)
+        for i, name in enumerate(port_names[:ports]):
+            supervisor.addPort(name, [300000001 + 100 * i + m for m in range(meters_per_port)], b_every=1)
+        supervisor.start()
+        supervisor.pollAll(0)       # warm up timing models
+        start = time.perf_counter()
+        meters = 0
+        for interval in range(1, polls + 1):
+            meters += sum(reading.ok for reading in supervisor.pollAll(interval))
+        elapsed = time.perf_counter() - start
+        supervisor.stop()
+        rate = meters / elapsed
+        if single_rate is None:
+            single_rate = rate
+        print("%5d %10.0f %12.1f %9.2fx" % (ports, elapsed * 1000.0 / polls, rate, rate / single_rate))
+        ports *= 2
+
+
+def benchReplay(capture_file, repeats=10):
+    """ Re-run the A and B reads of a serial capture at maximum speed.
+
+    Every read request in the capture is issued again through the meter
+    classes, so the figures cover the whole read path (framing, CRC and
+    decode) on real meter data, identically from run to run.
+    """
+    reads = []
+    for _, direction, data in read_capture(capture_file):
+        if direction != capture_write or data[:2] != b"/?" or data[-3:] != b"!\r\n":
+            continue
+        address = data[2:-3].decode('ascii')
+        if len(address) == 14:
+            reads.append((address[:12], address[12:]))
+        elif len(address) == 12:
+            reads.append((address, None))
+    if not reads:
+        print("No meter reads in %s" % capture_file)
+        return
+    good = 0
+    start = time.perf_counter()
+    for _ in range(repeats):
+        port = ReplaySerialPort(capture_file, realtime=False)
+        port.initPort()
+        meters = {}
+        for address, block in reads:
+            if address not in meters:
+                meters[address] = V4Meter(address, port) if block is not None else V3Meter(address, port)
+            meter = meters[address]
+            if block is None:
+                good += meter.request()
+            elif block == "00":
+                good += meter.requestA()
+            else:
+                good += meter.requestB()
+        port.closePort()
+    elapsed = time.perf_counter() - start
+    print("Replay of %s: %d reads x %d, %d good, %.1f us per read" %
+          (capture_file, len(reads), repeats, good, elapsed * 1e6 / (len(reads) * repeats)))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark ekmmeters frame handling.')
+    parser.add_argument('-n', '--frames', type=int, default=20000, help='Number of frames per test.')
+    parser.add_argument('-p', '--ports', type=int, default=0,
+                        help='Also benchmark supervised polling of up to this many FakeEKM ports.')
+    parser.add_argument('-R', '--replay', dest='replay', action='store',
+                        help='Also benchmark the reads recorded in this serial capture file.')
+    args = parser.parse_args()
+    benchDecode(args.frames)
+    benchLazy(args.frames)
+    if args.ports > 0:
+        benchPorts(args.ports)
+    if args.replay is not None:
+        benchReplay(args.replay)
@@ -0,0 +1,606 @@
+""" ekmasync.py
+
+asyncio counterparts of the ekmmeters SerialPort and V4Meter classes.
+
+The port is opened with pyserial exactly like SerialPort (device files or
+socket:// URLs) but never blocks the event loop: reception waits on the
+port's file descriptor or socket with loop.add_reader(), and writes wait out
+their wire time with asyncio.sleep().  One event loop can then drive several
+ports alongside database and MQTT I/O.
+
+Framing, CRC accumulation, learned timing, command building and response
+parsing are the SerialPort and V4Meter methods themselves; only the waits
+are different, so reads decode identically in both worlds.
+
+    async with AsyncSerialPort('/dev/ttyUSB0') as port:
+        meter = AsyncV4Meter('000300000001', port)
+        if await meter.request():
+            print(meter.getField(Field.kWh_Tot))
+
+This software is provided under an MIT license:
+    https://opensource.org/licenses/MIT
+"""
+import asyncio
+import datetime
+import sys
+import time
+import traceback
+
+from ekmmeters import (SerialPort, V4Meter, MeterSession, ReadMonths, ReadSchedules,
+                       termination_command, capture_write, ekm_log)
+
+
+class BusLock(object):
+    """ Task reentrant lock held for a complete exchange with one meter.
+
+    Meters sharing a port take it around each command (and around a whole
+    session), so exchanges from concurrent tasks are not interleaved on the
+    bus.  Nested commands in the same task, such as the opening read inside
+    setRelay(), pass straight through.
+    """
+
+    def __init__(self):
+        self.m_lock = asyncio.Lock()
+        self.m_owner = None
+        self.m_depth = 0
+        pass
+
+    async def __aenter__(self):
+        task = asyncio.current_task()
+        if self.m_owner is not task:
+            await self.m_lock.acquire()
+            self.m_owner = task
+        self.m_depth += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, exc_traceback):
+        self.m_depth -= 1
+        if self.m_depth == 0:
+            self.m_owner = None
+            self.m_lock.release()
+        return False
+
+
+class AsyncSerialPort(SerialPort):
+    """ SerialPort whose waits are asyncio coroutines.
+
+    initPort(), write(), getResponseBytes() and getResponse() must be awaited.
+    Use with :class:`~ekmasync.AsyncV4Meter`, not with the blocking meter
+    classes.
+    """
+
+    def __init__(self, ttyport, baudrate=9600, force_wait=0.1, event_driven=True, adaptive=True):
+        """
+        Args:
+            ttyport (str): port name, ex 'COM3' '/dev/ttyUSB0' 'socket://host:port'
+            baudrate (int): optional, 9600 default and recommended
+            force_wait(float) : optional post commnd sleep, if required
+            event_driven (bool): optional, wait on the port handle with
+                loop.add_reader() instead of polling every force_wait seconds.
+            adaptive (bool): optional, learned per meter timing.
+        """
+        super(AsyncSerialPort, self).__init__(ttyport, baudrate, force_wait, event_driven, adaptive)
+        self.m_bus_lock = BusLock()
+        pass
+
+    async def __aenter__(self):
+        await self.initPort()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, exc_traceback):
+        self.closePort()
+        return False
+
+    async def initPort(self):
+        """ Open the port and let it settle without blocking the loop.
+
+        Returns:
+            bool: True if the port is open.
+        """
+        if self.m_ser is not None:
+            return True
+        try:
+            self.openSerial()
+            await asyncio.sleep(self.m_init_wait)
+            return True
+        except:
+            ekm_log(traceback.format_exc(sys.exc_info()))
+
+        return False
+
+    async def write(self, output):
+        """ Write a block and wait out its wire time.
+
+        No flush(): on posix ports it blocks in tcdrain().  Commands are
+        short enough to go straight into the driver buffer, and the wait
+        after the write covers their time on the wire.
+
+        Args:
+            output (str): Block to write to port
+        """
+        view_str = self.encodeOutput(output)
+        if view_str is None:
+            return False
+        if (len(view_str) > 0):
+            self.recordWrite(view_str)
+            write_start = time.monotonic()
+            self.m_ser.write(view_str)
+            if self.m_capture is not None:
+                self.m_capture.record(capture_write, view_str)
+            wait = self.getWriteWait(len(view_str), time.monotonic() - write_start)
+            if self.m_adaptive:
+                await asyncio.sleep(wait)
+                self.m_write_done = time.monotonic()
+            else:
+                self.m_write_done = time.monotonic()
+                await asyncio.sleep(wait)
+        return True
+
+    async def waitForData(self, timeout):
+        """ Wait until bytes are available or timeout expires.
+
+        Falls back to sleeping one force_wait polling interval when the port
+        has no selectable handle or the event loop has no add_reader()
+        (Windows proactor loop).
+
+        Args:
+            timeout (float): Longest wait in seconds.
+
+        Returns:
+            bool: True if data may be available.
+        """
+        if timeout <= 0:
+            return False
+        handle = self.getReadHandle() if self.m_event_driven else None
+        loop = asyncio.get_running_loop()
+        if handle is not None:
+            ready = loop.create_future()
+            try:
+                loop.add_reader(handle, lambda: ready.done() or ready.set_result(True))
+            except (NotImplementedError, OSError, ValueError):
+                handle = None
+        if handle is None:
+            await asyncio.sleep(min(self.m_force_wait, timeout))
+            return True
+        try:
+            await asyncio.wait_for(ready, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            loop.remove_reader(handle)
+
+    async def getResponseBytes(self, context="", maxBytes=255):
+        """ Wait for finished block or first byte ACK, as bytes.
+
+        See :func:`~ekmmeters.SerialPort.getResponseBytes`.
+
+        Args:
+            context (str): internal serial call context.
+            maxBytes (int): Length of complete response.
+
+        Returns:
+            bytes: Complete response, one byte ACK or NAK, or empty on timeout.
+        """
+        deadline = self.beginResponse(maxBytes)
+        try:
+            while True:
+                response = self.readResponseChunk()
+                if response is not None:
+                    await asyncio.sleep(self.getResponseGap())
+                    return response
+                if not await self.waitForData(deadline - time.monotonic()):
+                    break
+            self.endResponseTimeout()
+
+        except:
+            ekm_log(traceback.format_exc(sys.exc_info()))
+
+        return b""
+
+    async def getResponse(self, context="", maxBytes=255):
+        """ Wait for finished block or first byte ACK.
+
+        See :func:`~ekmmeters.SerialPort.getResponse`.
+
+        Args:
+            context (str): internal serial call context.
+            maxBytes (int): Length of complete response.
+
+        Returns:
+            string: Response; ACK and NAK as "06" and "15"; empty string on timeout.
+        """
+        return self.responseString(await self.getResponseBytes(context, maxBytes))
+
+
+class AsyncMeterSession(MeterSession):
+    """ :class:`~ekmmeters.MeterSession` for an AsyncV4Meter.
+
+    Used in an "async with" statement; holds the port bus lock for the
+    whole session.
+    """
+
+    async def __aenter__(self):
+        await self.m_meter.m_serial_port.m_bus_lock.__aenter__()
+        try:
+            await self.open()
+        except:
+            await self.m_meter.m_serial_port.m_bus_lock.__aexit__(None, None, None)
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, exc_traceback):
+        try:
+            await self.close()
+        finally:
+            await self.m_meter.m_serial_port.m_bus_lock.__aexit__(None, None, None)
+        return False
+
+    async def open(self):
+        """ Issue the opening read and start covering commands.
+
+        Returns:
+            bool: True if the opening read succeeded.
+        """
+        self.m_meter.m_session = None
+        open_read = self.m_open_read if self.m_open_read is not None else self.m_meter.openMeter
+        self.m_opened = bool(await open_read())
+        self.m_auth_password = None
+        self.m_active = True
+        self.m_meter.m_session = self
+        return self.m_opened
+
+    async def close(self):
+        """ Send the one termination string for the session. """
+        if not self.m_active:
+            return
+        self.m_active = False
+        self.m_meter.m_session = None
+        await self.m_meter.serialPostEnd()
+
+
+def blocking_command(name):
+    """ Stand-in for a blocking V4Meter set command on :class:`~ekmasync.AsyncV4Meter`.
+
+    The inherited command would call the port coroutines without awaiting
+    them and quietly return False.
+
+    Args:
+        name (str): Command method name.
+
+    Returns:
+        function: Method raising TypeError.
+    """
+    def command(self, *args, **kwargs):
+        raise TypeError("%s is not available on AsyncV4Meter, use the blocking V4Meter" % name)
+    command.__name__ = name
+    command.__doc__ = "Not available on AsyncV4Meter; raises TypeError."
+    return command
+
+
+class AsyncV4Meter(V4Meter):
+    """ V4Meter whose serial commands are asyncio coroutines.
+
+    Attach an :class:`~ekmasync.AsyncSerialPort`.  The reads (request,
+    requestA, requestB, openRead, readSettings and the individual settings reads),
+    setRelay, setTime and setTimeFromDateTime must be awaited; field access,
+    lazy decoding, observers, getReading() and insert() are the V4Meter
+    methods.  Other V4Meter set commands raise TypeError; use the blocking
+    V4Meter for them.
+    """
+
+    setMaxDemandPeriod = blocking_command("setMaxDemandPeriod")
+    setMaxDemandResetInterval = blocking_command("setMaxDemandResetInterval")
+    setMaxDemandResetNow = blocking_command("setMaxDemandResetNow")
+    setMeterPassword = blocking_command("setMeterPassword")
+    setCTRatio = blocking_command("setCTRatio")
+    setScheduleTariffs = blocking_command("setScheduleTariffs")
+    setSeasonSchedules = blocking_command("setSeasonSchedules")
+    setHolidayDates = blocking_command("setHolidayDates")
+    setWeekendHolidaySchedules = blocking_command("setWeekendHolidaySchedules")
+    setLCDCmd = blocking_command("setLCDCmd")
+    setLCD = blocking_command("setLCD")
+    setPulseInputRatio = blocking_command("setPulseInputRatio")
+    setPulseOutputRatio = blocking_command("setPulseOutputRatio")
+    setZeroResettableKWH = blocking_command("setZeroResettableKWH")
+
+    def session(self, password="00000000", open_read=None):
+        """ Batch commands in one open/authenticate/close exchange.
+
+        Use as "async with meter.session() as session:".
+
+        Args:
+            password (str): Password for commands in the session.
+            open_read (function): Optional opening read coroutine function.
+
+        Returns:
+            AsyncMeterSession: Session context manager.
+        """
+        return AsyncMeterSession(self, password, open_read)
+
+    async def openMeter(self):
+        if self.sessionSkip("open"):
+            return True
+        result = await self.openRead()
+        if self.m_session is not None:
+            self.m_session.opened(result)
+        return result
+
+    async def openRead(self):
+        """ A read opening a command exchange, without decoding the frame.
+
+        See :func:`~ekmmeters.V4Meter.openRead`.
+
+        Returns:
+            bool: True if CRC match at end of call.
+        """
+        async with self.m_serial_port.m_bus_lock:
+            work_context = self.getContext()
+            self.setContext("openMeter")
+            for attempt in range(self.m_read_retries + 1):
+                await self.m_serial_port.write(self.buildReadCommand("00"))
+                if self.finishOpenRead(await self.m_serial_port.getResponseBytes(self.getContext())) or not self.retryRead(attempt):
+                    break
+            self.setContext(work_context)
+        return self.m_a_crc
+
+    async def request(self, send_terminator=False):
+        """ Combined A and B read for V4 meter.
+
+        Args:
+            send_terminator (bool): Send termination string at end of read.
+
+        Returns:
+            bool: True on completion.
+        """
+        async with self.m_serial_port.m_bus_lock:
+            try:
+                if await self.requestA() and await self.requestB():
+                    self.finishReadAB()
+                    if send_terminator:
+                        await self.serialPostEnd()
+                    return True
+            except:
+                ekm_log(traceback.format_exc(sys.exc_info()))
+
+        return False
+
+    async def requestA(self):
+        """Issue an A read on V4 meter.
+
+        Returns:
+            bool: True if CRC match at end of call.
+        """
+        async with self.m_serial_port.m_bus_lock:
+            work_context = self.getContext()
+            self.setContext("request[v4A]")
+            for attempt in range(self.m_read_retries + 1):
+                await self.m_serial_port.write(self.buildReadCommand("00"))
+                if self.finishReadA(await self.m_serial_port.getResponseBytes(self.getContext())) or not self.retryRead(attempt):
+                    break
+            self.setContext(work_context)
+        return self.m_a_crc
+
+    async def requestB(self):
+        """ Issue a B read on V4 meter.
+
+        Returns:
+            bool: True if CRC match at end of call.
+        """
+        async with self.m_serial_port.m_bus_lock:
+            work_context = self.getContext()
+            self.setContext("request[v4B]")
+            for attempt in range(self.m_read_retries + 1):
+                await self.m_serial_port.write(self.buildReadCommand("01"))
+                if self.finishReadB(await self.m_serial_port.getResponseBytes(self.getContext())) or not self.retryRead(attempt):
+                    break
+            self.setContext(work_context)
+        return self.m_b_crc
+
+    async def serialPostEnd(self):
+        """ Send termination string to implicit current meter."""
+        if self.sessionSkip("end"):
+            return
+        ekm_log("Termination string sent (" + self.m_context + ")")
+
+        try:
+            await self.m_serial_port.write(termination_command)
+        except:
+            ekm_log(traceback.format_exc(sys.exc_info()))
+
+    async def serialCmdPwdAuth(self, password_str):
+        """ Password step of set commands, see :func:`~ekmmeters.Meter.serialCmdPwdAuth`.
+
+        Args:
+            password_str (str): Required password.
+
+        Returns:
+            bool: True on completion and ACK.
+        """
+        result = False
+        if self.sessionSkip("auth", password_str):
+            return True
+        try:
+            await self.m_serial_port.write(self.buildPasswordCommand(password_str))
+            result = self.passwordAccepted(await self.m_serial_port.getResponse(self.getContext()),
+                                           password_str)
+        except:
+            ekm_log("Password call failure by exception(" + self.getContext() + ")")
+
+            ekm_log(traceback.format_exc(sys.exc_info()))
+
+        return result
+
+    async def setCommand(self, context, req_cmd, password, success_msg):
+        """ Open, authenticate, send one set command and terminate.
+
+        Args:
+            context (str): Command context.
+            req_cmd (bytes): Command from one of the build methods.
+            password (str): Password.
+            success_msg (str): Command message on ACK.
+
+        Returns:
+            bool: True on completion and ACK.
+        """
+        result = False
+        async with self.m_serial_port.m_bus_lock:
+            try:
+                if not await self.openMeter():
+                    self.writeCmdMsg("Initiate connection to meter failed.")
+                else:
+                    if not await self.serialCmdPwdAuth(password):
+                        self.writeCmdMsg("Password failure")
+                    else:
+                        await self.m_serial_port.write(req_cmd)
+                        if await self.m_serial_port.getResponse(context) == "06":
+                            self.writeCmdMsg(success_msg)
+                            result = True
+                await self.serialPostEnd()
+            except:
+                ekm_log(traceback.format_exc(sys.exc_info()))
+
+        self.setContext("")
+        return result
+
+    async def setRelay(self, seconds, relay, status, password="00000000"):
+        """Serial call to set relay, see :func:`~ekmmeters.V4Meter.setRelay`.
+
+        Args:
+            seconds (int): Seconds to hold, ero is hold forever. See :class:`~ekmmeters.RelayInterval`.
+            relay (int): Selected relay, see :class:`~ekmmeters.Relay`.
+            status (int): Status to set, see :class:`~ekmmeters.RelayState`
+            password (str): Optional password
+
+        Returns:
+            bool: True on completion and ACK.
+        """
+        self.setContext("setRelay")
+        self.clearCmdMsg()
+        error_msg = self.checkRelayArgs(seconds, password)
+        if error_msg:
+            self.writeCmdMsg(error_msg)
+            self.setContext("")
+            return False
+        return await self.setCommand("setRelay", self.buildRelayCommand(seconds, relay, status),
+                                     password, "Success: 06 returned.")
+
+    async def setTime(self, yy, mm, dd, hh, minutes, ss, password="00000000"):
+        """ Serial set time with day of week calculation, see :func:`~ekmmeters.Meter.setTime`.
+
+        Args:
+            yy (int): Last two digits of year.
+            mm (int): Month 1-12.
+            dd (int): Day 1-31
+            hh (int): Hour 0 to 23.
+            minutes (int): Minutes 0 to 59.
+            ss (int): Seconds 0 to 59.
+            password (str): Optional password.
+
+        Returns:
+            bool: True on completion and ACK.
+        """
+        self.setContext("setTime")
+        error_msg = self.checkTimeArgs(yy, mm, dd, hh, minutes, ss, password)
+        if error_msg:
+            self.writeCmdMsg(error_msg)
+            self.setContext("")
+            return False
+        return await self.setCommand("setTime", self.buildTimeCommand(yy, mm, dd, hh, minutes, ss),
+                                     password, "Success(setTime): 06 returned.")
+
+    async def setTimeFromDateTime(self, theDateTime=None, password="00000000"):
+        """ Set meter time from a datetime, default now.
+
+        Args:
+            theDateTime (datetime): Time to set.
+            password (str): Optional password.
+
+        Returns:
+            bool: True on completion and ACK.
+        """
+        if theDateTime is None:
+            theDateTime = datetime.datetime.now()
+        return await self.setTime(theDateTime.year,
+                                  theDateTime.month,
+                                  theDateTime.day,
+                                  theDateTime.hour,
+                                  theDateTime.minute,
+                                  theDateTime.second,
+                                  password)
+
+    async def settingsRead(self, context, req_cmd, work_table):
+        """ Open, send one settings read, terminate and decode the response.
+
+        Args:
+            context (str): Command context.
+            req_cmd (bytes): Command from one of the build methods.
+            work_table (SerialBlock): Settings buffer.
+
+        Returns:
+            bool: True on CRC match.
+        """
+        self.setContext(context)
+        result = False
+        async with self.m_serial_port.m_bus_lock:
+            try:
+                if not await self.openMeter():
+                    self.writeCmdMsg("Initiate connection to meter failed.")
+                else:
+                    await self.m_serial_port.write(req_cmd)
+                    raw_ret = await self.m_serial_port.getResponse(self.getContext())
+                    await self.serialPostEnd()
+                    result = work_table is not None and self.finishSettingsRead(raw_ret, work_table)
+            except:
+                ekm_log(traceback.format_exc(sys.exc_info()))
+
+        if result:
+            ekm_log(context + " CRC success")
+        self.setContext("")
+        return result
+
+    async def readHolidayDates(self):
+        """ Serial call to read holiday dates into meter object buffer.
+
+        Returns:
+            bool: True on completion.
+        """
+        return await self.settingsRead("readHolidayDates", self.buildHolidayDatesRead(), self.m_hldy)
+
+    async def readMonthTariffs(self, months_type):
+        """ Serial call to read month tariffs block into meter object buffer.
+
+        Args:
+            months_type (int): A :class:`~ekmmeters.ReadMonths` value.
+
+        Returns:
+            bool: True on completion.
+        """
+        req_cmd, work_table = self.buildMonthTariffsRead(months_type)
+        return await self.settingsRead("readMonthTariffs", req_cmd, work_table)
+
+    async def readScheduleTariffs(self, tableset):
+        """ Serial call to read schedule tariffs buffer
+
+        Args:
+            tableset (int): :class:`~ekmmeters.ReadSchedules` buffer to return.
+
+        Returns:
+            bool: True on completion and ACK.
+        """
+        req_cmd, work_table = self.buildScheduleTariffsRead(tableset)
+        return await self.settingsRead("readScheduleTariffs", req_cmd, work_table)
+
+    async def readSettings(self):
+        """Recommended call to read all meter settings at once.
+
+        Returns:
+            bool: True if all subsequent serial calls completed with ACK.
+        """
+        async with self.m_serial_port.m_bus_lock:
+            success = (await self.readHolidayDates() and
+                       await self.readMonthTariffs(ReadMonths.kWh) and
+                       await self.readMonthTariffs(ReadMonths.kWhReverse) and
+                       await self.readScheduleTariffs(ReadSchedules.Schedules_1_To_4) and
+                       await self.readScheduleTariffs(ReadSchedules.Schedules_5_To_8))
+        return success
@@ -0,0 +1,256 @@
+""" ekmbulk.py
+
+Batch operations on archived raw Omnimeter frames using NumPy.
+
+Frames are the 255 byte V3, V4 A and V4 B responses saved by ReadEKM in the
+<meter>_a_rawmeterdata and <meter>_b_rawmeterdata tables.  Everything here
+works on an N x 255 uint8 array with one frame per row, so a year of minute
+data is handled in a handful of vector operations per byte position instead
+of one Python loop per frame.
+
+This software is provided under an MIT license:
+    https://opensource.org/licenses/MIT
+"""
+import numpy as np
+
+from ekmmeters import crc16_table, Field, FieldType, ScaleType, V3Meter, V4Meter
+
+FRAME_LEN = 255
+STX = 0x02
+
+crc16_table_np = np.array(crc16_table, dtype=np.uint16)
+
+
+def frames_from_rows(rows, frame_len=FRAME_LEN):
+    """ Pack raw frames into an N x frame_len uint8 array.
+
+    Rows which are not exactly frame_len long are left zero filled, so they
+    fail :func:`verify_frames` rather than shifting the rest of the batch.
+
+    Args:
+        rows (iterable): bytes, bytearray or str frames (e.g. MeterData column).
+        frame_len (int): Expected frame length.
+
+    Returns:
+        numpy.ndarray: uint8 array, one frame per row.
+    """
+    rows = list(rows)
+    frames = np.zeros((len(rows), frame_len), dtype=np.uint8)
+    for i, row in enumerate(rows):
+        if isinstance(row, str):
+            row = row.encode('ascii', 'replace')
+        if row is not None and len(row) == frame_len:
+            frames[i] = np.frombuffer(row, dtype=np.uint8)
+    return frames
+
+
+def crc16_frames(frames):
+    """ Calculate the Omnimeter CRC of every frame at once.
+
+    The CRC covers each frame from the byte after STX up to the two CRC
+    bytes, same as :func:`ekmmeters.calc_crc16` on frame[1:-2].  The loop
+    runs over byte positions; every step is one vector operation on all rows.
+
+    Args:
+        frames (numpy.ndarray): N x 255 uint8 array.
+
+    Returns:
+        numpy.ndarray: uint16 CRC per row, in the byte order sent by the meter.
+    """
+    frames = np.asarray(frames, dtype=np.uint8)
+    # Column major copy so each byte position is contiguous.
+    columns = np.asfortranarray(frames)
+    crc = np.full(frames.shape[0], 0xffff, dtype=np.uint16)
+    for pos in range(1, frames.shape[1] - 2):
+        crc = (crc >> 8) ^ crc16_table_np[(crc ^ columns[:, pos]) & 0xff]
+    crc = ((crc << 8) | (crc >> 8)) & 0x7F7F
+    return crc
+
+
+def sent_crc16_frames(frames):
+    """ CRC carried in the last two bytes of every frame.
+
+    Args:
+        frames (numpy.ndarray): N x 255 uint8 array.
+
+    Returns:
+        numpy.ndarray: uint16 CRC per row.
+    """
+    frames = np.asarray(frames, dtype=np.uint8)
+    return (frames[:, -2].astype(np.uint16) << 8) | frames[:, -1]
+
+
+def verify_frames(frames):
+    """ Check CRC and start byte of every frame.
+
+    Args:
+        frames (numpy.ndarray): N x 255 uint8 array.
+
+    Returns:
+        numpy.ndarray: bool mask, True where the frame is valid.
+    """
+    frames = np.asarray(frames, dtype=np.uint8)
+    if frames.shape[0] == 0:
+        return np.zeros(0, dtype=bool)
+    return (frames[:, 0] == STX) & (crc16_frames(frames) == sent_crc16_frames(frames))
+
+
+def read_block(data_type):
+    """ Serial block definition for a DataType value stored by ReadEKM.
+
+    Args:
+        data_type (str): 'V4A', 'V4B' or 'V3'.
+
+    Returns:
+        SerialBlock: Block definition to pass to :func:`decode_frames`.
+    """
+    if data_type == 'V4A':
+        return V4Meter().m_blk_a
+    if data_type == 'V4B':
+        return V4Meter().m_blk_b
+    if data_type == 'V3':
+        return V3Meter().m_blk_a
+    raise ValueError('Unknown data type: %s' % data_type)
+
+
+def ascii_to_int(digits):
+    """ Vectorized int() of fixed width ASCII number fields.
+
+    Leading blanks and a sign are allowed, as with int() on one field.
+
+    Args:
+        digits (numpy.ndarray): N x width uint8 array of ASCII bytes.
+
+    Returns:
+        tuple: (int64 values, bool mask of rows which parsed).
+    """
+    width = digits.shape[1]
+    values = digits - np.uint8(0x30)    # wraps below '0', so one compare finds digits
+    is_digit = values <= 9
+    is_minus = digits == 0x2d
+    is_other_ok = (digits == 0x20) | is_minus | (digits == 0x2b)
+    ok = np.all(is_digit | is_other_ok, axis=1) & np.any(is_digit, axis=1)
+    values[~is_digit] = 0
+    powers = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+    result = values.astype(np.int64) @ powers
+    negative = np.any(is_minus, axis=1)
+    result[negative] = -result[negative]
+    return result, ok
+
+
+def kwh_divisors(kwh_scale):
+    """ kWh divisor per row from ScaleKWH values.
+
+    Args:
+        kwh_scale (numpy.ndarray): ScaleKWH value per row.
+
+    Returns:
+        numpy.ndarray: float64 divisor per row (1, 10 or 100).
+    """
+    kwh_scale = np.asarray(kwh_scale)
+    divisors = np.ones(kwh_scale.shape, dtype=np.float64)
+    divisors[kwh_scale == 1] = 10.0
+    divisors[kwh_scale == 2] = 100.0
+    return divisors
+
+
+def decode_frames(frames, def_buf, kwh_scale=None):
+    """ Decode every field of many frames into NumPy columns.
+
+    Int fields become int64 and Float fields float64, scaled like
+    :func:`ekmmeters.Meter.convertData`.  kWh fields use the kWh_Scale of
+    each row when the block has one (V4 A, V3), otherwise kwh_scale.
+    Hex fields are returned as N x size uint8 arrays, String and PowerFactor
+    fields as fixed width bytes ('S' dtype) arrays.  Unparseable numbers are 0 (Int) or NaN (Float) and
+    clear the row in the returned ok mask.
+
+    Args:
+        frames (numpy.ndarray): N x 255 uint8 array.
+        def_buf (SerialBlock): Block definition, see :func:`read_block`.
+        kwh_scale (int): ScaleKWH value, scalar or per row, for blocks
+            without a kWh_Scale field.  Default no scaling.
+
+    Returns:
+        tuple: (dict of field name to column array, bool ok mask per row).
+    """
+    frames = np.asarray(frames, dtype=np.uint8)
+    count = frames.shape[0]
+    layout = def_buf.layout()
+    columns = {}
+    ok = np.ones(count, dtype=bool)
+
+    if layout.m_scale_index is not None:
+        offset, size = layout.m_offsets[Field.kWh_Scale]
+        kwh_scale = ascii_to_int(frames[:, offset:offset + size])[0]
+    elif kwh_scale is None:
+        kwh_scale = 0
+    kwh_divisor = kwh_divisors(np.broadcast_to(kwh_scale, (count,)))
+    fixed_divisors = {ScaleType.Div10: 10.0, ScaleType.Div100: 100.0}
+
+    for i, fld in enumerate(layout.m_fields):
+        fld_type, fld_scale = layout.m_types[i]
+        offset, size = layout.m_offsets[fld]
+        raw = frames[:, offset:offset + size]
+        if fld_type == FieldType.Int:
+            values, fld_ok = ascii_to_int(raw)
+            columns[fld] = values
+            ok &= fld_ok
+        elif fld_type == FieldType.Float:
+            values, fld_ok = ascii_to_int(raw)
+            values = values.astype(np.float64)
+            if fld_scale == ScaleType.KWH:
+                values /= kwh_divisor
+            elif fld_scale in fixed_divisors:
+                values /= fixed_divisors[fld_scale]
+            values[~fld_ok] = np.nan
+            columns[fld] = values
+            ok &= fld_ok
+        elif fld_type == FieldType.Hex:
+            columns[fld] = raw.copy()
+        else:
+            columns[fld] = np.ascontiguousarray(raw).view('S%d' % size).reshape(count)
+    return columns, ok
+
+
+def iter_cursor_frames(cursor, batch_size=50000, column=0):
+    """ Stream raw frames from a DB API cursor in N x 255 batches.
+
+    Args:
+        cursor: Executed DB API cursor, e.g. SELECT MeterData FROM ...
+        batch_size (int): Rows fetched per batch.
+        column (int): Index of the raw frame column in each row.
+
+    Yields:
+        numpy.ndarray: uint8 frames array per batch.
+    """
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield frames_from_rows(row[column] for row in rows)
+
+
+def decode_cursor(cursor, def_buf, batch_size=50000, column=0, kwh_scale=None):
+    """ Decode all raw frames of a DB API cursor into NumPy columns.
+
+    Frames which fail :func:`verify_frames` are dropped.
+
+    Args:
+        cursor: Executed DB API cursor, e.g. SELECT MeterData FROM ...
+        def_buf (SerialBlock): Block definition, see :func:`read_block`.
+        batch_size (int): Rows fetched per batch.
+        column (int): Index of the raw frame column in each row.
+        kwh_scale (int): See :func:`decode_frames`.
+
+    Returns:
+        dict: Field name to column array over all valid frames.
+    """
+    batches = []
+    for frames in iter_cursor_frames(cursor, batch_size, column):
+        frames = frames[verify_frames(frames)]
+        columns, ok = decode_frames(frames, def_buf, kwh_scale)
+        batches.append(dict((fld, values[ok]) for fld, values in columns.items()))
+    if not batches:
+        columns, ok = decode_frames(np.zeros((0, FRAME_LEN), dtype=np.uint8), def_buf, kwh_scale)
+        return columns
+    return dict((fld, np.concatenate([batch[fld] for batch in batches])) for fld in batches[0])
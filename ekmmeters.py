@@ -11,7 +11,11 @@ This software is provided under an MIT license:
 """
 import struct
 import time
+import select
+import math
+import bisect
 from collections import OrderedDict
+from collections import deque
 from collections import namedtuple
 from datetime import date, datetime
 import sqlite3
@@ -88,8 +92,103 @@ def ekm_set_log_level(level=3):
     ekmmeters_log_level = level
     pass
 
+crc16_table = (0x0000, 0xc0c1, 0xc181, 0x0140, 0xc301, 0x03c0, 0x0280, 0xc241,
+               0xc601, 0x06c0, 0x0780, 0xc741, 0x0500, 0xc5c1, 0xc481, 0x0440,
+               0xcc01, 0x0cc0, 0x0d80, 0xcd41, 0x0f00, 0xcfc1, 0xce81, 0x0e40,
+               0x0a00, 0xcac1, 0xcb81, 0x0b40, 0xc901, 0x09c0, 0x0880, 0xc841,
+               0xd801, 0x18c0, 0x1980, 0xd941, 0x1b00, 0xdbc1, 0xda81, 0x1a40,
+               0x1e00, 0xdec1, 0xdf81, 0x1f40, 0xdd01, 0x1dc0, 0x1c80, 0xdc41,
+               0x1400, 0xd4c1, 0xd581, 0x1540, 0xd701, 0x17c0, 0x1680, 0xd641,
+               0xd201, 0x12c0, 0x1380, 0xd341, 0x1100, 0xd1c1, 0xd081, 0x1040,
+               0xf001, 0x30c0, 0x3180, 0xf141, 0x3300, 0xf3c1, 0xf281, 0x3240,
+               0x3600, 0xf6c1, 0xf781, 0x3740, 0xf501, 0x35c0, 0x3480, 0xf441,
+               0x3c00, 0xfcc1, 0xfd81, 0x3d40, 0xff01, 0x3fc0, 0x3e80, 0xfe41,
+               0xfa01, 0x3ac0, 0x3b80, 0xfb41, 0x3900, 0xf9c1, 0xf881, 0x3840,
+               0x2800, 0xe8c1, 0xe981, 0x2940, 0xeb01, 0x2bc0, 0x2a80, 0xea41,
+               0xee01, 0x2ec0, 0x2f80, 0xef41, 0x2d00, 0xedc1, 0xec81, 0x2c40,
+               0xe401, 0x24c0, 0x2580, 0xe541, 0x2700, 0xe7c1, 0xe681, 0x2640,
+               0x2200, 0xe2c1, 0xe381, 0x2340, 0xe101, 0x21c0, 0x2080, 0xe041,
+               0xa001, 0x60c0, 0x6180, 0xa141, 0x6300, 0xa3c1, 0xa281, 0x6240,
+               0x6600, 0xa6c1, 0xa781, 0x6740, 0xa501, 0x65c0, 0x6480, 0xa441,
+               0x6c00, 0xacc1, 0xad81, 0x6d40, 0xaf01, 0x6fc0, 0x6e80, 0xae41,
+               0xaa01, 0x6ac0, 0x6b80, 0xab41, 0x6900, 0xa9c1, 0xa881, 0x6840,
+               0x7800, 0xb8c1, 0xb981, 0x7940, 0xbb01, 0x7bc0, 0x7a80, 0xba41,
+               0xbe01, 0x7ec0, 0x7f80, 0xbf41, 0x7d00, 0xbdc1, 0xbc81, 0x7c40,
+               0xb401, 0x74c0, 0x7580, 0xb541, 0x7700, 0xb7c1, 0xb681, 0x7640,
+               0x7200, 0xb2c1, 0xb381, 0x7340, 0xb101, 0x71c0, 0x7080, 0xb041,
+               0x5000, 0x90c1, 0x9181, 0x5140, 0x9301, 0x53c0, 0x5280, 0x9241,
+               0x9601, 0x56c0, 0x5780, 0x9741, 0x5500, 0x95c1, 0x9481, 0x5440,
+               0x9c01, 0x5cc0, 0x5d80, 0x9d41, 0x5f00, 0x9fc1, 0x9e81, 0x5e40,
+               0x5a00, 0x9ac1, 0x9b81, 0x5b40, 0x9901, 0x59c0, 0x5880, 0x9841,
+               0x8801, 0x48c0, 0x4980, 0x8941, 0x4b00, 0x8bc1, 0x8a81, 0x4a40,
+               0x4e00, 0x8ec1, 0x8f81, 0x4f40, 0x8d01, 0x4dc0, 0x4c80, 0x8c41,
+               0x4400, 0x84c1, 0x8581, 0x4540, 0x8701, 0x47c0, 0x4680, 0x8641,
+               0x8201, 0x42c0, 0x4380, 0x8341, 0x4100, 0x81c1, 0x8081, 0x4040)
+
+
+class Crc16(object):
+    """ Incremental 16 bit CRC per EKM Omnimeters.
+
+    Lets a frame be checked as its chunks arrive from the port, so the
+    verdict is ready when the last byte lands.  Interface follows hashlib.
+    """
+
+    def __init__(self, buf=b""):
+        """
+        Args:
+            buf (bytes): Optional initial data.
+        """
+        self.m_crc = 0xffff
+        self.m_count = 0
+        if buf:
+            self.update(buf)
+        pass
+
+    def update(self, buf):
+        """ Add bytes to the running CRC.
+
+        Args:
+            buf (bytes): Bytes or bytearray chunk.
+        """
+        crc = self.m_crc
+        table = crc16_table
+        for c in buf:
+            crc = (crc >> 8) ^ table[(crc ^ c) & 0xff]
+        self.m_crc = crc
+        self.m_count += len(buf)
+
+    def digest(self):
+        """ CRC of all bytes so far, in frame byte order.
+
+        Returns:
+            bytes: 2 byte CRC as sent by the meter.
+        """
+        crc = self.m_crc
+        crc = ((crc << 8) | (crc >> 8)) & 0x7F7F
+        return struct.pack(">H", crc)
+
+    def hexdigest(self):
+        """ CRC of all bytes so far.
+
+        Returns:
+            str: 16 bit CRC formatted as hex string.
+        """
+        return "%04x" % (((self.m_crc << 8) | (self.m_crc >> 8)) & 0x7F7F)
+
+    def copy(self):
+        """ Independent copy of the running CRC.
+
+        Returns:
+            Crc16: Copy in same state.
+        """
+        other = Crc16()
+        other.m_crc = self.m_crc
+        other.m_count = self.m_count
+        return other
+
+
 def calc_crc16_as_bytes(buf):
-    return a2b_hex(calc_crc16(buf))
+    return Crc16(buf).digest()
 
 def calc_crc16(buf):
     """ Drop in pure python replacement for ekmcrc.c extension.
@@ -100,48 +199,19 @@ def calc_crc16(buf):
     Returns:
         str: 16 bit CRC per EKM Omnimeters formatted as hex string.
     """
-    crc_table = [0x0000, 0xc0c1, 0xc181, 0x0140, 0xc301, 0x03c0, 0x0280, 0xc241,
-                    0xc601, 0x06c0, 0x0780, 0xc741, 0x0500, 0xc5c1, 0xc481, 0x0440,
-                    0xcc01, 0x0cc0, 0x0d80, 0xcd41, 0x0f00, 0xcfc1, 0xce81, 0x0e40,
-                    0x0a00, 0xcac1, 0xcb81, 0x0b40, 0xc901, 0x09c0, 0x0880, 0xc841,
-                    0xd801, 0x18c0, 0x1980, 0xd941, 0x1b00, 0xdbc1, 0xda81, 0x1a40,
-                    0x1e00, 0xdec1, 0xdf81, 0x1f40, 0xdd01, 0x1dc0, 0x1c80, 0xdc41,
-                    0x1400, 0xd4c1, 0xd581, 0x1540, 0xd701, 0x17c0, 0x1680, 0xd641,
-                    0xd201, 0x12c0, 0x1380, 0xd341, 0x1100, 0xd1c1, 0xd081, 0x1040,
-                    0xf001, 0x30c0, 0x3180, 0xf141, 0x3300, 0xf3c1, 0xf281, 0x3240,
-                    0x3600, 0xf6c1, 0xf781, 0x3740, 0xf501, 0x35c0, 0x3480, 0xf441,
-                    0x3c00, 0xfcc1, 0xfd81, 0x3d40, 0xff01, 0x3fc0, 0x3e80, 0xfe41,
-                    0xfa01, 0x3ac0, 0x3b80, 0xfb41, 0x3900, 0xf9c1, 0xf881, 0x3840,
-                    0x2800, 0xe8c1, 0xe981, 0x2940, 0xeb01, 0x2bc0, 0x2a80, 0xea41,
-                    0xee01, 0x2ec0, 0x2f80, 0xef41, 0x2d00, 0xedc1, 0xec81, 0x2c40,
-                    0xe401, 0x24c0, 0x2580, 0xe541, 0x2700, 0xe7c1, 0xe681, 0x2640,
-                    0x2200, 0xe2c1, 0xe381, 0x2340, 0xe101, 0x21c0, 0x2080, 0xe041,
-                    0xa001, 0x60c0, 0x6180, 0xa141, 0x6300, 0xa3c1, 0xa281, 0x6240,
-                    0x6600, 0xa6c1, 0xa781, 0x6740, 0xa501, 0x65c0, 0x6480, 0xa441,
-                    0x6c00, 0xacc1, 0xad81, 0x6d40, 0xaf01, 0x6fc0, 0x6e80, 0xae41,
-                    0xaa01, 0x6ac0, 0x6b80, 0xab41, 0x6900, 0xa9c1, 0xa881, 0x6840,
-                    0x7800, 0xb8c1, 0xb981, 0x7940, 0xbb01, 0x7bc0, 0x7a80, 0xba41,
-                    0xbe01, 0x7ec0, 0x7f80, 0xbf41, 0x7d00, 0xbdc1, 0xbc81, 0x7c40,
-                    0xb401, 0x74c0, 0x7580, 0xb541, 0x7700, 0xb7c1, 0xb681, 0x7640,
-                    0x7200, 0xb2c1, 0xb381, 0x7340, 0xb101, 0x71c0, 0x7080, 0xb041,
-                    0x5000, 0x90c1, 0x9181, 0x5140, 0x9301, 0x53c0, 0x5280, 0x9241,
-                    0x9601, 0x56c0, 0x5780, 0x9741, 0x5500, 0x95c1, 0x9481, 0x5440,
-                    0x9c01, 0x5cc0, 0x5d80, 0x9d41, 0x5f00, 0x9fc1, 0x9e81, 0x5e40,
-                    0x5a00, 0x9ac1, 0x9b81, 0x5b40, 0x9901, 0x59c0, 0x5880, 0x9841,
-                    0x8801, 0x48c0, 0x4980, 0x8941, 0x4b00, 0x8bc1, 0x8a81, 0x4a40,
-                    0x4e00, 0x8ec1, 0x8f81, 0x4f40, 0x8d01, 0x4dc0, 0x4c80, 0x8c41,
-                    0x4400, 0x84c1, 0x8581, 0x4540, 0x8701, 0x47c0, 0x4680, 0x8641,
-                    0x8201, 0x42c0, 0x4380, 0x8341, 0x4100, 0x81c1, 0x8081, 0x4040]
-
-    crc = 0xffff
-    for c in buf:
-        index = (crc ^ c) & 0xff
-        crct = crc_table[index]
-        crc = (crc >> 8) ^ crct
-    crc = (crc << 8) | (crc >> 8)
-    crc &= 0x7F7F
-
-    return "%04x" % crc
+    return Crc16(buf).hexdigest()
+
+
+# Termination string ending every exchange with a meter (SOH B 0 ETX + CRC).
+termination_command = a2b_hex("0142300375")
+
+# Response framing, see ResponseV4_STX and ResponseV4_postamble in Messages.py.
+# Read responses carry the postamble just ahead of the CRC; settings table
+# responses start with STX but end differently, so only the CRC confirms them.
+frame_stx = 0x02
+frame_postamble = b"!\r\n\x03"
+frame_ack = 0x06
+frame_nak = 0x15
 
 
 class MeterData():
@@ -855,10 +925,121 @@ class CosTheta():
     NoLeadOrLag = (" ")
 
 
+FieldDef = namedtuple("FieldDef", ["size", "type", "scale", "calculated", "event"])
+
+field_definitions = {}
+
+# FieldDef position of each MeterData offset (None for per meter values).
+field_def_index = (0, 1, 2, None, None, 3, 4)
+
+
+def internFieldDef(size, fld_type, scale, calculated, event):
+    """ Shared immutable definition for a serial block field.
+
+    Every meter of a model uses the same definitions, so they are kept once
+    per process instead of once per meter.
+
+    Args:
+        size (int): Field length in serial read.
+        fld_type (str): :class:`~ekmmeters.FieldType` value.
+        scale (str): :class:`~ekmmeters.ScaleType` value.
+        calculated (bool): True if not part of serial read.
+        event (bool): True if state value.
+
+    Returns:
+        FieldDef: Interned definition.
+    """
+    definition = FieldDef(size, fld_type, scale, calculated, event)
+    return field_definitions.setdefault(definition, definition)
+
+
+class FieldRecord(object):
+    """ One :class:`~ekmmeters.SerialBlock` entry.
+
+    Holds a shared :class:`~ekmmeters.FieldDef` plus this meter's string and
+    native values.  Indexes like the original 7 element list, using
+    :class:`~ekmmeters.MeterData` offsets.
+    """
+    __slots__ = ("m_def", "m_string", "m_native")
+
+    def __init__(self, definition, string_value="", native_value=0):
+        """
+        Args:
+            definition (FieldDef): Interned field definition.
+            string_value (str): Initial MeterData.StringValue.
+            native_value: Initial MeterData.NativeValue.
+        """
+        self.m_def = definition
+        self.m_string = string_value
+        self.m_native = native_value
+
+    @classmethod
+    def fromList(cls, values):
+        """ Record from a :class:`~ekmmeters.MeterData` indexed list.
+
+        Args:
+            values (list): [size, type, scale, string, native, calculated, event]
+
+        Returns:
+            FieldRecord: Equivalent record.
+        """
+        return cls(internFieldDef(values[MeterData.SizeValue], values[MeterData.TypeValue],
+                                  values[MeterData.ScaleValue], values[MeterData.CalculatedFlag],
+                                  values[MeterData.EventFlag]),
+                   values[MeterData.StringValue], values[MeterData.NativeValue])
+
+    def toList(self):
+        """ Equivalent :class:`~ekmmeters.MeterData` indexed list.
+
+        Returns:
+            list: [size, type, scale, string, native, calculated, event]
+        """
+        definition = self.m_def
+        return [definition.size, definition.type, definition.scale, self.m_string,
+                self.m_native, definition.calculated, definition.event]
+
+    def __getitem__(self, idx):
+        if idx == MeterData.StringValue:
+            return self.m_string
+        if idx == MeterData.NativeValue:
+            return self.m_native
+        return self.m_def[field_def_index[idx]]
+
+    def __setitem__(self, idx, value):
+        if idx == MeterData.StringValue:
+            self.m_string = value
+        elif idx == MeterData.NativeValue:
+            self.m_native = value
+        else:
+            values = self.toList()
+            values[idx] = value
+            self.m_def = FieldRecord.fromList(values).m_def
+
+    def __len__(self):
+        return 7
+
+    def __iter__(self):
+        return iter(self.toList())
+
+    def __eq__(self, other):
+        if isinstance(other, FieldRecord):
+            other = other.toList()
+        return self.toList() == other
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.toList())
+
+
 class SerialBlock(OrderedDict):
     """ Simple subclass of collections.OrderedDict.
 
     Key is a :class:`~ekmmeters.Field` and value is :class:`~ekmmeters.MeterData` indexed array.
+    Lists assigned as values are stored as :class:`~ekmmeters.FieldRecord`.
 
     The :class:`~ekmmeters.MeterData` points to one of the following:
 
@@ -876,6 +1057,771 @@ class SerialBlock(OrderedDict):
 
     def __init__(self):
         super(SerialBlock, self).__init__()
+        self.m_layout = None
+        self.m_pending = None
+
+    def __setitem__(self, key, value):
+        self.m_layout = None
+        if isinstance(value, list) and len(value) == 7:
+            value = FieldRecord.fromList(value)
+        super(SerialBlock, self).__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self.m_layout = None
+        super(SerialBlock, self).__delitem__(key)
+
+    def layout(self):
+        """ Compiled read layout of this block, built on first use.
+
+        Returns:
+            BlockLayout: Shared layout for blocks with the same definition.
+        """
+        if self.m_layout is None:
+            self.m_layout = getBlockLayout(self)
+        return self.m_layout
+
+    def defer(self, contents, kwh_divisor, on_error):
+        """ Hold an unpacked read for decoding on demand.
+
+        Args:
+            contents (tuple): Breakout of block from unpackStruct().
+            kwh_divisor (int): Divisor for kWh scaled fields.
+            on_error (function): Called with field name on conversion failure.
+        """
+        self.m_pending = (contents, kwh_divisor, on_error, set())
+
+    def decodeField(self, fld):
+        """ Decode one field of a deferred read, once.
+
+        Args:
+            fld (str): Field name.
+        """
+        if self.m_pending is None:
+            return
+        contents, kwh_divisor, on_error, done = self.m_pending
+        if fld in done:
+            return
+        done.add(fld)
+        field_decoder = self.layout().fieldDecoder(fld)
+        if field_decoder is not None:
+            field_decoder(contents, self, kwh_divisor, on_error)
+
+    def decodePending(self):
+        """ Decode every field of a deferred read. """
+        if self.m_pending is None:
+            return
+        contents, kwh_divisor, on_error, done = self.m_pending
+        self.m_pending = None
+        decoder = self.layout().decoder()
+        if decoder is not None:
+            decoder(contents, self, kwh_divisor, on_error)
+
+
+class BlockLayout(object):
+    """ Read layout of a :class:`~ekmmeters.SerialBlock`, compiled once.
+
+    Holds the struct.Struct for the serial fields plus per field offsets
+    into the raw read and indexes into the unpacked tuple.
+    """
+
+    def __init__(self, def_buf):
+        """
+        Args:
+            def_buf (SerialBlock): Block definition to compile.
+        """
+        struct_str = "="
+        offset = 0
+        fields = []
+        self.m_offsets = {}
+        self.m_index = {}
+        for fld in def_buf:
+            if def_buf[fld][MeterData.CalculatedFlag]:
+                continue
+            size = def_buf[fld][MeterData.SizeValue]
+            struct_str += str(size) + "s"
+            self.m_offsets[fld] = (offset, size)
+            self.m_index[fld] = len(fields)
+            fields.append(fld)
+            offset += size
+        self.m_fields = tuple(fields)
+        self.m_format = struct_str
+        self.m_struct = struct.Struct(struct_str)
+        self.m_size = self.m_struct.size
+        self.m_scale_index = self.m_index.get(Field.kWh_Scale)
+        self.m_decoder = None
+        self.m_decoder_failed = False
+        self.m_field_decoders = {}
+        self.m_types = tuple((def_buf[fld][MeterData.TypeValue],
+                              def_buf[fld][MeterData.ScaleValue]) for fld in self.m_fields)
+        pass
+
+    def decoder(self):
+        """ Specialized decode function for this layout, built on first use.
+
+        The function takes (contents, def_buf, kwh_divisor, on_error) and
+        fills StringValue and NativeValue for each serial field.  Type
+        dispatch and fixed divisors are resolved when it is generated; only
+        the kWh divisor is passed per read.
+
+        Returns:
+            function: Decoder, or None if it could not be generated.
+        """
+        if self.m_decoder is None and not self.m_decoder_failed:
+            try:
+                self.m_decoder = compileDecoder(self)
+            except Exception:
+                ekm_log("Decoder generation failed, using generic conversion.")
+                ekm_log(traceback.format_exc(sys.exc_info()))
+                self.m_decoder_failed = True
+        return self.m_decoder
+
+    def fieldDecoder(self, fld):
+        """ Specialized decode function for a single field.
+
+        Args:
+            fld (str): Field name.
+
+        Returns:
+            function: Same signature as :func:`~ekmmeters.BlockLayout.decoder`,
+            or None if there is no decoder for the field.
+        """
+        if self.decoder() is None:
+            return None
+        return self.m_field_decoders.get(fld)
+
+
+def compileDecoder(layout):
+    """ Generate the decode function for a :class:`~ekmmeters.BlockLayout`.
+
+    Each field becomes a few straight line statements in its own try block,
+    so a bad field is reported and skipped like in
+    :func:`~ekmmeters.Meter.convertData`.  The same statements are also
+    compiled as one function per field, kept in layout.m_field_decoders,
+    for lazy decoding.
+
+    Args:
+        layout (BlockLayout): Compiled block layout.
+
+    Returns:
+        function: decode(contents, def_buf, kwh_divisor, on_error)
+    """
+    fixed_divisors = {ScaleType.No: None, ScaleType.Div10: 10, ScaleType.Div100: 100}
+    lines = ["def decode(contents, def_buf, kwh_divisor, on_error):"]
+    field_funcs = []
+    field_funcs_src = []
+    for i, fld in enumerate(layout.m_fields):
+        fld_type, fld_scale = layout.m_types[i]
+        if fld_type == FieldType.Float:
+            if fld_scale == ScaleType.KWH:
+                convert = "float(contents[%d].decode('ascii')) / kwh_divisor" % i
+            else:
+                if fld_scale not in fixed_divisors:
+                    ekm_log("Unrecognized float scale.")
+                divisor = fixed_divisors.get(fld_scale)
+                convert = "float(contents[%d].decode('ascii'))" % i
+                if divisor is not None:
+                    convert += " / %d" % divisor
+            body = ["native = " + convert, "row.m_string = str(native)", "row.m_native = native"]
+        elif fld_type == FieldType.Hex:
+            body = ["native = contents[%d].hex()" % i, "row.m_string = native", "row.m_native = native"]
+        elif fld_type == FieldType.Int:
+            body = ["native = int(contents[%d])" % i, "row.m_string = str(native)", "row.m_native = native"]
+        elif fld_type == FieldType.String:
+            body = ["native = contents[%d].decode('ascii')" % i, "row.m_string = native", "row.m_native = native"]
+        elif fld_type == FieldType.PowerFactor:
+            body = ["native = str(contents[%d])" % i, "row.m_string = native", "row.m_native = native"]
+        else:
+            ekm_log("Unrecognized field type")
+            continue
+        field_lines = ["    try:",
+                       "        row = def_buf[%r]" % fld]
+        field_lines.extend("        " + stmt for stmt in body)
+        field_lines.append("    except Exception:")
+        field_lines.append("        on_error(%r)" % fld)
+        lines.extend(field_lines)
+        field_funcs.append((fld, "decode_%d" % i))
+        field_funcs_src.append("def decode_%d(contents, def_buf, kwh_divisor, on_error):" % i)
+        field_funcs_src.extend(field_lines)
+    lines.append("    return True")
+    lines.extend(field_funcs_src)
+    namespace = {}
+    exec(compile("\n".join(lines) + "\n", "<ekmmeters decoder>", "exec"), namespace)
+    layout.m_field_decoders = dict((fld, namespace[name]) for fld, name in field_funcs)
+    return namespace["decode"]
+
+
+block_layouts = {}
+
+
+def getBlockLayout(def_buf):
+    """ Shared :class:`~ekmmeters.BlockLayout` for a block definition.
+
+    Blocks with identical field names, sizes, types and scales (every V4 A
+    block, for instance) share one compiled layout.
+
+    Args:
+        def_buf (SerialBlock): Block definition.
+
+    Returns:
+        BlockLayout: Compiled layout.
+    """
+    signature = tuple((fld,
+                       def_buf[fld][MeterData.SizeValue],
+                       def_buf[fld][MeterData.TypeValue],
+                       def_buf[fld][MeterData.ScaleValue],
+                       def_buf[fld][MeterData.CalculatedFlag]) for fld in def_buf)
+    layout = block_layouts.get(signature)
+    if layout is None:
+        layout = BlockLayout(def_buf)
+        block_layouts[signature] = layout
+    return layout
+
+
+class FrameSchema(object):
+    """ Declarative layout of one Omnimeter read response.
+
+    Rows are (field, size, FieldType, ScaleType, calculated, event) in wire
+    order, calculated rows last.  The meter read blocks, the offsets in
+    Messages.py and the FakeEKM frame builder are all compiled from the same
+    rows, once, when the schema is created.
+    """
+
+    def __init__(self, name, rows, constants):
+        """
+        Args:
+            name (str): DataType value, 'V3', 'V4A' or 'V4B'.
+            rows (tuple): Field rows in wire order.
+            constants (dict): Field name to fixed content (STX, postamble).
+        """
+        self.m_name = name
+        self.m_records = tuple((row[0], internFieldDef(*row[1:]), "0" if row[4] else "")
+                               for row in rows)
+        self.m_slices = OrderedDict()
+        offset = 0
+        for fld, definition, string_value in self.m_records:
+            if not definition.calculated:
+                self.m_slices[fld] = slice(offset, offset + definition.size)
+                offset += definition.size
+        self.m_size = offset
+        self.m_constants = constants
+        self.m_layout = None
+        self.m_layout = getBlockLayout(self.newBlock())
+        pass
+
+    def newBlock(self):
+        """ Fresh :class:`~ekmmeters.SerialBlock` for this frame.
+
+        Returns:
+            SerialBlock: Block with default values and the precompiled layout.
+        """
+        def_buf = SerialBlock()
+        self.fillBlock(def_buf)
+        return def_buf
+
+    def fillBlock(self, def_buf):
+        """ Add this frame's fields to a :class:`~ekmmeters.SerialBlock`.
+
+        Args:
+            def_buf (SerialBlock): Block to fill, normally empty.
+        """
+        for fld, definition, string_value in self.m_records:
+            def_buf[fld] = FieldRecord(definition, string_value, 0)
+        def_buf.m_layout = self.m_layout
+
+    def encodeField(self, fld, value):
+        """ Wire bytes for one field of :func:`~ekmmeters.FrameSchema.buildFrame`.
+
+        Args:
+            fld (str): Field name.
+            value (bytes, str or int): Content; ints are zero padded digits.
+
+        Returns:
+            bytes: Content of exactly the field size.
+        """
+        size = self.m_slices[fld].stop - self.m_slices[fld].start
+        if isinstance(value, int):
+            value = "%0*d" % (size, value)
+        if isinstance(value, str):
+            value = value.encode("ascii")
+        if len(value) != size:
+            raise ValueError("%s %s is %d bytes, expected %d" % (self.m_name, fld, len(value), size))
+        return value
+
+    def buildFrame(self, values=None, fill=None):
+        """ Build a complete read response with a valid CRC.
+
+        Fields not in values keep the fill content.  The start byte and
+        postamble are always set and the CRC is calculated last.
+
+        Args:
+            values (dict): Field name to content, see encodeField().
+            fill (bytes): Frame sized background, default all '0' digits.
+
+        Returns:
+            bytearray: Response frame.
+        """
+        if fill is None:
+            frame = bytearray(b"0" * self.m_size)
+        else:
+            frame = bytearray(fill)
+        for fld, value in self.m_constants.items():
+            frame[self.m_slices[fld]] = value
+        if values:
+            for fld, value in values.items():
+                frame[self.m_slices[fld]] = self.encodeField(fld, value)
+        frame[self.m_slices["crc16"]] = calc_crc16_as_bytes(frame[1:-2])
+        return frame
+
+
+v3_frame_rows = (
+    ("reserved_10", 1, FieldType.Hex, ScaleType.No, False, False),
+    (Field.Model, 2, FieldType.Hex, ScaleType.No, False, True),
+    (Field.Firmware, 1, FieldType.Hex, ScaleType.No, False, True),
+    (Field.Meter_Address, 12, FieldType.String, ScaleType.No, False, True),
+    (Field.kWh_Tot, 8, FieldType.Float, ScaleType.KWH, False, False),
+    (Field.kWh_Tariff_1, 8, FieldType.Float, ScaleType.KWH, False, False),
+    (Field.kWh_Tariff_2, 8, FieldType.Float, ScaleType.KWH, False, False),
+    (Field.kWh_Tariff_3, 8, FieldType.Float, ScaleType.KWH, False, False),
+    (Field.kWh_Tariff_4, 8, FieldType.Float, ScaleType.KWH, False, False),
+    (Field.Rev_kWh_Tot, 8, FieldType.Float, ScaleType.KWH, False, False),
+    (Field.Rev_kWh_Tariff_1, 8, FieldType.Float, ScaleType.KWH, False, False),
+    (Field.Rev_kWh_Tariff_2, 8, FieldType.Float, ScaleType.KWH, False, False),
+    (Field.Rev_kWh_Tariff_3, 8, FieldType.Float, ScaleType.KWH, False, False),
+    (Field.Rev_kWh_Tariff_4, 8, FieldType.Float, ScaleType.KWH, False, False),
+    (Field.RMS_Volts_Ln_1, 4, FieldType.Float, ScaleType.Div10, False, False),
+    (Field.RMS_Volts_Ln_2, 4, FieldType.Float, ScaleType.Div10, False, False),
+    (Field.RMS_Volts_Ln_3, 4, FieldType.Float, ScaleType.Div10, False, False),
+    (Field.Amps_Ln_1, 5, FieldType.Float, ScaleType.Div10, False, False),
+    (Field.Amps_Ln_2, 5, FieldType.Float, ScaleType.Div10, False, False),
+    (Field.Amps_Ln_3, 5, FieldType.Float, ScaleType.Div10, False, False),
+    (Field.RMS_Watts_Ln_1, 7, FieldType.Int, ScaleType.No, False, False),
+    (Field.RMS_Watts_Ln_2, 7, FieldType.Int, ScaleType.No, False, False),
+    (Field.RMS_Watts_Ln_3, 7, FieldType.Int, ScaleType.No, False, False),
+    (Field.RMS_Watts_Tot, 7, FieldType.Int, ScaleType.No, False, False),
+    (Field.Cos_Theta_Ln_1, 4, FieldType.PowerFactor, ScaleType.No, False, False),
+    (Field.Cos_Theta_Ln_2, 4, FieldType.PowerFactor, ScaleType.No, False, False),
+    (Field.Cos_Theta_Ln_3, 4, FieldType.PowerFactor, ScaleType.No, False, False),
+    (Field.Max_Demand, 8, FieldType.Float, ScaleType.KWH, False, True),
+    (Field.Max_Demand_Period, 1, FieldType.Int, ScaleType.No, False, True),
+    (Field.Meter_Time, 14, FieldType.String, ScaleType.No, False, False),
+    (Field.CT_Ratio, 4, FieldType.Int, ScaleType.No, False, True),
+    (Field.Pulse_Cnt_1, 8, FieldType.Int, ScaleType.No, False, False),
+    (Field.Pulse_Cnt_2, 8, FieldType.Int, ScaleType.No, False, False),
+    (Field.Pulse_Cnt_3, 8, FieldType.Int, ScaleType.No, False, False),
+    (Field.Pulse_Ratio_1, 4, FieldType.Int, ScaleType.No, False, True),
+    (Field.Pulse_Ratio_2, 4, FieldType.Int, ScaleType.No, False, True),
+    (Field.Pulse_Ratio_3, 4, FieldType.Int, ScaleType.No, False, True),
+    (Field.State_Inputs, 3, FieldType.Int, ScaleType.No, False, True),
+    ("reserved_11", 19, FieldType.Hex, ScaleType.No, False, False),
+    (Field.Status_A, 1, FieldType.Hex, ScaleType.No, False, False),
+    ("reserved_12", 4, FieldType.Hex, ScaleType.No, False, False),
+    ("crc16", 2, FieldType.Hex, ScaleType.No, False, False),
+    (Field.Power_Factor_Ln_1, 4, FieldType.Int, ScaleType.No, True, False),
+    (Field.Power_Factor_Ln_2, 4, FieldType.Int, ScaleType.No, True, False),
+    (Field.Power_Factor_Ln_3, 4, FieldType.Int, ScaleType.No, True, False),
+)
+
+v4a_frame_rows = (
+    ("reserved_1", 1, FieldType.Hex, ScaleType.No, False, False),
+    (Field.Model, 2, FieldType.Hex, ScaleType.No, False, True),
+    (Field.Firmware, 1, FieldType.Hex, ScaleType.No, False, True),
+    (Field.Meter_Address, 12, FieldType.String, ScaleType.No, False, True),
+    (Field.kWh_Tot, 8, FieldType.Float, ScaleType.KWH, False, False),
+    (Field.Reactive_Energy_Tot, 8, FieldType.Float, ScaleType.KWH, False, False),
+    (Field.Rev_kWh_Tot, 8, FieldType.Float, ScaleType.KWH, False, False),
+    (Field.kWh_Ln_1, 8, FieldType.Float, ScaleType.KWH, False, False),
+    (Field.kWh_Ln_2, 8, FieldType.Float, ScaleType.KWH, False, False),
+    (Field.kWh_Ln_3, 8, FieldType.Float, ScaleType.KWH, False, False),
+    (Field.Rev_kWh_Ln_1, 8, FieldType.Float, ScaleType.KWH, False, False),
+    (Field.Rev_kWh_Ln_2, 8, FieldType.Float, ScaleType.KWH, False, False),
+    (Field.Rev_kWh_Ln_3, 8, FieldType.Float, ScaleType.KWH, False, False),
+    (Field.Resettable_kWh_Tot, 8, FieldType.Float, ScaleType.KWH, False, False),
+    (Field.Resettable_Rev_kWh_Tot, 8, FieldType.Float, ScaleType.KWH, False, False),
+    (Field.RMS_Volts_Ln_1, 4, FieldType.Float, ScaleType.Div10, False, False),
+    (Field.RMS_Volts_Ln_2, 4, FieldType.Float, ScaleType.Div10, False, False),
+    (Field.RMS_Volts_Ln_3, 4, FieldType.Float, ScaleType.Div10, False, False),
+    (Field.Amps_Ln_1, 5, FieldType.Float, ScaleType.Div10, False, False),
+    (Field.Amps_Ln_2, 5, FieldType.Float, ScaleType.Div10, False, False),
+    (Field.Amps_Ln_3, 5, FieldType.Float, ScaleType.Div10, False, False),
+    (Field.RMS_Watts_Ln_1, 7, FieldType.Int, ScaleType.No, False, False),
+    (Field.RMS_Watts_Ln_2, 7, FieldType.Int, ScaleType.No, False, False),
+    (Field.RMS_Watts_Ln_3, 7, FieldType.Int, ScaleType.No, False, False),
+    (Field.RMS_Watts_Tot, 7, FieldType.Int, ScaleType.No, False, False),
+    (Field.Cos_Theta_Ln_1, 4, FieldType.PowerFactor, ScaleType.No, False, False),
+    (Field.Cos_Theta_Ln_2, 4, FieldType.PowerFactor, ScaleType.No, False, False),
+    (Field.Cos_Theta_Ln_3, 4, FieldType.PowerFactor, ScaleType.No, False, False),
+    (Field.Reactive_Pwr_Ln_1, 7, FieldType.Int, ScaleType.No, False, False),
+    (Field.Reactive_Pwr_Ln_2, 7, FieldType.Int, ScaleType.No, False, False),
+    (Field.Reactive_Pwr_Ln_3, 7, FieldType.Int, ScaleType.No, False, False),
+    (Field.Reactive_Pwr_Tot, 7, FieldType.Int, ScaleType.No, False, False),
+    (Field.Line_Freq, 4, FieldType.Float, ScaleType.Div100, False, False),
+    (Field.Pulse_Cnt_1, 8, FieldType.Int, ScaleType.No, False, False),
+    (Field.Pulse_Cnt_2, 8, FieldType.Int, ScaleType.No, False, False),
+    (Field.Pulse_Cnt_3, 8, FieldType.Int, ScaleType.No, False, False),
+    (Field.State_Inputs, 1, FieldType.Int, ScaleType.No, False, False),
+    (Field.State_Watts_Dir, 1, FieldType.Int, ScaleType.No, False, True),
+    (Field.State_Out, 1, FieldType.Int, ScaleType.No, False, True),
+    (Field.kWh_Scale, 1, FieldType.Int, ScaleType.No, False, True),
+    ("reserved_2", 2, FieldType.Hex, ScaleType.No, False, False),
+    (Field.Meter_Time, 14, FieldType.String, ScaleType.No, False, False),
+    ("reserved_3", 2, FieldType.Hex, ScaleType.No, False, False),
+    ("reserved_4", 4, FieldType.Hex, ScaleType.No, False, False),
+    ("crc16", 2, FieldType.Hex, ScaleType.No, False, False),
+    (Field.Power_Factor_Ln_1, 4, FieldType.Int, ScaleType.No, True, False),
+    (Field.Power_Factor_Ln_2, 4, FieldType.Int, ScaleType.No, True, False),
+    (Field.Power_Factor_Ln_3, 4, FieldType.Int, ScaleType.No, True, False),
+)
+
+v4b_frame_rows = (
+    ("reserved_5", 1, FieldType.Hex, ScaleType.No, False, False),
+    (Field.Model, 2, FieldType.Hex, ScaleType.No, False, True),
+    (Field.Firmware, 1, FieldType.Hex, ScaleType.No, False, True),
+    (Field.Meter_Address, 12, FieldType.String, ScaleType.No, False, True),
+    (Field.kWh_Tariff_1, 8, FieldType.Float, ScaleType.KWH, False, False),
+    (Field.kWh_Tariff_2, 8, FieldType.Float, ScaleType.KWH, False, False),
+    (Field.kWh_Tariff_3, 8, FieldType.Float, ScaleType.KWH, False, False),
+    (Field.kWh_Tariff_4, 8, FieldType.Float, ScaleType.KWH, False, False),
+    (Field.Rev_kWh_Tariff_1, 8, FieldType.Float, ScaleType.KWH, False, False),
+    (Field.Rev_kWh_Tariff_2, 8, FieldType.Float, ScaleType.KWH, False, False),
+    (Field.Rev_kWh_Tariff_3, 8, FieldType.Float, ScaleType.KWH, False, False),
+    (Field.Rev_kWh_Tariff_4, 8, FieldType.Float, ScaleType.KWH, False, False),
+    (Field.RMS_Volts_Ln_1, 4, FieldType.Float, ScaleType.Div10, False, False),
+    (Field.RMS_Volts_Ln_2, 4, FieldType.Float, ScaleType.Div10, False, False),
+    (Field.RMS_Volts_Ln_3, 4, FieldType.Float, ScaleType.Div10, False, False),
+    (Field.Amps_Ln_1, 5, FieldType.Float, ScaleType.Div10, False, False),
+    (Field.Amps_Ln_2, 5, FieldType.Float, ScaleType.Div10, False, False),
+    (Field.Amps_Ln_3, 5, FieldType.Float, ScaleType.Div10, False, False),
+    (Field.RMS_Watts_Ln_1, 7, FieldType.Int, ScaleType.No, False, False),
+    (Field.RMS_Watts_Ln_2, 7, FieldType.Int, ScaleType.No, False, False),
+    (Field.RMS_Watts_Ln_3, 7, FieldType.Int, ScaleType.No, False, False),
+    (Field.RMS_Watts_Tot, 7, FieldType.Int, ScaleType.No, False, False),
+    (Field.Cos_Theta_Ln_1, 4, FieldType.PowerFactor, ScaleType.No, False, False),
+    (Field.Cos_Theta_Ln_2, 4, FieldType.PowerFactor, ScaleType.No, False, False),
+    (Field.Cos_Theta_Ln_3, 4, FieldType.PowerFactor, ScaleType.No, False, False),
+    (Field.RMS_Watts_Max_Demand, 8, FieldType.Float, ScaleType.Div10, False, False),
+    (Field.Max_Demand_Period, 1, FieldType.Int, ScaleType.No, False, True),
+    (Field.Pulse_Ratio_1, 4, FieldType.Int, ScaleType.No, False, True),
+    (Field.Pulse_Ratio_2, 4, FieldType.Int, ScaleType.No, False, True),
+    (Field.Pulse_Ratio_3, 4, FieldType.Int, ScaleType.No, False, True),
+    (Field.CT_Ratio, 4, FieldType.Int, ScaleType.No, False, True),
+    ("reserved_6", 1, FieldType.Hex, ScaleType.No, False, False),
+    (Field.Pulse_Output_Ratio, 4, FieldType.Int, ScaleType.No, False, True),
+    ("reserved_7", 53, FieldType.Hex, ScaleType.No, False, False),
+    (Field.Status_A, 1, FieldType.Hex, ScaleType.No, False, True),
+    (Field.Status_B, 1, FieldType.Hex, ScaleType.No, False, True),
+    (Field.Status_C, 1, FieldType.Hex, ScaleType.No, False, True),
+    (Field.Meter_Time, 14, FieldType.String, ScaleType.No, False, False),
+    ("reserved_8", 2, FieldType.Hex, ScaleType.No, False, False),
+    ("reserved_9", 4, FieldType.Hex, ScaleType.No, False, False),
+    ("crc16", 2, FieldType.Hex, ScaleType.No, False, False),
+    (Field.Net_Calc_Watts_Ln_1, 7, FieldType.Int, ScaleType.No, True, False),
+    (Field.Net_Calc_Watts_Ln_2, 7, FieldType.Int, ScaleType.No, True, False),
+    (Field.Net_Calc_Watts_Ln_3, 7, FieldType.Int, ScaleType.No, True, False),
+    (Field.Net_Calc_Watts_Tot, 7, FieldType.Int, ScaleType.No, True, False),
+    (Field.Power_Factor_Ln_1, 4, FieldType.Int, ScaleType.No, True, False),
+    (Field.Power_Factor_Ln_2, 4, FieldType.Int, ScaleType.No, True, False),
+    (Field.Power_Factor_Ln_3, 4, FieldType.Int, ScaleType.No, True, False),
+)
+
+# Compiled at import; initWorkFormat(), initFormatA() and initFormatB() only
+# copy the interned definitions and reuse the layout.
+frame_schemas = {
+    "V3": FrameSchema("V3", v3_frame_rows,
+                      {"reserved_10": bytes((frame_stx,)), "reserved_12": frame_postamble}),
+    "V4A": FrameSchema("V4A", v4a_frame_rows,
+                       {"reserved_1": bytes((frame_stx,)), "reserved_4": frame_postamble}),
+    "V4B": FrameSchema("V4B", v4b_frame_rows,
+                       {"reserved_5": bytes((frame_stx,)), "reserved_9": frame_postamble}),
+}
+
+
+class LatencyHistogram(object):
+    """ Fixed bucket latency histogram, constant memory and O(log buckets) add.
+
+    Bucket upper edges run 1, 2, 5, 10 ... 10000 ms plus an overflow bucket.
+    Percentiles are read as the upper edge of the bucket they fall in.
+    """
+
+    edges_ms = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+    def __init__(self):
+        self.m_counts = [0] * (len(LatencyHistogram.edges_ms) + 1)
+        self.m_count = 0
+        self.m_sum = 0.0
+        self.m_max = 0.0
+        pass
+
+    def add(self, seconds):
+        """ Count one sample.
+
+        Args:
+            seconds (float): Latency in seconds.
+        """
+        ms = seconds * 1000.0
+        self.m_counts[bisect.bisect_left(LatencyHistogram.edges_ms, ms)] += 1
+        self.m_count += 1
+        self.m_sum += ms
+        if ms > self.m_max:
+            self.m_max = ms
+
+    def percentile(self, pct):
+        """ Approximate percentile.
+
+        Args:
+            pct (float): Percentile, 0 to 100.
+
+        Returns:
+            float: Bucket upper edge in ms (max sample for the overflow bucket), None if empty.
+        """
+        if self.m_count == 0:
+            return None
+        rank = max(int(math.ceil(pct / 100.0 * self.m_count)), 1)
+        seen = 0
+        for i, count in enumerate(self.m_counts):
+            seen += count
+            if seen >= rank:
+                if i < len(LatencyHistogram.edges_ms):
+                    return float(min(LatencyHistogram.edges_ms[i], self.m_max))
+                return self.m_max
+        return self.m_max
+
+    def getStats(self):
+        """ Returns:
+            dict: "count", "mean_ms", "p50_ms", "p95_ms", "max_ms" and bucket "counts".
+        """
+        return {"count": self.m_count,
+                "mean_ms": self.m_sum / self.m_count if self.m_count else None,
+                "p50_ms": self.percentile(50),
+                "p95_ms": self.percentile(95),
+                "max_ms": self.m_max,
+                "counts": list(self.m_counts)}
+
+
+class SerialStats(object):
+    """ Bus accounting for one command context on a port.
+
+    Updated by :class:`~ekmmeters.SerialPort` on every write and response;
+    see :func:`~ekmmeters.SerialPort.getSerialStats`.
+    """
+
+    def __init__(self):
+        self.m_writes = 0
+        self.m_bytes_written = 0
+        self.m_bytes_read = 0
+        self.m_responses = 0
+        self.m_timeouts = 0
+        self.m_naks = 0
+        self.m_crc_failures = 0
+        self.m_resyncs = 0
+        self.m_bytes_skipped = 0
+        self.m_first_byte = LatencyHistogram()
+        self.m_last_byte = LatencyHistogram()
+        pass
+
+    def recordWrite(self, nbytes):
+        """ Count a block written. """
+        self.m_writes += 1
+        self.m_bytes_written += nbytes
+
+    def recordResponse(self, nbytes, first_byte, last_byte, nak=False, crc_ok=True):
+        """ Count a complete response.
+
+        Args:
+            nbytes (int): Response length.
+            first_byte (float): Seconds from write done to first byte.
+            last_byte (float): Seconds from write done to last byte.
+            nak (bool): Response was a NAK.
+            crc_ok (bool): False if a frame failed its CRC.
+        """
+        self.m_responses += 1
+        self.m_bytes_read += nbytes
+        self.m_first_byte.add(first_byte)
+        self.m_last_byte.add(last_byte)
+        if nak:
+            self.m_naks += 1
+        if not crc_ok:
+            self.m_crc_failures += 1
+
+    def recordResync(self, nbytes):
+        """ Count bytes skipped to realign on a frame start.
+
+        Args:
+            nbytes (int): Bytes thrown away.
+        """
+        self.m_resyncs += 1
+        self.m_bytes_skipped += nbytes
+
+    def recordTimeout(self, nbytes):
+        """ Count a response which never completed.
+
+        Args:
+            nbytes (int): Bytes received and thrown away.
+        """
+        self.m_timeouts += 1
+        self.m_bytes_read += nbytes
+
+    def getStats(self):
+        """ Returns:
+            dict: Counters plus "first_byte" and "last_byte" histogram dicts.
+        """
+        return {"writes": self.m_writes,
+                "bytes_written": self.m_bytes_written,
+                "bytes_read": self.m_bytes_read,
+                "responses": self.m_responses,
+                "timeouts": self.m_timeouts,
+                "naks": self.m_naks,
+                "crc_failures": self.m_crc_failures,
+                "resyncs": self.m_resyncs,
+                "bytes_skipped": self.m_bytes_skipped,
+                "first_byte": self.m_first_byte.getStats(),
+                "last_byte": self.m_last_byte.getStats()}
+
+
+class SerialTiming(object):
+    """ Learned response timing of one meter on a port.
+
+    Holds bounded windows of the two measured phases of every answered
+    command: latency, from the end of the write to the first byte back, and
+    transfer, from the first byte to the end of a full frame.  Budgets for
+    the next command are taken from percentiles of these windows.
+    """
+
+    def __init__(self, window=200):
+        """
+        Args:
+            window (int): Samples kept per phase.
+        """
+        self.m_latency = deque(maxlen=window)
+        self.m_transfer = deque(maxlen=window)
+        self.m_responses = 0
+        self.m_timeouts = 0
+        self.m_last_timeout = False
+        pass
+
+    def record(self, latency, transfer=None):
+        """ Add one answered command.
+
+        Args:
+            latency (float): Seconds from write done to first byte.
+            transfer (float): Seconds from first to last byte of a frame,
+                None for one byte ACK/NAK responses.
+        """
+        self.m_latency.append(latency)
+        if transfer is not None:
+            self.m_transfer.append(transfer)
+        self.m_responses += 1
+        self.m_last_timeout = False
+
+    def recordTimeout(self):
+        """ Count a command which got no complete response. """
+        self.m_timeouts += 1
+        self.m_last_timeout = True
+
+    def getSampleCount(self):
+        """ Returns:
+            int: Latency samples held.
+        """
+        return len(self.m_latency)
+
+    def percentile(self, phase, pct):
+        """ Nearest rank percentile of a phase window.
+
+        Args:
+            phase (str): "latency" or "transfer".
+            pct (float): Percentile, 0 to 100.
+
+        Returns:
+            float: Seconds, or None with no samples.
+        """
+        samples = self.m_latency if phase == "latency" else self.m_transfer
+        if len(samples) == 0:
+            return None
+        ordered = sorted(samples)
+        rank = int(math.ceil(pct / 100.0 * len(ordered))) - 1
+        return ordered[min(max(rank, 0), len(ordered) - 1)]
+
+    def getStats(self):
+        """ Summary of the learned timing.
+
+        Returns:
+            dict: Counts plus latency and transfer p50/p95/p99 in ms.
+        """
+        stats = {"responses": self.m_responses,
+                 "timeouts": self.m_timeouts,
+                 "samples": self.getSampleCount()}
+        for phase in ("latency", "transfer"):
+            for pct in (50, 95, 99):
+                value = self.percentile(phase, pct)
+                stats["%s_p%d_ms" % (phase, pct)] = None if value is None else value * 1000.0
+        return stats
+
+
+# Serial capture files: magic, then one record per write or read chunk.  A
+# record is monotonic nanoseconds since capture start (uint64), direction
+# (uint8) and length (uint16), little endian, followed by the bytes.
+capture_magic = b"EKMCAP1\n"
+capture_record = struct.Struct("<QBH")
+capture_write = 0x57    # 'W', computer to meter
+capture_read = 0x52     # 'R', meter to computer
+
+
+def read_capture(capture_file):
+    """ Load a serial capture written by :class:`~ekmmeters.SerialCapture`.
+
+    Args:
+        capture_file (str): Path of capture file.
+
+    Returns:
+        list: (seconds, direction, bytes) tuples in recorded order.
+    """
+    records = []
+    with open(capture_file, "rb") as fp:
+        if fp.read(len(capture_magic)) != capture_magic:
+            raise ValueError("Not a serial capture file: %s" % capture_file)
+        while True:
+            header = fp.read(capture_record.size)
+            if len(header) < capture_record.size:
+                break
+            stamp_ns, direction, length = capture_record.unpack(header)
+            data = fp.read(length)
+            if len(data) < length:
+                break   # cut short, e.g. capture still being written
+            records.append((stamp_ns / 1e9, direction, data))
+    return records
+
+
+class SerialCapture(object):
+    """ Appends every block written and chunk read on a port to a capture file.
+
+    See :func:`~ekmmeters.SerialPort.startCapture` and
+    :class:`~ekmmeters.ReplaySerialPort`.
+    """
+
+    def __init__(self, capture_file):
+        """
+        Args:
+            capture_file (str): Path of capture file, appended to if it exists.
+        """
+        self.m_file = open(capture_file, "ab")
+        if self.m_file.tell() == 0:
+            self.m_file.write(capture_magic)
+        self.m_start = time.monotonic_ns()
+        pass
+
+    def record(self, direction, data):
+        """ Append one record.
+
+        Args:
+            direction (int): capture_write or capture_read.
+            data (bytes): Bytes on the wire.
+        """
+        self.m_file.write(capture_record.pack(time.monotonic_ns() - self.m_start, direction, len(data)))
+        self.m_file.write(data)
+        self.m_file.flush()
+
+    def close(self):
+        """ Close the capture file. """
+        self.m_file.close()
 
 
 class SerialPort(object):
@@ -895,12 +1841,16 @@ class SerialPort(object):
     a context manager and thus be used in a "with" statement.
     """
 
-    def __init__(self, ttyport, baudrate=9600, force_wait = 0.1):
+    def __init__(self, ttyport, baudrate=9600, force_wait = 0.1, event_driven=True, adaptive=True):
         """
         Args:
             ttyport (str): port name, ex 'COM3' '/dev/ttyUSB0'
             baudrate (int): optional, 9600 default and recommended
             force_wait(float) : optional post commnd sleep, if required
+            event_driven (bool): optional, block in select() on the port
+                instead of polling inWaiting() every force_wait seconds.
+            adaptive (bool): optional, learn per meter timing instead of
+                fixed force_wait sleeps, see setAdaptiveTiming().
         """
         self.m_ttyport = ttyport
         self.m_baudrate = baudrate
@@ -910,6 +1860,34 @@ class SerialPort(object):
         self.m_wait_sleep = 0.05
         self.m_force_wait = force_wait
         self.m_init_wait = 0.2
+        self.m_event_driven = event_driven
+        self.m_last_response = None
+        self.m_last_response_str = None
+        self.m_last_crc = None
+        self.m_rx_buf = bytearray(2 * 255)
+        self.m_adaptive = adaptive
+        self.m_timing = {}
+        self.m_timing_meter = ""
+        self.m_timing_pct = 99
+        self.m_timing_margin = 0.5
+        self.m_timing_floor = 0.05
+        self.m_timing_min_samples = 5
+        self.m_response_gap_chars = 2
+        self.m_write_done = None
+        self.m_rx_max = 255
+        self.m_rx_received = 0
+        self.m_rx_crc = None
+        self.m_rx_timing = None
+        self.m_rx_first = None
+        self.m_rx_sent = None
+        self.m_rx_crc_pos = 1
+        self.m_rx_rescan = False
+        self.m_stats = {}
+        self.m_stats_context = ""
+        self.m_rx_stats = None
+        self.m_stats_log_interval = 0
+        self.m_stats_logged = time.monotonic()
+        self.m_capture = None
         pass
 
     def __enter__(self):
@@ -926,28 +1904,7 @@ class SerialPort(object):
         if self.m_ser is not None:
             return True
         try:
-            try:
-                self.m_ser = serial.Serial(port=self.m_ttyport,
-                                        baudrate=self.m_baudrate,
-                                        timeout=0,
-                                        parity=serial.PARITY_EVEN,
-                                        stopbits=serial.STOPBITS_ONE,
-                                        bytesize=serial.SEVENBITS,
-                                        rtscts=False)
-            except serial.serialutil.SerialException as e:
-                # if the port can't be opened with Serial, try serial_for_url
-                if e.errno == 2:  self.m_ser = serial.serial_for_url(url=self.m_ttyport,
-                                        baudrate=self.m_baudrate,
-                                        timeout=0,
-                                        parity=serial.PARITY_EVEN,
-                                        stopbits=serial.STOPBITS_ONE,
-                                        bytesize=serial.SEVENBITS,
-                                        rtscts=False)
-                else: raise
-
-            ekm_log("Pyserial version = " + serial.VERSION)
-            ekm_log("Port = " + self.m_ttyport)
-            ekm_log("Rate = " + str(self.m_baudrate))
+            self.openSerial()
             time.sleep(self.m_init_wait)
             return True
         except:
@@ -955,6 +1912,36 @@ class SerialPort(object):
 
         return False
 
+    def openSerial(self):
+        """ Open the pyserial port with Omnimeter settings, no settle wait.
+
+        Tries serial.Serial first and falls back to serial_for_url (e.g.
+        socket://host:port) for names which are not device files.  Serial
+        exceptions are passed to the caller.
+        """
+        try:
+            self.m_ser = serial.Serial(port=self.m_ttyport,
+                                    baudrate=self.m_baudrate,
+                                    timeout=0,
+                                    parity=serial.PARITY_EVEN,
+                                    stopbits=serial.STOPBITS_ONE,
+                                    bytesize=serial.SEVENBITS,
+                                    rtscts=False)
+        except serial.serialutil.SerialException as e:
+            # if the port can't be opened with Serial, try serial_for_url
+            if e.errno == 2:  self.m_ser = serial.serial_for_url(url=self.m_ttyport,
+                                    baudrate=self.m_baudrate,
+                                    timeout=0,
+                                    parity=serial.PARITY_EVEN,
+                                    stopbits=serial.STOPBITS_ONE,
+                                    bytesize=serial.SEVENBITS,
+                                    rtscts=False)
+            else: raise
+
+        ekm_log("Pyserial version = " + serial.VERSION)
+        ekm_log("Port = " + self.m_ttyport)
+        ekm_log("Rate = " + str(self.m_baudrate))
+
     def getName(self):
         """ Getter for serial port name
 
@@ -970,13 +1957,37 @@ class SerialPort(object):
             return
         self.m_ser.close()
         self.m_ser = None
+        self.m_fd = None
+        self.m_rx_received = 0
         pass
 
-    def write(self, output):
-        """Passthrough for pyserial Serial.write().
+    def getReadHandle(self):
+        """ Object select() can wait on for the open port, if there is one.
+
+        pyserial posix ports expose fileno(); socket:// ports keep their
+        socket in _socket.  Other ports (e.g. Windows COM) have neither.
+
+        Returns:
+            object: file descriptor or socket, None if port can only be polled.
+        """
+        if self.m_fd is not None:
+            return self.m_fd
+        if self.m_ser is None:
+            return None
+        try:
+            self.m_fd = self.m_ser.fileno()
+        except Exception:
+            self.m_fd = getattr(self.m_ser, '_socket', None)
+        return self.m_fd
+
+    def encodeOutput(self, output):
+        """ Bytes to put on the wire for a write() argument.
 
         Args:
-            output (str): Block to write to port
+            output (str): Hex string, or bytes or bytearray block.
+
+        Returns:
+            bytes: Block to write, None for an unknown argument class.
         """
         if isinstance(output, str):
             try:
@@ -988,15 +1999,282 @@ class SerialPort(object):
             view_str = output
         else:
             ekm_log('SerialPort.write called with unknown argument class.')
-            return False
+            return None
         ekm_log('SerialPort:  Writing bytes to port: %s'%view_str, priority=5)
-        if (len(view_str) > 0):
-            self.m_ser.write(view_str)
-            self.m_ser.flush()
-            time.sleep(self.m_force_wait)
-        pass
+        return view_str
+
+    def getWriteWait(self, nbytes, elapsed=0.0):
+        """ Seconds to wait after putting a block on the wire.
+
+        Adaptive timing waits out whatever wire time is left, as flush()
+        does not block on every port type (sockets, some USB adapters).
+
+        Args:
+            nbytes (int): Bytes written.
+            elapsed (float): Seconds already spent writing.
+
+        Returns:
+            float: Seconds still to wait, not negative.
+        """
+        if not self.m_adaptive:
+            return self.m_force_wait
+        return max(nbytes * self.getCharTime() - elapsed, 0.0)
+
+    def write(self, output):
+        """Passthrough for pyserial Serial.write().
+
+        Args:
+            output (str): Block to write to port
+        """
+        view_str = self.encodeOutput(output)
+        if view_str is None:
+            return False
+        if (len(view_str) > 0):
+            self.recordWrite(view_str)
+            write_start = time.monotonic()
+            self.m_ser.write(view_str)
+            if self.m_capture is not None:
+                self.m_capture.record(capture_write, view_str)
+            self.m_ser.flush()
+            wait = self.getWriteWait(len(view_str), time.monotonic() - write_start)
+            if self.m_adaptive:
+                time.sleep(wait)
+                self.m_write_done = time.monotonic()
+            else:
+                self.m_write_done = time.monotonic()
+                time.sleep(wait)
+        pass
         return True
 
+    def startCapture(self, capture_file):
+        """ Record all traffic on this port to a capture file.
+
+        Args:
+            capture_file (str): Path of capture file, appended to if it exists.
+
+        Returns:
+            bool: True if the file is open.
+        """
+        self.stopCapture()
+        try:
+            self.m_capture = SerialCapture(capture_file)
+            return True
+        except:
+            ekm_log(traceback.format_exc(sys.exc_info()))
+        return False
+
+    def stopCapture(self):
+        """ Stop recording and close the capture file. """
+        if self.m_capture is not None:
+            self.m_capture.close()
+            self.m_capture = None
+
+    def setStatsContext(self, context_str):
+        """ Command context the following traffic is accounted to.
+
+        Called by :func:`~ekmmeters.Meter.setContext`.
+
+        Args:
+            context_str (str): Command context, e.g. "request[v4A]", "setRelay".
+        """
+        self.m_stats_context = context_str
+
+    def contextStats(self, context_str):
+        """ Accounting for one context, created on first use.
+
+        Args:
+            context_str (str): Command context.
+
+        Returns:
+            SerialStats: Accounting.
+        """
+        stats = self.m_stats.get(context_str)
+        if stats is None:
+            stats = SerialStats()
+            self.m_stats[context_str] = stats
+        return stats
+
+    def recordWrite(self, view_str):
+        """ Account a block about to be written.
+
+        Password and termination commands are accounted as "passwordAuth"
+        and "serialPostEnd" whatever command they are part of; everything
+        else to the current context.  The response that follows is
+        accounted to the same context.
+
+        Args:
+            view_str (bytes): Block.
+        """
+        if view_str == termination_command:
+            context_str = "serialPostEnd"
+        elif view_str[:3] == b"\x01P1":
+            context_str = "passwordAuth"
+        else:
+            context_str = self.m_stats_context or "(none)"
+        self.m_rx_stats = self.contextStats(context_str)
+        self.m_rx_stats.recordWrite(len(view_str))
+        if self.m_stats_log_interval > 0 and time.monotonic() - self.m_stats_logged >= self.m_stats_log_interval:
+            self.logSerialStats()
+
+    def getSerialStats(self, context_str=None):
+        """ Bus accounting per command context.
+
+        Args:
+            context_str (str): Optional context, default all.
+
+        Returns:
+            dict: Stats dict for context_str, or context to stats dict.
+        """
+        if context_str is not None:
+            return self.m_stats.get(context_str, SerialStats()).getStats()
+        return dict((context, stats.getStats()) for context, stats in self.m_stats.items())
+
+    def resetSerialStats(self):
+        """ Drop all accounting. """
+        self.m_stats = {}
+        self.m_rx_stats = None
+
+    def setStatsLogInterval(self, seconds):
+        """ Log a stats summary every so often, checked on each write.
+
+        Args:
+            seconds (float): Interval, 0 for never.
+        """
+        self.m_stats_log_interval = seconds
+        self.m_stats_logged = time.monotonic()
+
+    def logSerialStats(self):
+        """ Log one summary line per context. """
+        self.m_stats_logged = time.monotonic()
+
+        def fmt(ms):
+            return "-" if ms is None else "%.1f" % ms
+
+        for context_str in sorted(self.m_stats):
+            stats = self.m_stats[context_str]
+            ekm_log("Serial stats %s: %d writes, %d/%d bytes out/in, %d timeouts, %d NAKs, "
+                    "%d CRC failures, %d resyncs, first byte p50 %s ms, last byte p50/p95 %s/%s ms" %
+                    (context_str, stats.m_writes, stats.m_bytes_written, stats.m_bytes_read,
+                     stats.m_timeouts, stats.m_naks, stats.m_crc_failures, stats.m_resyncs,
+                     fmt(stats.m_first_byte.percentile(50)), fmt(stats.m_last_byte.percentile(50)),
+                     fmt(stats.m_last_byte.percentile(95))))
+
+    def setAdaptiveTiming(self, adaptive):
+        """ Select learned or fixed command timing.
+
+        Fixed timing sleeps force_wait after every write and every response
+        and gives up on a response after max_waits * force_wait.  Adaptive
+        timing only waits out the wire time of a write, leaves a two
+        character gap after a response, and once a meter has enough samples
+        sizes the response timeout from its measured latency percentile
+        plus frame time, with a safety margin.
+
+        Args:
+            adaptive (bool): True for learned timing.
+        """
+        self.m_adaptive = adaptive
+
+    def setTimingValues(self, pct=99, margin=0.5, floor=0.05, min_samples=5):
+        """ Optional adaptive timeout control.
+
+        Args:
+            pct (float): Latency and transfer percentile to budget for.
+            margin (float): Fractional safety margin on the budget.
+            floor (float): Seconds added to every budget.
+            min_samples (int): Samples before learned budgets replace fixed.
+        """
+        self.m_timing_pct = pct
+        self.m_timing_margin = margin
+        self.m_timing_floor = floor
+        self.m_timing_min_samples = min_samples
+
+    def setTimingMeter(self, meter_address):
+        """ Select the meter whose timing the next commands measure.
+
+        Called by :func:`~ekmmeters.Meter.setContext`, so every command is
+        accounted to the meter that issued it.
+
+        Args:
+            meter_address (str): 12 character meter address.
+        """
+        self.m_timing_meter = meter_address
+
+    def getTiming(self, meter_address=None):
+        """ Timing model of one meter, created on first use.
+
+        Args:
+            meter_address (str): Meter address, default the current meter.
+
+        Returns:
+            SerialTiming: Learned timing.
+        """
+        if meter_address is None:
+            meter_address = self.m_timing_meter
+        timing = self.m_timing.get(meter_address)
+        if timing is None:
+            timing = SerialTiming()
+            self.m_timing[meter_address] = timing
+        return timing
+
+    def getTimingStats(self, meter_address=None):
+        """ Learned timing per meter.
+
+        Args:
+            meter_address (str): Optional meter, default all meters.
+
+        Returns:
+            dict: Stats dict for meter_address, or meter address to stats dict.
+        """
+        if meter_address is not None:
+            stats = self.getTiming(meter_address).getStats()
+            stats["budget_ms"] = self.getResponseBudget(255, meter_address) * 1000.0
+            return stats
+        return dict((address, self.getTimingStats(address)) for address in self.m_timing)
+
+    def getResponseBudget(self, maxBytes=255, meter_address=None):
+        """ Seconds to wait for a response before giving up.
+
+        Fixed max_waits * force_wait until the meter has min_samples answered
+        commands or right after a timeout; then latency plus the longer of
+        measured transfer and maxBytes of frame time, at the configured
+        percentile, scaled by the margin plus the floor.
+
+        Args:
+            maxBytes (int): Length of complete response.
+            meter_address (str): Meter address, default the current meter.
+
+        Returns:
+            float: Timeout in seconds.
+        """
+        fixed = self.m_max_waits * self.m_force_wait
+        if not self.m_adaptive:
+            return fixed
+        timing = self.getTiming(meter_address)
+        if timing.m_last_timeout or timing.getSampleCount() < self.m_timing_min_samples:
+            return fixed
+        latency = timing.percentile("latency", self.m_timing_pct)
+        transfer = maxBytes * self.getCharTime()
+        measured = timing.percentile("transfer", self.m_timing_pct)
+        if measured is not None:
+            transfer = max(transfer, measured)
+        return (latency + transfer) * (1.0 + self.m_timing_margin) + self.m_timing_floor
+
+    def getWriteGap(self):
+        """ Seconds a write waits beyond its own wire time.
+
+        Returns:
+            float: force_wait for fixed timing, 0 for adaptive.
+        """
+        return 0.0 if self.m_adaptive else self.m_force_wait
+
+    def getResponseGap(self):
+        """ Seconds waited after a complete response.
+
+        Returns:
+            float: force_wait for fixed timing, two character times for adaptive.
+        """
+        return self.m_response_gap_chars * self.getCharTime() if self.m_adaptive else self.m_force_wait
+
     def setPollingValues(self, max_waits, wait_sleep):
         """ Optional polling loop control
 
@@ -1007,47 +2285,447 @@ class SerialPort(object):
         self.m_max_waits = max_waits
         self.m_wait_sleep = wait_sleep
 
-    def getResponse(self, context="", maxBytes=255):
-        """ Poll for finished block or first byte ACK.
+    def getCharTime(self):
+        """ Seconds on the wire per character.
+
+        Omnimeters use 7E1 framing: start, 7 data, parity and stop bits.
+
+        Returns:
+            float: Seconds per character at the port baud rate.
+        """
+        return 10.0 / self.m_baudrate
+
+    def getResponseCrc(self, response):
+        """ CRC computed while the last frame was being received.
+
+        Args:
+            response (bytes): Frame returned by getResponseBytes() or getResponse().
+
+        Returns:
+            str: Hex CRC of response, or None if response is not the last frame.
+        """
+        if response is None or self.m_last_response is None:
+            return None
+        if response is self.m_last_response or response is self.m_last_response_str:
+            return self.m_last_crc
+        return None
+
+    def setEventDriven(self, event_driven):
+        """ Select between event driven (select) and polled reception.
+
+        Args:
+            event_driven (bool): True to block on the port handle.
+        """
+        self.m_event_driven = event_driven
+
+    def waitForData(self, timeout):
+        """ Wait until bytes are available or timeout expires.
+
+        In event driven mode this blocks in select() on the port handle, so
+        it returns as soon as a byte lands.  Otherwise (or if the port has no
+        selectable handle) it sleeps one force_wait polling interval.
+
+        Args:
+            timeout (float): Longest wait in seconds.
+
+        Returns:
+            bool: True if data may be available.
+        """
+        if timeout <= 0:
+            return False
+        handle = self.getReadHandle() if self.m_event_driven else None
+        if handle is None:
+            time.sleep(min(self.m_force_wait, timeout))
+            return True
+        try:
+            ready, _, _ = select.select([handle], [], [], timeout)
+        except (OSError, ValueError):
+            time.sleep(min(self.m_force_wait, timeout))
+            return True
+        return len(ready) > 0
+
+    def getResponseBytes(self, context="", maxBytes=255):
+        """ Wait for finished block or first byte ACK, as bytes.
+
+        Returns as soon as a maxBytes frame has arrived or the first byte is
+        an ACK or NAK.  Gives up after the current meter's response budget,
+        see :func:`~ekmmeters.SerialPort.getResponseBudget`, and records the
+        measured latency and transfer time in its timing model.
+        Chunks are collected in one reusable receive buffer and the CRC is
+        accumulated as they arrive, see :func:`~ekmmeters.SerialPort.getResponseCrc`.
+        Stray bytes ahead of a frame are skipped, and a misaligned frame is
+        dropped up to the next STX, see :func:`~ekmmeters.SerialPort.readResponseChunk`.
+
         Args:
             context (str): internal serial call context.
+            maxBytes (int): Length of complete response.
 
         Returns:
-            string: Response, implict cast from byte array.
+            bytes: Complete response, one byte ACK or NAK, or empty on timeout.
         """
-        waits = 0  # allowed interval counter
-        response_str = bytearray()  # returned bytes in string default
+        deadline = self.beginResponse(maxBytes)
         try:
-            waits = 0  # allowed interval counter
-            while (waits < self.m_max_waits):
-                bytes_to_read = self.m_ser.inWaiting()
-                # ekm_log('%s bytes have arrived.'%bytes_to_read)
-                if bytes_to_read > 0:
-                    next_chunk = self.m_ser.read(bytes_to_read)
-                    response_str = bytearray().join((response_str,next_chunk))
-                    # ekm_log('Msg chunk recvd: "%s", total msg so far: "%s" (%d bytes)'%(next_chunk, response_str, len(response_str)))
-                    if (len(response_str) == maxBytes):
-                        time.sleep(self.m_force_wait)
-                        ekm_log('Received message is: %s'%response_str)
-                        return response_str.decode('ascii')
-                    #  1 byte responses from the meter are either ACK (= 0x06) or NAK (= 0x15)
-                    if (len(response_str) == 1) and ((response_str[0] == 0x06) or (response_str[0] == 0x15)):
-                        time.sleep(self.m_force_wait)
-                        ekm_log('ACK/NAK received message is: %s'%response_str)
-                        return b2a_hex(response_str).decode('ascii')
-                    #  else keep waiting
-                else:  # hang out -- half shortest expected interval (50 ms)
-                    waits += 1
-                    time.sleep(self.m_force_wait)
-            #  timed out -- throw away any received bytes and return empty string
-            ekm_log('No complete message received before timeout.  Received so far: "%s"'%response_str)
-            response_str = ""
+            while True:
+                response = self.readResponseChunk()
+                if response is not None:
+                    time.sleep(self.getResponseGap())
+                    return response
+                if not self.waitForData(deadline - time.monotonic()):
+                    break
+            self.endResponseTimeout()
 
         except:
             ekm_log(traceback.format_exc(sys.exc_info()))
 
+        return b""
+
+    def beginResponse(self, maxBytes=255):
+        """ Reset receive state for a new response.
+
+        First step of :func:`~ekmmeters.SerialPort.getResponseBytes`, shared
+        with the asyncio port in ekmasync.
+
+        Args:
+            maxBytes (int): Length of complete response.
+
+        Returns:
+            float: time.monotonic() deadline for the response.
+        """
+        if len(self.m_rx_buf) < 2 * maxBytes:
+            rx_buf = bytearray(2 * maxBytes)
+            rx_buf[:self.m_rx_received] = self.m_rx_buf[:self.m_rx_received]
+            self.m_rx_buf = rx_buf
+        self.m_rx_max = maxBytes
+        # Bytes left over from the last response are scanned before new ones.
+        self.m_rx_rescan = self.m_rx_received > 0
+        self.m_rx_crc = Crc16()
+        self.m_rx_crc_pos = 1
+        self.m_rx_timing = self.getTiming()
+        self.m_rx_first = None
+        if self.m_rx_stats is None:
+            self.m_rx_stats = self.contextStats(self.m_stats_context or "(none)")
+        self.m_last_response = None
+        self.m_last_response_str = None
+        self.m_last_crc = None
+        wait_start = time.monotonic()
+        self.m_rx_sent = self.m_write_done if self.m_write_done is not None else wait_start
+        return wait_start + self.getResponseBudget(maxBytes)
+
+    def readResponseChunk(self):
+        """ Take whatever bytes have arrived into the receive buffer.
+
+        The buffer must start with STX, ACK or NAK; anything else ahead of
+        them is noise and is skipped.  A full frame whose CRC fails is
+        misaligned unless its postamble sits in place, in which case it is
+        returned as is for the caller's CRC check to reject; otherwise it is
+        dropped up to the next STX and reception carries on.  Bytes after
+        the returned response stay in the buffer for the next one.
+
+        Returns:
+            bytes: Complete response or one byte ACK/NAK, None if more is expected.
+        """
+        bytes_to_read = self.m_ser.inWaiting()
+        # ekm_log('%s bytes have arrived.'%bytes_to_read)
+        if bytes_to_read <= 0 and not self.m_rx_rescan:
+            return None
+        self.m_rx_rescan = False
+        if self.m_rx_first is None:
+            self.m_rx_first = time.monotonic()
+        rx_buf = self.m_rx_buf
+        maxBytes = self.m_rx_max
+        crc_end = maxBytes - 2  # CRC covers everything between STX and CRC field
+        if bytes_to_read > 0:
+            chunk_start = self.m_rx_received
+            next_chunk = self.m_ser.read(min(bytes_to_read, len(rx_buf) - chunk_start))
+            if self.m_capture is not None:
+                self.m_capture.record(capture_read, next_chunk)
+            self.m_rx_received = chunk_start + len(next_chunk)
+            rx_buf[chunk_start:self.m_rx_received] = next_chunk
+            # ekm_log('Msg chunk recvd: "%s", total msg so far: %d bytes'%(next_chunk, self.m_rx_received))
+        while self.m_rx_received > 0:
+            received = self.m_rx_received
+            #  1 byte responses from the meter are either ACK (= 0x06) or NAK (= 0x15)
+            if (rx_buf[0] == frame_ack) or (rx_buf[0] == frame_nak):
+                latency = self.m_rx_first - self.m_rx_sent
+                self.m_rx_timing.record(latency)
+                self.m_rx_stats.recordResponse(1, latency, latency, nak=rx_buf[0] == frame_nak)
+                response = bytes(rx_buf[:1])
+                self.consumeResponse(1)
+                ekm_log('ACK/NAK received message is: %s'%response)
+                return response
+            if rx_buf[0] != frame_stx:
+                self.skipToFrameStart(1)
+                continue
+            crc_pos = min(received, crc_end)
+            if self.m_rx_crc_pos < crc_pos:
+                self.m_rx_crc.update(memoryview(rx_buf)[self.m_rx_crc_pos:crc_pos])
+                self.m_rx_crc_pos = crc_pos
+            if received < maxBytes:
+                return None
+            frame = bytes(rx_buf[:maxBytes])
+            crc_ok = self.m_rx_crc.digest() == frame[crc_end:]
+            if not crc_ok and frame[crc_end - len(frame_postamble):crc_end] != frame_postamble:
+                self.skipToFrameStart(1)
+                continue
+            done = time.monotonic()
+            self.m_rx_timing.record(self.m_rx_first - self.m_rx_sent, done - self.m_rx_first)
+            self.m_last_response = frame
+            self.m_last_crc = self.m_rx_crc.hexdigest()
+            self.m_rx_stats.recordResponse(maxBytes, self.m_rx_first - self.m_rx_sent, done - self.m_rx_sent,
+                                           crc_ok=crc_ok)
+            self.consumeResponse(maxBytes)
+            ekm_log('Received message is: %s'%self.m_last_response)
+            return self.m_last_response
+        #  else keep waiting
+        return None
+
+    def skipToFrameStart(self, start):
+        """ Drop receive buffer bytes up to the next possible response start.
+
+        Args:
+            start (int): First buffer offset which may hold STX, ACK or NAK.
+        """
+        rx_buf = self.m_rx_buf
+        received = self.m_rx_received
+        skip = received
+        for lead in (frame_stx, frame_ack, frame_nak):
+            found = rx_buf.find(lead, start, skip)
+            if found >= 0:
+                skip = found
+        ekm_log('Resync: skipped %d bytes: "%s"'%(skip, rx_buf[:skip]))
+        self.m_rx_stats.recordResync(skip)
+        rx_buf[:received - skip] = rx_buf[skip:received]
+        self.m_rx_received = received - skip
+        self.m_rx_crc = Crc16()
+        self.m_rx_crc_pos = 1
+
+    def consumeResponse(self, length):
+        """ Remove a returned response, keeping any bytes after it.
+
+        Args:
+            length (int): Response length.
+        """
+        received = self.m_rx_received
+        self.m_rx_buf[:received - length] = self.m_rx_buf[length:received]
+        self.m_rx_received = received - length
+
+    def responseStarted(self):
+        """ True if any byte arrived for the last response, even if it failed.
+
+        Tells a garbled or misaligned response, worth asking for again at
+        once, from a meter which is not answering at all.
+
+        Returns:
+            bool: True if the meter answered.
+        """
+        return self.m_rx_first is not None
+
+    def endResponseTimeout(self):
+        """ Give up on the current response: throw away received bytes. """
+        ekm_log('No complete message received before timeout.  Received so far: "%s"'%
+                self.m_rx_buf[:self.m_rx_received])
+        self.m_rx_timing.recordTimeout()
+        self.m_rx_stats.recordTimeout(self.m_rx_received)
+        self.m_rx_received = 0
+
+    def responseString(self, response):
+        """ getResponse() form of a getResponseBytes() result.
+
+        Args:
+            response (bytes): Response bytes.
+
+        Returns:
+            string: Response, implict cast from byte array; ACK and NAK as
+            "06" and "15"; empty string on timeout.
+        """
+        if len(response) == 1:
+            return b2a_hex(response).decode('ascii')
+        response_str = response.decode('latin-1')
+        if response:
+            self.m_last_response_str = response_str
         return response_str
 
+    def getResponse(self, context="", maxBytes=255):
+        """ Wait for finished block or first byte ACK.
+
+        String wrapper for :func:`~ekmmeters.SerialPort.getResponseBytes`.
+
+        Args:
+            context (str): internal serial call context.
+            maxBytes (int): Length of complete response.
+
+        Returns:
+            string: Response, implict cast from byte array; ACK and NAK as
+            "06" and "15"; empty string on timeout.
+        """
+        return self.responseString(self.getResponseBytes(context, maxBytes))
+
+
+class ReplaySerial(object):
+    """ Stand in for a pyserial port which answers from a capture.
+
+    Each write is matched to the next identical write in the capture, and
+    the chunks read after it in the capture become readable, either at
+    their recorded delays or at once.  Writes with no match in the rest of
+    the capture get no answer.
+    """
+
+    def __init__(self, records, realtime=True):
+        """
+        Args:
+            records (list): Records from :func:`~ekmmeters.read_capture`.
+            realtime (bool): Keep recorded response delays, else answer at once.
+        """
+        self.m_records = records
+        self.m_pos = 0
+        self.m_realtime = realtime
+        self.m_chunks = deque()     # [ready time, bytes]
+        self.m_unmatched = 0
+        pass
+
+    def write(self, data):
+        data = bytes(data)
+        records = self.m_records
+        for i in range(self.m_pos, len(records)):
+            if records[i][1] == capture_write and records[i][2] == data:
+                break
+        else:
+            self.m_unmatched += 1
+            ekm_log("Replay: write not in rest of capture: %s" % data)
+            return len(data)
+        now = time.monotonic()
+        write_time = records[i][0]
+        i += 1
+        while i < len(records) and records[i][1] != capture_write:
+            if records[i][1] == capture_read:
+                delay = max(records[i][0] - write_time, 0.0) if self.m_realtime else 0.0
+                self.m_chunks.append([now + delay, records[i][2]])
+            i += 1
+        self.m_pos = i
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.m_chunks.clear()
+
+    def inWaiting(self):
+        now = time.monotonic()
+        count = 0
+        for ready, chunk in self.m_chunks:
+            if ready > now:
+                break
+            count += len(chunk)
+        return count
+
+    def read(self, size):
+        out = bytearray()
+        now = time.monotonic()
+        while self.m_chunks and len(out) < size and self.m_chunks[0][0] <= now:
+            chunk = self.m_chunks[0][1]
+            take = size - len(out)
+            out += chunk[:take]
+            if take >= len(chunk):
+                self.m_chunks.popleft()
+            else:
+                self.m_chunks[0][1] = chunk[take:]
+        return bytes(out)
+
+    def nextReadyTime(self):
+        """ Returns:
+            float: time.monotonic() when more bytes are readable, None if none are coming.
+        """
+        return self.m_chunks[0][0] if self.m_chunks else None
+
+    def getUnmatchedWrites(self):
+        """ Returns:
+            int: Writes which found no match in the capture.
+        """
+        return self.m_unmatched
+
+
+class ReplaySerialPort(SerialPort):
+    """ SerialPort serving a recorded session back from a capture file.
+
+    Meter classes, ReadEKM cycle logic and benchmarks run unchanged against
+    it, without a meter, serial adapter or FakeEKM:
+
+        port = ReplaySerialPort('session.cap', realtime=False)
+        port.initPort()
+        meter = V4Meter('300000001', port)
+        meter.request()
+
+    At maximum speed (realtime False) every wait is skipped and a request
+    with no recorded answer fails at once.
+    """
+
+    def __init__(self, capture_file, realtime=True, baudrate=9600, force_wait=0.1, event_driven=True, adaptive=True):
+        """
+        Args:
+            capture_file (str): Capture written by :func:`~ekmmeters.SerialPort.startCapture`.
+            realtime (bool): optional, answer with the recorded delays, else at once.
+            baudrate (int): optional, used for wire time in realtime replay.
+            force_wait(float) : optional post commnd sleep, if required
+            event_driven (bool): optional, kept for interface compatibility.
+            adaptive (bool): optional, learned per meter timing.
+        """
+        super(ReplaySerialPort, self).__init__(capture_file, baudrate, force_wait, event_driven, adaptive)
+        self.m_realtime = realtime
+        if not realtime:
+            self.m_init_wait = 0.0
+        pass
+
+    def openSerial(self):
+        """ Load the capture in place of opening a port. """
+        self.m_ser = ReplaySerial(read_capture(self.m_ttyport), self.m_realtime)
+
+    def getReadHandle(self):
+        return None
+
+    def waitForData(self, timeout):
+        """ Wait until the next recorded chunk is due or timeout expires.
+
+        Args:
+            timeout (float): Longest wait in seconds.
+
+        Returns:
+            bool: True if data may be available.
+        """
+        if timeout <= 0:
+            return False
+        ready = self.m_ser.nextReadyTime()
+        if ready is None:
+            if self.m_realtime:
+                time.sleep(timeout)
+            return False
+        delay = ready - time.monotonic()
+        if delay > timeout:
+            time.sleep(timeout)
+            return False
+        if delay > 0:
+            time.sleep(delay)
+        return True
+
+    def getWriteWait(self, nbytes, elapsed=0.0):
+        if not self.m_realtime:
+            return 0.0
+        return super(ReplaySerialPort, self).getWriteWait(nbytes, elapsed)
+
+    def getWriteGap(self):
+        return super(ReplaySerialPort, self).getWriteGap() if self.m_realtime else 0.0
+
+    def getResponseGap(self):
+        return super(ReplaySerialPort, self).getResponseGap() if self.m_realtime else 0.0
+
+    def getUnmatchedWrites(self):
+        """ Writes which found no match in the capture.
+
+        Returns:
+            int: Count since the port was opened.
+        """
+        return self.m_ser.getUnmatchedWrites() if self.m_ser is not None else 0
+
 
 class MeterDB(object):
     """ Base class for single-table reads database abstraction."""
@@ -1155,8 +2833,8 @@ class MeterDB(object):
         """ Reasonably portable SQL INSERT for from combined read buffer.
         Args:
             def_buf (SerialBlock): Database only serial block of all fields.
-            raw_a (str): Raw A read as hex string.
-            raw_b (str): Raw B read (if exists, otherwise empty) as hex string.
+            raw_a (bytes): Raw A read, stored as hex string.
+            raw_b (bytes): Raw B read (if exists, otherwise empty), stored as hex string.
 
         Returns:
             str: SQL insert for passed read buffer
@@ -1186,9 +2864,13 @@ class MeterDB(object):
             qry_str = qry_str + delim + fld_str_content + delim
             count += 1
         time_val = int(time.time() * 1000)
+        if isinstance(raw_a, str):
+            raw_a = raw_a.encode('latin-1')
+        if isinstance(raw_b, str):
+            raw_b = raw_b.encode('latin-1')
         qry_str = (qry_str + ",\n\t" + str(time_val) + ",\n\t'" +
-                    b2a_hex(raw_a) + "'" + ",\n\t'" +
-                    b2a_hex(raw_b) + "'\n);")
+                    b2a_hex(raw_a).decode('ascii') + "'" + ",\n\t'" +
+                    b2a_hex(raw_b).decode('ascii') + "'\n);")
         ekm_log(qry_str, 4)
         return qry_str
 
@@ -1221,8 +2903,8 @@ class MeterDB(object):
         """ Call overridden dbExec() with built insert statement.
         Args:
             def_buf (SerialBlock): Block of read buffer fields to write.
-            raw_a (str): Hex string of raw A read.
-            raw_b (str): Hex string of raw B read or empty.
+            raw_a (bytes): Raw A read.
+            raw_b (bytes): Raw B read or empty.
         """
         self.dbExec(self.sqlInsert(def_buf, raw_a, raw_b))
 
@@ -1374,6 +3056,243 @@ class SqliteMeterDB(MeterDB):
         return result
 
 
+class CommandEncoder(object):
+    """ Builds Omnimeter command frames as bytes for one meter.
+
+    A command is SOH, a kind ('W' set, 'R' table read, 'P' password), '1',
+    STX, a 4 character register, the payload in parentheses, ETX and the
+    CRC of everything after SOH.  Frames with no variable part (A/B read
+    requests, table reads, password commands) are cached whole.  For set
+    commands the CRC state after the fixed header is cached per register,
+    so only the payload runs through the CRC.
+    """
+
+    def __init__(self, meter_address="000000000000"):
+        """
+        Args:
+            meter_address (str): 12 character meter address.
+        """
+        self.m_meter_address = meter_address.encode('ascii')
+        self.m_frames = {}
+        self.m_header_crc = {}
+        pass
+
+    def readRequest(self, block=""):
+        """ Read request frame.
+
+        Args:
+            block (str): "00" for a V4 A read, "01" for a V4 B read, "" for V3.
+
+        Returns:
+            bytes: Command to write to the port.
+        """
+        frame = self.m_frames.get(block)
+        if frame is None:
+            frame = b"/?" + self.m_meter_address + block.encode('ascii') + b"!\r\n"
+            self.m_frames[block] = frame
+        return frame
+
+    def passwordCommand(self, password):
+        """ Password frame.
+
+        Args:
+            password (str): 8 character password.
+
+        Returns:
+            bytes: Command to write to the port.
+        """
+        key = ("P", password)
+        frame = self.m_frames.get(key)
+        if frame is None:
+            frame = self.encode(b"P1\x02(", password.encode('ascii'))
+            self.m_frames[key] = frame
+        return frame
+
+    def readCommand(self, register):
+        """ Settings table read frame.
+
+        Args:
+            register (str): 4 character table register, e.g. "00B0".
+
+        Returns:
+            bytes: Command to write to the port.
+        """
+        key = ("R", register)
+        frame = self.m_frames.get(key)
+        if frame is None:
+            frame = self.encode(b"R1\x02" + register.encode('ascii') + b"(", b"")
+            self.m_frames[key] = frame
+        return frame
+
+    def writeCommand(self, register, payload):
+        """ Set command frame.
+
+        Args:
+            register (str): 4 character register, e.g. "0081" for relay 1.
+            payload (str): ASCII payload between the parentheses; bytes are accepted.
+
+        Returns:
+            bytes: Command to write to the port.
+        """
+        if isinstance(payload, str):
+            payload = payload.encode('ascii')
+        return self.encode(b"W1\x02" + register.encode('ascii') + b"(", payload)
+
+    def encode(self, header, payload):
+        """ Frame a command from its header and payload.
+
+        Args:
+            header (bytes): Bytes after SOH up to and including "(".
+            payload (bytes): Payload.
+
+        Returns:
+            bytes: SOH, header, payload, ")", ETX and CRC.
+        """
+        crc = self.m_header_crc.get(header)
+        if crc is None:
+            crc = Crc16(header)
+            self.m_header_crc[header] = crc
+        crc = crc.copy()
+        crc.update(payload)
+        crc.update(b")\x03")
+        return b"\x01" + header + payload + b")\x03" + crc.digest()
+
+
+class MeterSession(object):
+    """ Open, authenticate and close a meter once for a batch of commands.
+
+    Returned by :func:`~ekmmeters.Meter.session` and used in a "with"
+    statement.  Entering the session issues the opening read; commands in
+    the block then skip their own openMeter(), repeated password steps and
+    termination strings, and the termination string is sent once on exit.
+    Skipped bus traffic is counted; see :func:`~ekmmeters.MeterSession.getSavings`.
+    """
+
+    # Bytes written and read by each skipped step, and responses waited for.
+    # open: "/?" + 12 digit address + "00!\r\n" then a 255 byte frame.
+    # auth: 17 byte password command then ACK.  end: 5 byte termination.
+    step_traffic = {"open": (19, 255, 1), "auth": (17, 1, 1), "end": (5, 0, 0)}
+
+    def __init__(self, meter, password="00000000", open_read=None):
+        """
+        Args:
+            meter (Meter): Meter to hold open.
+            password (str): Password for commands in the session.
+            open_read (function): Optional opening read, default meter.openMeter.
+        """
+        self.m_meter = meter
+        self.m_password = password
+        self.m_open_read = open_read
+        self.m_opened = False
+        self.m_auth_password = None
+        self.m_active = False
+        self.m_skipped = {"open": 0, "auth": 0, "end": 0}
+        pass
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+        return False
+
+    def open(self):
+        """ Issue the opening read and start covering commands.
+
+        Returns:
+            bool: True if the opening read succeeded.
+        """
+        self.m_meter.m_session = None
+        open_read = self.m_open_read if self.m_open_read is not None else self.m_meter.openMeter
+        self.m_opened = bool(open_read())
+        self.m_auth_password = None
+        self.m_active = True
+        self.m_meter.m_session = self
+        return self.m_opened
+
+    def close(self):
+        """ Send the one termination string for the session. """
+        if not self.m_active:
+            return
+        self.m_active = False
+        self.m_meter.m_session = None
+        self.m_meter.serialPostEnd()
+
+    def isOpen(self):
+        """ Returns:
+            bool: True if the opening read succeeded.
+        """
+        return self.m_opened
+
+    def skip(self, step, password=None):
+        """ Check whether the session already covers a command step.
+
+        Args:
+            step (str): "open", "auth" or "end".
+            password (str): Password for "auth".
+
+        Returns:
+            bool: True if the step should not go on the bus.
+        """
+        if not self.m_active:
+            return False
+        if step == "open":
+            covered = self.m_opened
+        elif step == "auth":
+            covered = self.m_auth_password is not None and self.m_auth_password == password
+        else:
+            covered = True
+        if covered:
+            self.m_skipped[step] += 1
+        return covered
+
+    def opened(self, result):
+        """ Record an opening read made by a command in this session.
+
+        Args:
+            result (bool): True if the read succeeded.
+        """
+        if self.m_active and result:
+            self.m_opened = True
+
+    def authenticated(self, password):
+        """ Record a password accepted by the meter in this session.
+
+        Args:
+            password (str): Accepted password.
+        """
+        if self.m_active:
+            self.m_auth_password = password
+
+    def getSavings(self):
+        """ Bus traffic avoided so far by the session.
+
+        Time is wire time at the port baud rate plus the port's waits after
+        each write and response and the meter's median response latency.
+
+        Returns:
+            dict: "bytes", "ms" and per step skip counts.
+        """
+        port = self.m_meter.m_serial_port
+        char_time = port.getCharTime() if port is not None else 10.0 / 9600
+        write_gap = port.getWriteGap() if port is not None else 0
+        response_wait = 0
+        if port is not None:
+            latency = port.getTiming(self.m_meter.m_meter_address).percentile("latency", 50)
+            response_wait = port.getResponseGap() + (latency or 0)
+        saved_bytes = 0
+        saved_sec = 0.0
+        for step, count in self.m_skipped.items():
+            sent, received, responses = MeterSession.step_traffic[step]
+            saved_bytes += count * (sent + received)
+            saved_sec += count * ((sent + received) * char_time + write_gap + responses * response_wait)
+        savings = dict(self.m_skipped)
+        savings["bytes"] = saved_bytes
+        savings["ms"] = saved_sec * 1000.0
+        return savings
+
+
 class Meter(object):
     """ Abstract base class.  Encapuslates serial operations and buffers. """
 
@@ -1383,6 +3302,7 @@ class Meter(object):
             meter_address (str): 12 char EKM meter address on front of meter.
         """
         self.m_meter_address = meter_address.zfill(12)
+        self.m_encoder = CommandEncoder(self.m_meter_address)
         self.m_raw_read_a = ""
         self.m_raw_read_b = ""
         self.m_observers = []
@@ -1390,6 +3310,10 @@ class Meter(object):
         self.m_serial_port = serial_port
         self.m_command_msg = ""
         self.m_context = ""
+        self.m_reading = None
+        self.m_read_time = 0
+        self.m_session = None
+        self.m_read_retries = 1
 
         self.m_schd_1_to_4 = SerialBlock()
         self.initSchd_1_to_4()
@@ -1413,6 +3337,77 @@ class Meter(object):
 
         pass
 
+    def getRawReadA(self):
+        """ Last A read as string (implicit cast from bytes).
+
+        Returns:
+            str: Raw A read.
+        """
+        return self.m_raw_bytes_a.decode('latin-1')
+
+    def setRawReadA(self, raw_read):
+        """ Set last A read.
+
+        Args:
+            raw_read (bytes): Raw A read; str is accepted and stored as bytes.
+        """
+        if isinstance(raw_read, str):
+            raw_read = raw_read.encode('latin-1')
+        self.m_raw_bytes_a = bytes(raw_read)
+
+    def getRawReadB(self):
+        """ Last B read as string (implicit cast from bytes).
+
+        Returns:
+            str: Raw B read.
+        """
+        return self.m_raw_bytes_b.decode('latin-1')
+
+    def setRawReadB(self, raw_read):
+        """ Set last B read.
+
+        Args:
+            raw_read (bytes): Raw B read; str is accepted and stored as bytes.
+        """
+        if isinstance(raw_read, str):
+            raw_read = raw_read.encode('latin-1')
+        self.m_raw_bytes_b = bytes(raw_read)
+
+    # Raw reads are kept as bytes in m_raw_bytes_a and m_raw_bytes_b; these
+    # keep the older string attributes working.
+    m_raw_read_a = property(getRawReadA, setRawReadA)
+    m_raw_read_b = property(getRawReadB, setRawReadB)
+
+    def getReading(self):
+        """ Immutable snapshot of the last read, built once per read.
+
+        Returns:
+            MeterReading: Values, raw frames and receive time of last read.
+        """
+        if self.m_reading is None:
+            def_buf, raw_a, raw_b, crc_ok = self.readingSource()
+            self.m_reading = MeterReading.fromBlock(self.m_meter_address, self.m_read_time,
+                                                    def_buf, raw_a, raw_b, crc_ok)
+        return self.m_reading
+
+    def readingSource(self):
+        """ Buffer, raw frames and CRC result for :func:`~ekmmeters.Meter.getReading`.
+
+        Returns:
+            tuple: (SerialBlock, raw A bytes, raw B bytes, bool CRC ok)
+        """
+        return self.getReadBuffer(), self.m_raw_bytes_a, b"", getattr(self, "m_a_crc", False)
+
+    def notifyReading(self, observer):
+        """ Hand the snapshot of the last read to an observer which takes one.
+
+        Args:
+            observer (MeterObserver): Attached observer.
+        """
+        update_reading = getattr(observer, "updateReading", None)
+        if update_reading is not None:
+            update_reading(self.getReading())
+
     def initParamLists(self):
         """ Initialize all short in-object send buffers to zero. """
 
@@ -1465,6 +3460,34 @@ class Meter(object):
         ekm_log("Meter::request called in superclass.")
         return False
 
+    def session(self, password="00000000", open_read=None):
+        """ Batch commands in one open/authenticate/close exchange.
+
+        Use as "with meter.session() as session:".  See :class:`~ekmmeters.MeterSession`.
+
+        Args:
+            password (str): Password for commands in the session.
+            open_read (function): Optional opening read, e.g. request for V4 A and B.
+
+        Returns:
+            MeterSession: Session context manager.
+        """
+        return MeterSession(self, password, open_read)
+
+    def sessionSkip(self, step, password=None):
+        """ True if an active session already covers this command step.
+
+        Args:
+            step (str): "open", "auth" or "end".
+            password (str): Password for "auth".
+
+        Returns:
+            bool: True to leave the step off the bus.
+        """
+        if self.m_session is None:
+            return False
+        return self.m_session.skip(step, password)
+
     def openMeter(self):        # Never sends termination string
         """ Required override, issue A read to initiate communication with meter.
 
@@ -1481,6 +3504,31 @@ class Meter(object):
         ekm_log("Meter::serialPostEnd called in superclass.")
         pass
 
+    def setReadRetries(self, retries):
+        """ Set how often a garbled read is repeated before it counts as failed.
+
+        Args:
+            retries (int): Immediate repeats of a read, 0 for none.
+        """
+        self.m_read_retries = retries
+
+    def retryRead(self, attempt):
+        """ True if a failed read should be repeated at once.
+
+        Only reads which got an answer (bad CRC, noise or a misaligned
+        frame) are repeated; a meter which stays silent is not.
+
+        Args:
+            attempt (int): Zero based number of the read which failed.
+
+        Returns:
+            bool: True to repeat the read.
+        """
+        if attempt >= self.m_read_retries or not self.m_serial_port.responseStarted():
+            return False
+        ekm_log("(" + self.m_context + ") Garbled read, retrying.")
+        return True
+
     def setContext(self, context_str):
         """ Set context string for serial command.  Private setter.
 
@@ -1491,6 +3539,9 @@ class Meter(object):
             if context_str[0:7] != "request":
                 ekm_log("Context: " + context_str)
         self.m_context = context_str
+        if self.m_serial_port is not None:
+            self.m_serial_port.setTimingMeter(self.m_meter_address)
+            self.m_serial_port.setStatsContext(context_str)
 
     def getContext(self):
         """ Get context string for current serial command.  Private getter.
@@ -1503,6 +3554,43 @@ class Meter(object):
     def calc_crc16(self, buf):
         return calc_crc16(buf)
 
+    def responseCrc(self, raw_read):
+        """ CRC of a frame read from the serial port.
+
+        Uses the CRC the port accumulated while receiving the frame, and
+        only recalculates when it is not available.
+
+        Args:
+            raw_read (bytes): Frame from serial read; str (implicit cast) is accepted.
+
+        Returns:
+            str: 16 bit CRC formatted as hex string.
+        """
+        if self.m_serial_port is not None:
+            port_crc = self.m_serial_port.getResponseCrc(raw_read)
+            if port_crc is not None:
+                return port_crc
+        if isinstance(raw_read, str):
+            raw_read = raw_read.encode('ascii')
+        return self.calc_crc16(raw_read[1:-2])
+
+    def frameCrcOk(self, raw_read):
+        """ CRC check of a raw frame, without decoding its crc16 field.
+
+        Args:
+            raw_read (bytes): Serial read.
+
+        Returns:
+            bool: True if the CRC sent in the frame matches.
+        """
+        if len(raw_read) < 3:
+            ekm_log("(" + self.m_context + ") Empty return read.")
+            return False
+        calc_crc = self.responseCrc(raw_read)
+        ekm_log("(" + self.m_context + ")CRC sent = " + b2a_hex(raw_read[-2:]).decode('ascii') +
+                " CRC calc = " + calc_crc)
+        return int(calc_crc, 16) == int.from_bytes(raw_read[-2:], "big")
+
     def calcPF(self, pf):
         """ Simple wrap to calc legacy PF value
 
@@ -1546,9 +3634,7 @@ class Meter(object):
                 if not self.serialCmdPwdAuth(password):
                     self.writeCmdMsg("Password failure")
                 else:
-                    req_str = "015731023030353028" + str(period).zfill(2).encode().hex() + "2903"
-                    req_str += self.calc_crc16(a2b_hex(req_str[2:]))
-                    self.m_serial_port.write(a2b_hex(req_str))
+                    self.m_serial_port.write(self.m_encoder.writeCommand("0050", str(period).zfill(2)))
                     if self.m_serial_port.getResponse(self.getContext()) == "06":
                         self.writeCmdMsg("Success(setMaxDemandPeriod): 06 returned.")
                         result = True
@@ -1583,9 +3669,7 @@ class Meter(object):
                 if not self.serialCmdPwdAuth(password):
                     self.writeCmdMsg("Password failure")
                 else:
-                    req_str = "015731023030443528" + str(interval).zfill(1).encode().hex() + "2903"
-                    req_str += self.calc_crc16(a2b_hex(req_str[2:]))
-                    self.m_serial_port.write(a2b_hex(req_str))
+                    self.m_serial_port.write(self.m_encoder.writeCommand("00D5", str(interval).zfill(1)))
                     if self.m_serial_port.getResponse(self.getContext()) == "06":
                         self.writeCmdMsg("Success (setMaxDemandResetInterval): 06 returned.")
                         result = True
@@ -1620,10 +3704,7 @@ class Meter(object):
                 if not self.serialCmdPwdAuth(pwd):
                     self.writeCmdMsg("Password failure")
                 else:
-                    req_pwd = new_pwd.zfill(8).encode().hex()
-                    req_str = "015731023030323028" + req_pwd + "2903"
-                    req_str += self.calc_crc16(a2b_hex(req_str[2:]))
-                    self.m_serial_port.write(a2b_hex(req_str))
+                    self.m_serial_port.write(self.m_encoder.writeCommand("0020", new_pwd.zfill(8)))
                     if self.m_serial_port.getResponse(self.getContext()) == "06":
                         self.writeCmdMsg("Success(setMeterPassword): 06 returned.")
                         result = True
@@ -1631,41 +3712,146 @@ class Meter(object):
                         self.writeCmdMsg("Failure(setMeterPassword): Not 06 returned.")
                         result = False
 
-            self.serialPostEnd()
-        except:
-            ekm_log(traceback.format_exc(sys.exc_info()))
+            self.serialPostEnd()
+        except:
+            ekm_log(traceback.format_exc(sys.exc_info()))
+
+        self.setContext("")
+        return result
+
+    def unpackStruct(self, data, def_buf):
+        """ Wrapper for struct.unpack with SerialBlock buffer definitionns.
+
+        Args:
+            data (bytes): Serial port return; str (implicit cast) is accepted.
+            def_buf (SerialBlock): Block object holding field lengths.
+
+        Returns:
+            tuple: parsed result of struct.unpack() with field definitions.
+        """
+        layout = def_buf.layout()
+        if isinstance(data, str):
+            data = data.encode('ascii')
+        if (layout.m_size == 255) and (len(data) == 255):
+            contents = layout.m_struct.unpack(data)
+        else:
+            if layout.m_size != 255:
+                self.writeCmdMsg('Structure format size is not 255 = expected data size.')
+            if len(data) != 255:
+                self.writeCmdMsg("Length error.  Len() size = " + str(len(data)))
+            contents = ()
+        return contents
+
+
+
+    def convertData(self, contents, def_buf, kwh_scale=ScaleKWH.EmptyScale):
+        """ Move data from raw tuple into scaled and conveted values.
+
+        Uses the block's generated decoder, see
+        :func:`~ekmmeters.BlockLayout.decoder`, and falls back to
+        :func:`~ekmmeters.Meter.convertDataGeneric`.
+
+        Args:
+            contents (tuple): Breakout of passed block from unpackStruct().
+            def_buf (): Read buffer destination.
+            kwh_scale (int):  :class:`~ekmmeters.ScaleKWH` as int, from Field.kWhScale`
+
+        Returns:
+            bool: True on completion.
+        """
+        kwh_scale = self.resolveKwhScale(contents, def_buf, kwh_scale)
+        def_buf.m_pending = None    # a fresh decode replaces any deferred read
+
+        if len(contents) == 0:
+            return True
+
+        decoder = def_buf.layout().decoder()
+        if decoder is None:
+            return self.convertDataGeneric(contents, def_buf, kwh_scale)
+
+        return decoder(contents, def_buf, self.kwhDivisor(kwh_scale), self.convertFieldError)
+
+    def decodePending(self):
+        """ Finish decoding of deferred reads.  Overridden by meters which defer. """
+        pass
+
+    def deferData(self, contents, def_buf, kwh_scale=ScaleKWH.EmptyScale):
+        """ Lazy counterpart of :func:`~ekmmeters.Meter.convertData`.
+
+        Keeps the unpacked read in def_buf; fields are converted when first
+        asked for, see :func:`~ekmmeters.SerialBlock.decodeField`.
+
+        Args:
+            contents (tuple): Breakout of passed block from unpackStruct().
+            def_buf (SerialBlock): Read buffer destination.
+            kwh_scale (int):  :class:`~ekmmeters.ScaleKWH` as int, from Field.kWhScale`
+
+        Returns:
+            bool: True on completion.
+        """
+        kwh_scale = self.resolveKwhScale(contents, def_buf, kwh_scale)
+        def_buf.m_pending = None
+        if len(contents) == 0:
+            return True
+        if def_buf.layout().decoder() is None:
+            return self.convertDataGeneric(contents, def_buf, kwh_scale)
+        def_buf.defer(contents, self.kwhDivisor(kwh_scale), self.convertFieldError)
+        return True
+
+    def resolveKwhScale(self, contents, def_buf, kwh_scale):
+        """ kWh scale to apply to a read, taken from the read if unknown.
 
-        self.setContext("")
-        return result
+        Args:
+            contents (tuple): Breakout of passed block from unpackStruct().
+            def_buf (SerialBlock): Block definition for contents.
+            kwh_scale (int):  :class:`~ekmmeters.ScaleKWH` as int.
 
-    def unpackStruct(self, data, def_buf):
-        """ Wrapper for struct.unpack with SerialBlock buffer definitionns.
+        Returns:
+            int: :class:`~ekmmeters.ScaleKWH` as int.
+        """
+        # getting scale does not require a full read.  It does require that the
+        # reads have the scale value in the first block read.  This requirement
+        # is filled by default in V3 and V4 requests.  Every read carrying the
+        # scale uses its own; only blocks without it fall back to the last one.
+        if kwh_scale == ScaleKWH.EmptyScale:
+            scale_offset = def_buf.layout().m_scale_index
+            kwh_scale = self.m_kwh_precision
+            if scale_offset is not None and len(contents) > scale_offset:
+                try:
+                    self.m_kwh_precision = kwh_scale = int(contents[scale_offset])
+                except ValueError:
+                    ekm_log("Unrecognized kwh scale.")
+        return kwh_scale
+
+    def kwhDivisor(self, kwh_scale):
+        """ Divisor for kWh scaled fields.
 
         Args:
-            data (str): Implicit cast bytes to str, serial port return.
-            def_buf (SerialBlock): Block object holding field lengths.
+            kwh_scale (int):  :class:`~ekmmeters.ScaleKWH` as int.
 
         Returns:
-            tuple: parsed result of struct.unpack() with field definitions.
+            int: 1, 10 or 100.
         """
-        struct_str = "="
-        for fld in def_buf:
-            if not def_buf[fld][MeterData.CalculatedFlag]:
-                struct_str = struct_str + str(def_buf[fld][MeterData.SizeValue]) + "s"
-        if (struct.calcsize(struct_str) == 255) and (len(data) == 255):
-            contents = struct.unpack(struct_str, data.encode('ascii'))
-        else:
-            if struct.calcsize(struct_str) != 255:
-                self.writeCmdMsg('Structure format size is not 255 = expected data size.')
-            if len(data) != 255:
-                self.writeCmdMsg("Length error.  Len() size = " + str(len(data)))
-            contents = ()
-        return contents
+        if kwh_scale == ScaleKWH.Scale10:
+            return 10
+        if kwh_scale == ScaleKWH.Scale100:
+            return 100
+        if (kwh_scale != ScaleKWH.NoScale) and (kwh_scale != ScaleKWH.EmptyScale):
+            ekm_log("Unrecognized kwh scale.")
+        return 1
 
+    def convertFieldError(self, fld):
+        """ Report a field which failed conversion.
 
+        Args:
+            fld (str): Field name.
+        """
+        ekm_log("Exception on Field:" + str(fld))
+        ekm_log(traceback.format_exc(sys.exc_info()))
+        self.writeCmdMsg("Exception on Field:" + str(fld))
 
-    def convertData(self, contents, def_buf, kwh_scale=ScaleKWH.EmptyScale):
-        """ Move data from raw tuple into scaled and conveted values.
+    def convertDataGeneric(self, contents, def_buf, kwh_scale=ScaleKWH.EmptyScale):
+        """ Field by field conversion of raw tuple, without generated code.
 
         Args:
             contents (tuple): Breakout of passed block from unpackStruct().
@@ -1675,16 +3861,7 @@ class Meter(object):
         Returns:
             bool: True on completion.
         """
-        log_str = ""
         count = 0
-        
-        # getting scale does not require a full read.  It does require that the
-        # reads have the scale value in the first block read.  This requirement
-        # is filled by default in V3 and V4 requests
-        if kwh_scale == ScaleKWH.EmptyScale:
-            if self.m_kwh_precision == ScaleKWH.EmptyScale :
-                scale_offset = int(list(def_buf.keys()).index(Field.kWh_Scale))
-                self.m_kwh_precision = kwh_scale = int(contents[scale_offset])
 
         for fld in def_buf:
 
@@ -1748,12 +3925,8 @@ class Meter(object):
                 else:
                     ekm_log("Unrecognized field type")
 
-                log_str = log_str + '"' + fld + '":  "' + def_buf[fld][MeterData.StringValue] + '"\n'
-
             except:
-                ekm_log("Exception on Field:" + str(fld))
-                ekm_log(traceback.format_exc(sys.exc_info()))
-                self.writeCmdMsg("Exception on Field:" + str(fld))
+                self.convertFieldError(fld)
 
             count += 1
 
@@ -1769,6 +3942,7 @@ class Meter(object):
             str: JSON rendering of meter record.
         """
         try:
+            self.decodePending()
             ret_dict = SerialBlock()
             ret_dict[Field.Meter_Address] = self.getMeterAddress()
             for fld in def_buf:
@@ -1784,7 +3958,7 @@ class Meter(object):
         """ Internal read CRC wrapper.
 
         Args:
-            raw_read (str): Bytes with implicit string cast from serial read
+            raw_read (bytes): Serial read; str (implicit cast) is accepted.
             def_buf (SerialBlock): Populated read buffer.
 
         Returns:
@@ -1794,7 +3968,7 @@ class Meter(object):
             if len(raw_read) == 0:
                 ekm_log("(" + self.m_context + ") Empty return read.")
                 return False
-            sent_crc = self.calc_crc16(raw_read[1:-2].encode('ascii'))
+            sent_crc = self.responseCrc(raw_read)
             logstr = "(" + self.m_context + ")CRC sent = " + str(def_buf["crc16"][MeterData.StringValue])
             logstr += " CRC calc = " + sent_crc
             ekm_log(logstr)
@@ -1879,6 +4053,26 @@ class Meter(object):
         """
         return self.m_meter_address
 
+    def getTimingStats(self):
+        """ Response timing the serial port has learned for this meter.
+
+        Returns:
+            dict: See :func:`~ekmmeters.SerialPort.getTimingStats`.
+        """
+        if self.m_serial_port is None:
+            return {}
+        return self.m_serial_port.getTimingStats(self.m_meter_address)
+
+    def getSerialStats(self):
+        """ Bus accounting per command context of this meter's serial port.
+
+        Returns:
+            dict: See :func:`~ekmmeters.SerialPort.getSerialStats`.
+        """
+        if self.m_serial_port is None:
+            return {}
+        return self.m_serial_port.getSerialStats()
+
     def registerObserver(self, observer):
         """ Place an observer in the meter update() chain.
 
@@ -2197,9 +4391,7 @@ class Meter(object):
                 if not self.serialCmdPwdAuth(password):
                     self.writeCmdMsg("Password failure")
                 else:
-                    req_str = "015731023030343028" + str(0).zfill(6).encode().hex() + "2903"
-                    req_str += self.calc_crc16(a2b_hex(req_str[2:]))
-                    self.m_serial_port.write(a2b_hex(req_str))
+                    self.m_serial_port.write(self.m_encoder.writeCommand("0040", "000000"))
                     if self.m_serial_port.getResponse(self.getContext()) == "06":
                         self.writeCmdMsg("Success(setMaxDemandResetNow): 06 returned.")
                         result = True
@@ -2237,33 +4429,9 @@ class Meter(object):
         result = False
         self.setContext("setTime")
         try:
-            if mm < 1 or mm > 12:
-                self.writeCmdMsg("Month must be between 1 and 12")
-                self.setContext("")
-                return result
-
-            if dd < 1 or dd > 31:
-                self.writeCmdMsg("Day must be between 1 and 31")
-                self.setContext("")
-                return result
-
-            if hh < 0 or hh > 23:
-                self.writeCmdMsg("Hour must be between 0 and 23, inclusive")
-                self.setContext("")
-                return result
-
-            if minutes < 0 or minutes > 59:
-                self.writeCmdMsg("Minutes must be between 0 and 59, inclusive")
-                self.setContext("")
-                return result
-
-            if ss < 0 or ss > 59:
-                self.writeCmdMsg("Seconds must be between 0 and 59, inclusive")
-                self.setContext("")
-                return result
-
-            if len(password) != 8:
-                self.writeCmdMsg("Invalid password length.")
+            error_msg = self.checkTimeArgs(yy, mm, dd, hh, minutes, ss, password)
+            if error_msg:
+                self.writeCmdMsg(error_msg)
                 self.setContext("")
                 return result
 
@@ -2273,22 +4441,7 @@ class Meter(object):
                 if not self.serialCmdPwdAuth(password):
                     self.writeCmdMsg("Password failure")
                 else:
-                    dt_buf = datetime.datetime(int(yy), int(mm), int(dd), int(hh), int(minutes), int(ss))
-                    ekm_log("Writing Date and Time " + dt_buf.strftime("%Y-%m-%d %H:%M:%S"))
-                    dayofweek = dt_buf.date().isoweekday()
-                    ekm_log("Calculated weekday " + str(dayofweek))
-
-                    req_str = "015731023030363028"
-                    req_str += str(yy)[-2:].encode().hex()
-                    req_str += str(mm).zfill(2).encode().hex()
-                    req_str += str(dd).zfill(2).encode().hex()
-                    req_str += str(dayofweek).zfill(2).encode().hex()
-                    req_str += str(hh).zfill(2).encode().hex()
-                    req_str += str(minutes).zfill(2).encode().hex()
-                    req_str += str(ss).zfill(2).encode().hex()
-                    req_str += "2903"
-                    req_str += self.calc_crc16(a2b_hex(req_str[2:]))
-                    self.m_serial_port.write(a2b_hex(req_str))
+                    self.m_serial_port.write(self.buildTimeCommand(yy, mm, dd, hh, minutes, ss))
                     response = self.m_serial_port.getResponse(self.getContext())
                     if response == "06":
                         self.writeCmdMsg("Success(setTime): 06 returned.")
@@ -2300,6 +4453,41 @@ class Meter(object):
         self.setContext("")
         return result
 
+    def checkTimeArgs(self, yy, mm, dd, hh, minutes, ss, password):
+        """ Range check :func:`~ekmmeters.Meter.setTime` arguments.
+
+        Returns:
+            str: Command message for the first bad argument, empty if all good.
+        """
+        if mm < 1 or mm > 12:
+            return "Month must be between 1 and 12"
+        if dd < 1 or dd > 31:
+            return "Day must be between 1 and 31"
+        if hh < 0 or hh > 23:
+            return "Hour must be between 0 and 23, inclusive"
+        if minutes < 0 or minutes > 59:
+            return "Minutes must be between 0 and 59, inclusive"
+        if ss < 0 or ss > 59:
+            return "Seconds must be between 0 and 59, inclusive"
+        if len(password) != 8:
+            return "Invalid password length."
+        return ""
+
+    def buildTimeCommand(self, yy, mm, dd, hh, minutes, ss):
+        """ Set time command bytes, with day of week calculation.
+
+        Returns:
+            bytes: Command to write to the port.
+        """
+        dt_buf = datetime.datetime(int(yy), int(mm), int(dd), int(hh), int(minutes), int(ss))
+        ekm_log("Writing Date and Time " + dt_buf.strftime("%Y-%m-%d %H:%M:%S"))
+        dayofweek = dt_buf.date().isoweekday()
+        ekm_log("Calculated weekday " + str(dayofweek))
+
+        return self.m_encoder.writeCommand("0060", str(yy)[-2:] + str(mm).zfill(2) + str(dd).zfill(2) +
+                                           str(dayofweek).zfill(2) + str(hh).zfill(2) +
+                                           str(minutes).zfill(2) + str(ss).zfill(2))
+
     def setCTRatio(self, new_ct, password="00000000"):
         """ Serial call to set CT ratio for attached inductive pickup.
 
@@ -2336,9 +4524,7 @@ class Meter(object):
                 if not self.serialCmdPwdAuth(password):
                     self.writeCmdMsg("Password failure")
                 else:
-                    req_str = "015731023030443028" + str(new_ct).zfill(4).encode().hex() + "2903"
-                    req_str += self.calc_crc16(a2b_hex(req_str[2:]))
-                    self.m_serial_port.write(a2b_hex(req_str))
+                    self.m_serial_port.write(self.m_encoder.writeCommand("00D0", str(new_ct).zfill(4)))
                     if self.m_serial_port.getResponse(self.getContext()) == "06":
                         self.writeCmdMsg("Success(setCTRatio): 06 returned.")
                         ret = True
@@ -2428,11 +4614,7 @@ class Meter(object):
                     req_table += str(cmd_dict["Rate_4"]).zfill(2).encode().hex()
                     req_table += str(0).zfill(24).encode().hex()
 
-                    table = str(cmd_dict["Schedule"]).zfill(1).encode().hex()
-
-                    req_str = "01573102303037" + table + "28" + req_table + "2903"
-                    req_str += self.calc_crc16(a2b_hex(req_str[2:]))
-                    self.m_serial_port.write(a2b_hex(req_str))
+                    self.m_serial_port.write(self.m_encoder.writeCommand("007" + str(cmd_dict["Schedule"]).zfill(1), a2b_hex(req_table)))
                     if self.m_serial_port.getResponse(self.getContext()) == "06":
                         self.writeCmdMsg("Success(setScheduleTariffs): 06 returned.")
                         result = True
@@ -2522,9 +4704,7 @@ class Meter(object):
                     req_table += str(cmd_dict["Season_4_Start_Day"]).zfill(2).encode().hex()
                     req_table += str(cmd_dict["Season_4_Schedule"]).zfill(2).encode().hex()
                     req_table += str(0).zfill(24).encode().hex()
-                    req_str = "015731023030383028" + req_table + "2903"
-                    req_str += self.calc_crc16(a2b_hex(req_str[2:]))
-                    self.m_serial_port.write(a2b_hex(req_str))
+                    self.m_serial_port.write(self.m_encoder.writeCommand("0080", a2b_hex(req_table)))
                     if self.m_serial_port.getResponse(self.getContext()) == "06":
                         self.writeCmdMsg("Success(setSeasonSchedules): 06 returned.")
                         result = True
@@ -2631,9 +4811,7 @@ class Meter(object):
                     req_table += str(cmd_dict["Holiday_19_Day"]).zfill(2).encode().hex()
                     req_table += str(cmd_dict["Holiday_20_Month"]).zfill(2).encode().hex()
                     req_table += str(cmd_dict["Holiday_20_Day"]).zfill(2).encode().hex()
-                    req_str = "015731023030423028" + req_table + "2903"
-                    req_str += self.calc_crc16(a2b_hex(req_str[2:]))
-                    self.m_serial_port.write(a2b_hex(req_str))
+                    self.m_serial_port.write(self.m_encoder.writeCommand("00B0", a2b_hex(req_table)))
                     if self.m_serial_port.getResponse(self.getContext()) == "06":
                         self.writeCmdMsg("Success(setHolidayDates: 06 returned.")
                         result = True
@@ -2664,11 +4842,7 @@ class Meter(object):
                 if not self.serialCmdPwdAuth(password):
                     self.writeCmdMsg("Password failure")
                 else:
-                    req_wkd = str(new_wknd).zfill(2).encode().hex()
-                    req_hldy = str(new_hldy).zfill(2).encode().hex()
-                    req_str = "015731023030433028" + req_wkd + req_hldy + "2903"
-                    req_str += self.calc_crc16(a2b_hex(req_str[2:]))
-                    self.m_serial_port.write(a2b_hex(req_str))
+                    self.m_serial_port.write(self.m_encoder.writeCommand("00C0", str(new_wknd).zfill(2) + str(new_hldy).zfill(2)))
                     if self.m_serial_port.getResponse(self.getContext()) == "06":
                         self.writeCmdMsg("Success(setWeekendHolidaySchedules): 06 returned.")
                         result = True
@@ -2690,40 +4864,57 @@ class Meter(object):
         """
         self.setContext("readScheduleTariffs")
         try:
-            req_table = str(tableset).zfill(1).encode().hex()
-            req_str = "01523102303037" + req_table + "282903"
+            req_cmd, work_table = self.buildScheduleTariffsRead(tableset)
 
             if not self.openMeter():
                 self.writeCmdMsg("Initiate connection to meter failed.")
                 return False
-            req_crc = self.calc_crc16(a2b_hex(req_str[2:]))
-            req_str += req_crc
-            self.m_serial_port.write(a2b_hex(req_str))
+            self.m_serial_port.write(req_cmd)
             raw_ret = self.m_serial_port.getResponse(self.getContext())
             self.serialPostEnd()
-            return_crc = self.calc_crc16(raw_ret[1:-2])
-
-            if tableset == ReadSchedules.Schedules_1_To_4:
-                unpacked_read = self.unpackStruct(raw_ret, self.m_schd_1_to_4)
-                self.convertData(unpacked_read, self.m_schd_1_to_4, self.m_kwh_precision)
-                if str(return_crc) == str(self.m_schd_1_to_4["crc16"][MeterData.StringValue]):
-                    ekm_log("Schedules 1 to 4 CRC success (06 return")
-                    self.setContext("")
-                    return True
-
-            elif tableset == ReadSchedules.Schedules_5_To_8:
-                unpacked_read = self.unpackStruct(raw_ret, self.m_schd_5_to_8)
-                self.convertData(unpacked_read, self.m_schd_5_to_8, self.m_kwh_precision)
-                if str(return_crc) == str(self.m_schd_5_to_8["crc16"][MeterData.StringValue]):
-                    ekm_log("Schedules 5 to 8 CRC success (06 return)")
-                    self.setContext("")
-                    return True
+
+            if work_table is not None and self.finishSettingsRead(raw_ret, work_table):
+                ekm_log("Schedules " + ("1 to 4" if tableset == ReadSchedules.Schedules_1_To_4 else "5 to 8") +
+                        " CRC success (06 return)")
+                self.setContext("")
+                return True
         except:
             ekm_log(traceback.format_exc(sys.exc_info()))
 
         self.setContext("")
         return False
 
+    def buildScheduleTariffsRead(self, tableset):
+        """ Command and target buffer for :func:`~ekmmeters.Meter.readScheduleTariffs`.
+
+        Args:
+            tableset (int): :class:`~ekmmeters.ReadSchedules` buffer to return.
+
+        Returns:
+            tuple: (command bytes, SerialBlock or None for an unknown tableset)
+        """
+        work_table = None
+        if tableset == ReadSchedules.Schedules_1_To_4:
+            work_table = self.m_schd_1_to_4
+        elif tableset == ReadSchedules.Schedules_5_To_8:
+            work_table = self.m_schd_5_to_8
+        return self.m_encoder.readCommand("007" + str(tableset).zfill(1)), work_table
+
+    def finishSettingsRead(self, raw_ret, work_table):
+        """ Decode a settings read response into its buffer and check the CRC.
+
+        Args:
+            raw_ret (str): Response from getResponse().
+            work_table (SerialBlock): Settings buffer.
+
+        Returns:
+            bool: True on CRC match.
+        """
+        return_crc = self.responseCrc(raw_ret)
+        unpacked_read = self.unpackStruct(raw_ret, work_table)
+        self.convertData(unpacked_read, work_table, self.m_kwh_precision)
+        return str(return_crc) == str(work_table["crc16"][MeterData.StringValue])
+
     def extractScheduleTariff(self, schedule, tariff):
         """ Read a single schedule tariff from meter object buffer.
 
@@ -2782,26 +4973,16 @@ class Meter(object):
         """
         self.setContext("readMonthTariffs")
         try:
-
-            req_type = str(months_type).zfill(1).encode().hex()
-            req_str = "01523102303031" + req_type + "282903"
-            work_table = self.m_mons
-            if months_type == ReadMonths.kWhReverse:
-                work_table = self.m_rev_mons
+            req_cmd, work_table = self.buildMonthTariffsRead(months_type)
 
             if not self.openMeter():
                 self.writeCmdMsg("Initiate connection to meter failed.")
                 return False
-            req_crc = self.calc_crc16(a2b_hex(req_str[2:]))
-            req_str += req_crc
-            self.m_serial_port.write(a2b_hex(req_str))
+            self.m_serial_port.write(req_cmd)
             raw_ret = self.m_serial_port.getResponse(self.getContext())
             self.serialPostEnd()
-            unpacked_read = self.unpackStruct(raw_ret, work_table)
-            self.convertData(unpacked_read, work_table, self.m_kwh_precision)
-            return_crc = self.calc_crc16(raw_ret[1:-2])
-            if str(return_crc) == str(work_table["crc16"][MeterData.StringValue]):
-                ekm_log("Months CRC success, type = " + str(req_type))
+            if self.finishSettingsRead(raw_ret, work_table):
+                ekm_log("Months CRC success, type = " + str(months_type).zfill(1).encode().hex())
                 self.setContext("")
                 return True
         except:
@@ -2810,6 +4991,20 @@ class Meter(object):
         self.setContext("")
         return False
 
+    def buildMonthTariffsRead(self, months_type):
+        """ Command and target buffer for :func:`~ekmmeters.Meter.readMonthTariffs`.
+
+        Args:
+            months_type (int): A :class:`~ekmmeters.ReadMonths` value.
+
+        Returns:
+            tuple: (command bytes, SerialBlock)
+        """
+        work_table = self.m_mons
+        if months_type == ReadMonths.kWhReverse:
+            work_table = self.m_rev_mons
+        return self.m_encoder.readCommand("001" + str(months_type).zfill(1)), work_table
+
     def extractMonthTariff(self, month):
         """ Extract the tariff for a single month from the meter object buffer.
 
@@ -2867,19 +5062,13 @@ class Meter(object):
         """
         self.setContext("readHolidayDates")
         try:
-            req_str = "0152310230304230282903"
             if not self.openMeter():
                 self.writeCmdMsg("Initiate connection to meter failed.")
                 return False
-            req_crc = self.calc_crc16(a2b_hex(req_str[2:]))
-            req_str += req_crc
-            self.m_serial_port.write(a2b_hex(req_str))
+            self.m_serial_port.write(self.buildHolidayDatesRead())
             raw_ret = self.m_serial_port.getResponse(self.getContext())
             self.serialPostEnd()
-            unpacked_read = self.unpackStruct(raw_ret, self.m_hldy)
-            self.convertData(unpacked_read, self.m_hldy, self.m_kwh_precision)
-            return_crc = self.calc_crc16(raw_ret[1:-2])
-            if str(return_crc) == str(self.m_hldy["crc16"][MeterData.StringValue]):
+            if self.finishSettingsRead(raw_ret, self.m_hldy):
                 ekm_log("Holidays and Schedules CRC success")
                 self.setContext("")
                 return True
@@ -2889,6 +5078,14 @@ class Meter(object):
         self.setContext("")
         return False
 
+    def buildHolidayDatesRead(self):
+        """ Command for :func:`~ekmmeters.Meter.readHolidayDates`.
+
+        Returns:
+            bytes: Command to write to the port.
+        """
+        return self.m_encoder.readCommand("00B0")
+
     def extractHolidayDate(self, setting_holiday):
         """ Read a single holiday date from meter buffer.
 
@@ -2991,17 +5188,11 @@ class Meter(object):
             bool: True on completion and ACK.
         """
         result = False
+        if self.sessionSkip("auth", password_str):
+            return True
         try:
-            req_start = "0150310228" + password_str.encode().hex() + "2903"
-            req_crc = self.calc_crc16(a2b_hex(req_start[2:]))
-            req_str = req_start + req_crc
-            self.m_serial_port.write(a2b_hex(req_str))
-            time.sleep(0.1)
-            if self.m_serial_port.getResponse(self.getContext()) == "06":
-                ekm_log("Password accepted (" + self.getContext() + ")")
-                result = True
-            else:
-                ekm_log("Password call failure no 06(" + self.getContext() + ")")
+            self.m_serial_port.write(self.buildPasswordCommand(password_str))
+            result = self.passwordAccepted(self.m_serial_port.getResponse(self.getContext()), password_str)
         except:
             ekm_log("Password call failure by exception(" + self.getContext() + ")")
 
@@ -3009,11 +5200,209 @@ class Meter(object):
 
         return result
 
+    def buildPasswordCommand(self, password_str):
+        """ Password command bytes, see :func:`~ekmmeters.Meter.serialCmdPwdAuth`.
+
+        Args:
+            password_str (str): Password.
+
+        Returns:
+            bytes: Command to write to the port.
+        """
+        return self.m_encoder.passwordCommand(password_str)
+
+    def passwordAccepted(self, response, password_str):
+        """ Check the meter response to a password command.
+
+        Args:
+            response (str): Response string from getResponse().
+            password_str (str): Password sent.
+
+        Returns:
+            bool: True on ACK.
+        """
+        if response == "06":
+            ekm_log("Password accepted (" + self.getContext() + ")")
+            if self.m_session is not None:
+                self.m_session.authenticated(password_str)
+            return True
+        ekm_log("Password call failure no 06(" + self.getContext() + ")")
+        return False
+
+
+reading_fields = {}
+
+
+class MeterReading(object):
+    """ Immutable snapshot of one meter read.
+
+    Holds the field values (string and native), the raw frames as bytes and
+    the receive time.  Unlike the meter's :class:`~ekmmeters.SerialBlock`
+    buffers it is never changed by later reads, so it can be queued, cached
+    or passed to other threads and processes as is.  Field name tuples and
+    their index are shared between snapshots with the same fields.
+    """
+    __slots__ = ("m_meter_address", "m_timestamp", "m_raw_a", "m_raw_b",
+                 "m_crc_ok", "m_fields", "m_index", "m_strings", "m_natives")
+
+    def __init__(self, meter_address, timestamp, fields, strings, natives,
+                 raw_a=b"", raw_b=b"", crc_ok=False):
+        """
+        Args:
+            meter_address (str): 12 character meter address.
+            timestamp (float): Receive time, seconds since epoch.
+            fields (tuple): Field names.
+            strings (tuple): MeterData.StringValue per field.
+            natives (tuple): MeterData.NativeValue per field.
+            raw_a (bytes): Raw A read.
+            raw_b (bytes): Raw B read, empty if not part of this read.
+            crc_ok (bool): True if every frame passed CRC.
+        """
+        shared = reading_fields.get(fields)
+        if shared is None:
+            shared = (tuple(fields), dict((fld, i) for i, fld in enumerate(fields)))
+            reading_fields[shared[0]] = shared
+        for name, value in (("m_meter_address", meter_address), ("m_timestamp", timestamp),
+                            ("m_raw_a", bytes(raw_a)), ("m_raw_b", bytes(raw_b)),
+                            ("m_crc_ok", crc_ok), ("m_fields", shared[0]), ("m_index", shared[1]),
+                            ("m_strings", tuple(strings)), ("m_natives", tuple(natives))):
+            object.__setattr__(self, name, value)
+
+    @classmethod
+    def fromBlock(cls, meter_address, timestamp, def_buf, raw_a=b"", raw_b=b"", crc_ok=False):
+        """ Snapshot the current contents of a read buffer.
+
+        Reserved and CRC fields are left out, as in
+        :func:`~ekmmeters.Meter.jsonRender`.
+
+        Args:
+            meter_address (str): 12 character meter address.
+            timestamp (float): Receive time, seconds since epoch.
+            def_buf (SerialBlock): Read buffer to copy values from.
+            raw_a (bytes): Raw A read.
+            raw_b (bytes): Raw B read, empty if not part of this read.
+            crc_ok (bool): True if every frame passed CRC.
+
+        Returns:
+            MeterReading: New snapshot.
+        """
+        fields = []
+        strings = []
+        natives = []
+        for fld in def_buf:
+            compare_fld = fld.upper()
+            if "RESERVED" in compare_fld or "CRC" in compare_fld:
+                continue
+            fields.append(fld)
+            strings.append(def_buf[fld][MeterData.StringValue])
+            natives.append(def_buf[fld][MeterData.NativeValue])
+        return cls(meter_address, timestamp, tuple(fields), strings, natives, raw_a, raw_b, crc_ok)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("MeterReading is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("MeterReading is immutable")
+
+    def __reduce__(self):
+        return (MeterReading, (self.m_meter_address, self.m_timestamp, self.m_fields,
+                               self.m_strings, self.m_natives, self.m_raw_a, self.m_raw_b,
+                               self.m_crc_ok))
+
+    def __contains__(self, fld_name):
+        return fld_name in self.m_index
+
+    def getMeterAddress(self):
+        """ Returns:
+            str: 12 character meter address.
+        """
+        return self.m_meter_address
+
+    def getTimestamp(self):
+        """ Returns:
+            float: Receive time, seconds since epoch.
+        """
+        return self.m_timestamp
+
+    def getRawReadA(self):
+        """ Returns:
+            bytes: Raw A read.
+        """
+        return self.m_raw_a
+
+    def getRawReadB(self):
+        """ Returns:
+            bytes: Raw B read, empty if not part of this read.
+        """
+        return self.m_raw_b
+
+    def getCrcOk(self):
+        """ Returns:
+            bool: True if every frame passed CRC.
+        """
+        return self.m_crc_ok
+
+    def getFields(self):
+        """ Returns:
+            tuple: Field names in read order.
+        """
+        return self.m_fields
+
+    def getField(self, fld_name):
+        """ Field content, scaled and formatted.
+
+        Args:
+            fld_name (str): A :class:`~ekmmeters.Field` value.
+
+        Returns:
+            str: String value, empty if field is not in the read.
+        """
+        idx = self.m_index.get(fld_name)
+        if idx is None:
+            ekm_log("Requested nonexistent field: " + fld_name)
+            return ""
+        return self.m_strings[idx]
+
+    def getFieldNative(self, fld_name):
+        """ Field content as native type.
+
+        Args:
+            fld_name (str): A :class:`~ekmmeters.Field` value.
+
+        Returns:
+            Native value, None if field is not in the read.
+        """
+        idx = self.m_index.get(fld_name)
+        if idx is None:
+            ekm_log("Requested nonexistent field: " + fld_name)
+            return None
+        return self.m_natives[idx]
+
+    def asDict(self):
+        """ Returns:
+            dict: Field name to string value.
+        """
+        return dict(zip(self.m_fields, self.m_strings))
+
+    def jsonRender(self):
+        """ String only JSON, same layout as :func:`~ekmmeters.Meter.jsonRender`.
+
+        Returns:
+            str: JSON rendering of the read.
+        """
+        ret_dict = OrderedDict()
+        ret_dict[Field.Meter_Address] = self.m_meter_address
+        for fld, value in zip(self.m_fields, self.m_strings):
+            ret_dict[str(fld)] = value
+        return json.dumps(ret_dict, indent=4)
+
 
 class MeterObserver(object):
     """ Unenforced abstract base class for implementations of the observer pattern.
 
-    To use, you must override the constructor and update().
+    To use, you must override the constructor and update().  Observers
+    which keep or hand off reads should override updateReading() instead,
+    which gets an immutable :class:`~ekmmeters.MeterReading`.
     """
 
     def __init__(self):
@@ -3022,11 +5411,21 @@ class MeterObserver(object):
     def update(self, definition_buffer):
         """ Called by attached :class:`~ekmmeters.Meter` on every :func:`~ekmmeters.Meter.request`.
 
+        The buffer is live and is overwritten by the next read.
+
         Args:
             definition_buffer (SerialBlock): SerialBlock for request
         """
         pass
 
+    def updateReading(self, reading):
+        """ Called by attached :class:`~ekmmeters.Meter` after update().
+
+        Args:
+            reading (MeterReading): Immutable snapshot of the read.
+        """
+        pass
+
 
 class IntervalObserver(MeterObserver):
     """ Simplest possible MeterObserver subclass.  Use as template. """
@@ -3102,54 +5501,15 @@ class V3Meter(Meter):
 
     def initWorkFormat(self):
         """ Initialize :class:`~ekmmeters.SerialBlock` for V3 read. """
-        self.m_blk_a["reserved_10"] = [1, FieldType.Hex, ScaleType.No, "", 0, False, False]
-        self.m_blk_a[Field.Model] = [2, FieldType.Hex, ScaleType.No, "", 0, False, True]
-        self.m_blk_a[Field.Firmware] = [1, FieldType.Hex, ScaleType.No, "", 0, False, True]
-        self.m_blk_a[Field.Meter_Address] = [12, FieldType.String, ScaleType.No, "", 0, False, True]
-        self.m_blk_a[Field.kWh_Tot] = [8, FieldType.Float, ScaleType.KWH, "", 0, False, False]
-        self.m_blk_a[Field.kWh_Tariff_1] = [8, FieldType.Float, ScaleType.KWH, "", 0, False, False]
-        self.m_blk_a[Field.kWh_Tariff_2] = [8, FieldType.Float, ScaleType.KWH, "", 0, False, False]
-        self.m_blk_a[Field.kWh_Tariff_3] = [8, FieldType.Float, ScaleType.KWH, "", 0, False, False]
-        self.m_blk_a[Field.kWh_Tariff_4] = [8, FieldType.Float, ScaleType.KWH, "", 0, False, False]
-        self.m_blk_a[Field.Rev_kWh_Tot] = [8, FieldType.Float, ScaleType.KWH, "", 0, False, False]
-        self.m_blk_a[Field.Rev_kWh_Tariff_1] = [8, FieldType.Float, ScaleType.KWH, "", 0, False, False]
-        self.m_blk_a[Field.Rev_kWh_Tariff_2] = [8, FieldType.Float, ScaleType.KWH, "", 0, False, False]
-        self.m_blk_a[Field.Rev_kWh_Tariff_3] = [8, FieldType.Float, ScaleType.KWH, "", 0, False, False]
-        self.m_blk_a[Field.Rev_kWh_Tariff_4] = [8, FieldType.Float, ScaleType.KWH, "", 0, False, False]
-        self.m_blk_a[Field.RMS_Volts_Ln_1] = [4, FieldType.Float, ScaleType.Div10, "", 0, False, False]
-        self.m_blk_a[Field.RMS_Volts_Ln_2] = [4, FieldType.Float, ScaleType.Div10, "", 0, False, False]
-        self.m_blk_a[Field.RMS_Volts_Ln_3] = [4, FieldType.Float, ScaleType.Div10, "", 0, False, False]
-        self.m_blk_a[Field.Amps_Ln_1] = [5, FieldType.Float, ScaleType.Div10, "", 0, False, False]
-        self.m_blk_a[Field.Amps_Ln_2] = [5, FieldType.Float, ScaleType.Div10, "", 0, False, False]
-        self.m_blk_a[Field.Amps_Ln_3] = [5, FieldType.Float, ScaleType.Div10, "", 0, False, False]
-        self.m_blk_a[Field.RMS_Watts_Ln_1] = [7, FieldType.Int, ScaleType.No, "", 0, False, False]
-        self.m_blk_a[Field.RMS_Watts_Ln_2] = [7, FieldType.Int, ScaleType.No, "", 0, False, False]
-        self.m_blk_a[Field.RMS_Watts_Ln_3] = [7, FieldType.Int, ScaleType.No, "", 0, False, False]
-        self.m_blk_a[Field.RMS_Watts_Tot] = [7, FieldType.Int, ScaleType.No, "", 0, False, False]
-        self.m_blk_a[Field.Cos_Theta_Ln_1] = [4, FieldType.PowerFactor, ScaleType.No, "", 0, False, False]
-        self.m_blk_a[Field.Cos_Theta_Ln_2] = [4, FieldType.PowerFactor, ScaleType.No, "", 0, False, False]
-        self.m_blk_a[Field.Cos_Theta_Ln_3] = [4, FieldType.PowerFactor, ScaleType.No, "", 0, False, False]
-        self.m_blk_a[Field.Max_Demand] = [8, FieldType.Float, ScaleType.KWH, "", 0, False, True]
-        self.m_blk_a[Field.Max_Demand_Period] = [1, FieldType.Int, ScaleType.No, "", 0, False, True]
-        self.m_blk_a[Field.Meter_Time] = [14, FieldType.String, ScaleType.No, "", 0, False, False]
-        self.m_blk_a[Field.CT_Ratio] = [4, FieldType.Int, ScaleType.No, "", 0, False, True]
-        self.m_blk_a[Field.Pulse_Cnt_1] = [8, FieldType.Int, ScaleType.No, "", 0, False, False]
-        self.m_blk_a[Field.Pulse_Cnt_2] = [8, FieldType.Int, ScaleType.No, "", 0, False, False]
-        self.m_blk_a[Field.Pulse_Cnt_3] = [8, FieldType.Int, ScaleType.No, "", 0, False, False]
-        self.m_blk_a[Field.Pulse_Ratio_1] = [4, FieldType.Int, ScaleType.No, "", 0, False, True]
-        self.m_blk_a[Field.Pulse_Ratio_2] = [4, FieldType.Int, ScaleType.No, "", 0, False, True]
-        self.m_blk_a[Field.Pulse_Ratio_3] = [4, FieldType.Int, ScaleType.No, "", 0, False, True]
-        self.m_blk_a[Field.State_Inputs] = [3, FieldType.Int, ScaleType.No, "", 0, False, True]
-        self.m_blk_a["reserved_11"] = [19, FieldType.Hex, ScaleType.No, "", 0, False, False]
-        self.m_blk_a[Field.Status_A] = [1, FieldType.Hex, ScaleType.No, "", 0, False, False]
-        self.m_blk_a["reserved_12"] = [4, FieldType.Hex, ScaleType.No, "", 0, False, False]
-        self.m_blk_a["crc16"] = [2, FieldType.Hex, ScaleType.No, "", 0, False, False]
-        self.m_blk_a[Field.Power_Factor_Ln_1] = [4, FieldType.Int, ScaleType.No, "0", 0, True, False]
-        self.m_blk_a[Field.Power_Factor_Ln_2] = [4, FieldType.Int, ScaleType.No, "0", 0, True, False]
-        self.m_blk_a[Field.Power_Factor_Ln_3] = [4, FieldType.Int, ScaleType.No, "0", 0, True, False]
+        frame_schemas["V3"].fillBlock(self.m_blk_a)
 
     def openMeter(self):
-        return self.request(False)
+        if self.sessionSkip("open"):
+            return True
+        result = self.request(False)
+        if self.m_session is not None:
+            self.m_session.opened(result)
+        return result
 
     def request(self, send_terminator = False):
         """Required request() override for v3 and standard method to read meter.
@@ -3164,13 +5524,16 @@ class V3Meter(Meter):
         start_context = self.getContext()
         self.setContext("request[v3A]")
         try:
-            self.m_serial_port.write(a2b_hex("2f3f" +
-                                     self.m_meter_address.encode('ascii').hex() +
-                                     "210d0a"))
-            self.m_raw_read_a = self.m_serial_port.getResponse(self.getContext())
-            unpacked_read_a = self.unpackStruct(self.m_raw_read_a, self.m_blk_a)
-            self.convertData(unpacked_read_a, self.m_blk_a, 1)
-            self.m_a_crc = self.crcMeterRead(self.m_raw_read_a, self.m_blk_a)
+            for attempt in range(self.m_read_retries + 1):
+                self.m_serial_port.write(self.m_encoder.readRequest())
+                self.m_raw_bytes_a = self.m_serial_port.getResponseBytes(self.getContext())
+                self.m_read_time = time.time()
+                self.m_reading = None
+                unpacked_read_a = self.unpackStruct(self.m_raw_bytes_a, self.m_blk_a)
+                self.convertData(unpacked_read_a, self.m_blk_a, 1)
+                self.m_a_crc = self.crcMeterRead(self.m_raw_bytes_a, self.m_blk_a)
+                if self.m_a_crc or not self.retryRead(attempt):
+                    break
             if send_terminator:
                 self.serialPostEnd()
             self.calculateFields()
@@ -3210,7 +5573,7 @@ class V3Meter(Meter):
         Picks up m_raw_read_b from super.
         """
         if meter_db:
-            meter_db.dbInsert(self.m_req, self.m_raw_read_a, self.m_raw_read_b)
+            meter_db.dbInsert(self.m_req, self.m_raw_bytes_a, self.m_raw_bytes_b)
         else:
             ekm_log("Attempt to insert when no MeterDB assigned.")
         pass
@@ -3220,6 +5583,7 @@ class V3Meter(Meter):
         for observer in self.m_observers:
             try:
                 observer.update(self.m_req)
+                self.notifyReading(observer)
             except:
                 ekm_log(traceback.format_exc(sys.exc_info()))
 
@@ -3262,8 +5626,10 @@ class V3Meter(Meter):
 
     def serialPostEnd(self):
         """ Post termination code to implicitly current meter. """
+        if self.sessionSkip("end"):
+            return
         ekm_log("Termination string sent (" + self.m_context + ")")
-        self.m_serial_port.write(a2b_hex("0142300375"))
+        self.m_serial_port.write(termination_command)
         pass
 
 
@@ -3284,6 +5650,8 @@ class V4Meter(Meter):
         self.m_b_crc = False
         self.m_kwh_precision = ScaleKWH.EmptyScale
         self.m_lcd_lookup = {}
+        self.m_lazy_decode = False
+        self.m_read_ab = False
 
         super(V4Meter, self).__init__(meter_address, serial_port)
 
@@ -3323,106 +5691,12 @@ class V4Meter(Meter):
 
     def initFormatA(self):
         """ Initialize A read :class:`~ekmmeters.SerialBlock`."""
-        self.m_blk_a["reserved_1"] = [1, FieldType.Hex, ScaleType.No, "", 0, False, False]
-        self.m_blk_a[Field.Model] = [2, FieldType.Hex, ScaleType.No, "", 0, False, True]
-        self.m_blk_a[Field.Firmware] = [1, FieldType.Hex, ScaleType.No, "", 0, False, True]
-        self.m_blk_a[Field.Meter_Address] = [12, FieldType.String, ScaleType.No, "", 0, False, True]
-        self.m_blk_a[Field.kWh_Tot] = [8, FieldType.Float, ScaleType.KWH, "", 0, False, False]
-        self.m_blk_a[Field.Reactive_Energy_Tot] = [8, FieldType.Float, ScaleType.KWH, "", 0, False, False]
-        self.m_blk_a[Field.Rev_kWh_Tot] = [8, FieldType.Float, ScaleType.KWH, "", 0, False, False]
-        self.m_blk_a[Field.kWh_Ln_1] = [8, FieldType.Float, ScaleType.KWH, "", 0, False, False]
-        self.m_blk_a[Field.kWh_Ln_2] = [8, FieldType.Float, ScaleType.KWH, "", 0, False, False]
-        self.m_blk_a[Field.kWh_Ln_3] = [8, FieldType.Float, ScaleType.KWH, "", 0, False, False]
-        self.m_blk_a[Field.Rev_kWh_Ln_1] = [8, FieldType.Float, ScaleType.KWH, "", 0, False, False]
-        self.m_blk_a[Field.Rev_kWh_Ln_2] = [8, FieldType.Float, ScaleType.KWH, "", 0, False, False]
-        self.m_blk_a[Field.Rev_kWh_Ln_3] = [8, FieldType.Float, ScaleType.KWH, "", 0, False, False]
-        self.m_blk_a[Field.Resettable_kWh_Tot] = [8, FieldType.Float, ScaleType.KWH, "", 0, False, False]
-        self.m_blk_a[Field.Resettable_Rev_kWh_Tot] = [8, FieldType.Float, ScaleType.KWH, "", 0, False, False]
-        self.m_blk_a[Field.RMS_Volts_Ln_1] = [4, FieldType.Float, ScaleType.Div10, "", 0, False, False]
-        self.m_blk_a[Field.RMS_Volts_Ln_2] = [4, FieldType.Float, ScaleType.Div10, "", 0, False, False]
-        self.m_blk_a[Field.RMS_Volts_Ln_3] = [4, FieldType.Float, ScaleType.Div10, "", 0, False, False]
-        self.m_blk_a[Field.Amps_Ln_1] = [5, FieldType.Float, ScaleType.Div10, "", 0, False, False]
-        self.m_blk_a[Field.Amps_Ln_2] = [5, FieldType.Float, ScaleType.Div10, "", 0, False, False]
-        self.m_blk_a[Field.Amps_Ln_3] = [5, FieldType.Float, ScaleType.Div10, "", 0, False, False]
-        self.m_blk_a[Field.RMS_Watts_Ln_1] = [7, FieldType.Int, ScaleType.No, "", 0, False, False]
-        self.m_blk_a[Field.RMS_Watts_Ln_2] = [7, FieldType.Int, ScaleType.No, "", 0, False, False]
-        self.m_blk_a[Field.RMS_Watts_Ln_3] = [7, FieldType.Int, ScaleType.No, "", 0, False, False]
-        self.m_blk_a[Field.RMS_Watts_Tot] = [7, FieldType.Int, ScaleType.No, "", 0, False, False]
-        self.m_blk_a[Field.Cos_Theta_Ln_1] = [4, FieldType.PowerFactor, ScaleType.No, "", 0, False, False]
-        self.m_blk_a[Field.Cos_Theta_Ln_2] = [4, FieldType.PowerFactor, ScaleType.No, "", 0, False, False]
-        self.m_blk_a[Field.Cos_Theta_Ln_3] = [4, FieldType.PowerFactor, ScaleType.No, "", 0, False, False]
-        self.m_blk_a[Field.Reactive_Pwr_Ln_1] = [7, FieldType.Int, ScaleType.No, "", 0, False, False]
-        self.m_blk_a[Field.Reactive_Pwr_Ln_2] = [7, FieldType.Int, ScaleType.No, "", 0, False, False]
-        self.m_blk_a[Field.Reactive_Pwr_Ln_3] = [7, FieldType.Int, ScaleType.No, "", 0, False, False]
-        self.m_blk_a[Field.Reactive_Pwr_Tot] = [7, FieldType.Int, ScaleType.No, "", 0, False, False]
-        self.m_blk_a[Field.Line_Freq] = [4, FieldType.Float, ScaleType.Div100, "", 0, False, False]
-        self.m_blk_a[Field.Pulse_Cnt_1] = [8, FieldType.Int, ScaleType.No, "", 0, False, False]
-        self.m_blk_a[Field.Pulse_Cnt_2] = [8, FieldType.Int, ScaleType.No, "", 0, False, False]
-        self.m_blk_a[Field.Pulse_Cnt_3] = [8, FieldType.Int, ScaleType.No, "", 0, False, False]
-        self.m_blk_a[Field.State_Inputs] = [1, FieldType.Int, ScaleType.No, "", 0, False, False]
-        self.m_blk_a[Field.State_Watts_Dir] = [1, FieldType.Int, ScaleType.No, "", 0, False, True]
-        self.m_blk_a[Field.State_Out] = [1, FieldType.Int, ScaleType.No, "", 0, False, True]
-        self.m_blk_a[Field.kWh_Scale] = [1, FieldType.Int, ScaleType.No, "", 0, False, True]
-        self.m_blk_a["reserved_2"] = [2, FieldType.Hex, ScaleType.No, "", 0, False, False]
-        self.m_blk_a[Field.Meter_Time] = [14, FieldType.String, ScaleType.No, "", 0, False, False]
-        self.m_blk_a["reserved_3"] = [2, FieldType.Hex, ScaleType.No, "", 0, False, False]
-        self.m_blk_a["reserved_4"] = [4, FieldType.Hex, ScaleType.No, "", 0, False, False]
-        self.m_blk_a["crc16"] = [2, FieldType.Hex, ScaleType.No, "", 0, False, False]
-        self.m_blk_a[Field.Power_Factor_Ln_1] = [4, FieldType.Int, ScaleType.No, "0", 0, True, False]
-        self.m_blk_a[Field.Power_Factor_Ln_2] = [4, FieldType.Int, ScaleType.No, "0", 0, True, False]
-        self.m_blk_a[Field.Power_Factor_Ln_3] = [4, FieldType.Int, ScaleType.No, "0", 0, True, False]
+        frame_schemas["V4A"].fillBlock(self.m_blk_a)
         pass
 
     def initFormatB(self):
         """ Initialize B read :class:`~ekmmeters.SerialBlock`."""
-        self.m_blk_b["reserved_5"] = [1, FieldType.Hex, ScaleType.No, "", 0, False, False]
-        self.m_blk_b[Field.Model] = [2, FieldType.Hex, ScaleType.No, "", 0, False, True]
-        self.m_blk_b[Field.Firmware] = [1, FieldType.Hex, ScaleType.No, "", 0, False, True]
-        self.m_blk_b[Field.Meter_Address] = [12, FieldType.String, ScaleType.No, "", 0, False, True]
-        self.m_blk_b[Field.kWh_Tariff_1] = [8, FieldType.Float, ScaleType.KWH, "", 0, False, False]
-        self.m_blk_b[Field.kWh_Tariff_2] = [8, FieldType.Float, ScaleType.KWH, "", 0, False, False]
-        self.m_blk_b[Field.kWh_Tariff_3] = [8, FieldType.Float, ScaleType.KWH, "", 0, False, False]
-        self.m_blk_b[Field.kWh_Tariff_4] = [8, FieldType.Float, ScaleType.KWH, "", 0, False, False]
-        self.m_blk_b[Field.Rev_kWh_Tariff_1] = [8, FieldType.Float, ScaleType.KWH, "", 0, False, False]
-        self.m_blk_b[Field.Rev_kWh_Tariff_2] = [8, FieldType.Float, ScaleType.KWH, "", 0, False, False]
-        self.m_blk_b[Field.Rev_kWh_Tariff_3] = [8, FieldType.Float, ScaleType.KWH, "", 0, False, False]
-        self.m_blk_b[Field.Rev_kWh_Tariff_4] = [8, FieldType.Float, ScaleType.KWH, "", 0, False, False]
-        self.m_blk_b[Field.RMS_Volts_Ln_1] = [4, FieldType.Float, ScaleType.Div10, "", 0, False, False]
-        self.m_blk_b[Field.RMS_Volts_Ln_2] = [4, FieldType.Float, ScaleType.Div10, "", 0, False, False]
-        self.m_blk_b[Field.RMS_Volts_Ln_3] = [4, FieldType.Float, ScaleType.Div10, "", 0, False, False]
-        self.m_blk_b[Field.Amps_Ln_1] = [5, FieldType.Float, ScaleType.Div10, "", 0, False, False]
-        self.m_blk_b[Field.Amps_Ln_2] = [5, FieldType.Float, ScaleType.Div10, "", 0, False, False]
-        self.m_blk_b[Field.Amps_Ln_3] = [5, FieldType.Float, ScaleType.Div10, "", 0, False, False]
-        self.m_blk_b[Field.RMS_Watts_Ln_1] = [7, FieldType.Int, ScaleType.No, "", 0, False, False]
-        self.m_blk_b[Field.RMS_Watts_Ln_2] = [7, FieldType.Int, ScaleType.No, "", 0, False, False]
-        self.m_blk_b[Field.RMS_Watts_Ln_3] = [7, FieldType.Int, ScaleType.No, "", 0, False, False]
-        self.m_blk_b[Field.RMS_Watts_Tot] = [7, FieldType.Int, ScaleType.No, "", 0, False, False]
-        self.m_blk_b[Field.Cos_Theta_Ln_1] = [4, FieldType.PowerFactor, ScaleType.No, "", 0, False, False]
-        self.m_blk_b[Field.Cos_Theta_Ln_2] = [4, FieldType.PowerFactor, ScaleType.No, "", 0, False, False]
-        self.m_blk_b[Field.Cos_Theta_Ln_3] = [4, FieldType.PowerFactor, ScaleType.No, "", 0, False, False]
-        self.m_blk_b[Field.RMS_Watts_Max_Demand] = [8, FieldType.Float, ScaleType.Div10, "", 0, False, False]
-        self.m_blk_b[Field.Max_Demand_Period] = [1, FieldType.Int, ScaleType.No, "", 0, False, True]
-        self.m_blk_b[Field.Pulse_Ratio_1] = [4, FieldType.Int, ScaleType.No, "", 0, False, True]
-        self.m_blk_b[Field.Pulse_Ratio_2] = [4, FieldType.Int, ScaleType.No, "", 0, False, True]
-        self.m_blk_b[Field.Pulse_Ratio_3] = [4, FieldType.Int, ScaleType.No, "", 0, False, True]
-        self.m_blk_b[Field.CT_Ratio] = [4, FieldType.Int, ScaleType.No, "", 0, False, True]
-        self.m_blk_b["reserved_6"] = [1, FieldType.Hex, ScaleType.No, "", 0, False, False]
-        self.m_blk_b[Field.Pulse_Output_Ratio] = [4, FieldType.Int, ScaleType.No, "", 0, False, True]
-        self.m_blk_b["reserved_7"] = [53, FieldType.Hex, ScaleType.No, "", 0, False, False]
-        self.m_blk_b[Field.Status_A] = [1, FieldType.Hex, ScaleType.No, "", 0, False, True]
-        self.m_blk_b[Field.Status_B] = [1, FieldType.Hex, ScaleType.No, "", 0, False, True]
-        self.m_blk_b[Field.Status_C] = [1, FieldType.Hex, ScaleType.No, "", 0, False, True]
-        self.m_blk_b[Field.Meter_Time] = [14, FieldType.String, ScaleType.No, "", 0, False, False]
-        self.m_blk_b["reserved_8"] = [2, FieldType.Hex, ScaleType.No, "", 0, False, False]
-        self.m_blk_b["reserved_9"] = [4, FieldType.Hex, ScaleType.No, "", 0, False, False]
-        self.m_blk_b["crc16"] = [2, FieldType.Hex, ScaleType.No, "", 0, False, False]
-        self.m_blk_b[Field.Net_Calc_Watts_Ln_1] = [7, FieldType.Int, ScaleType.No, "0", 0, True, False]
-        self.m_blk_b[Field.Net_Calc_Watts_Ln_2] = [7, FieldType.Int, ScaleType.No, "0", 0, True, False]
-        self.m_blk_b[Field.Net_Calc_Watts_Ln_3] = [7, FieldType.Int, ScaleType.No, "0", 0, True, False]
-        self.m_blk_b[Field.Net_Calc_Watts_Tot] = [7, FieldType.Int, ScaleType.No, "0", 0, True, False]
-        self.m_blk_b[Field.Power_Factor_Ln_1] = [4, FieldType.Int, ScaleType.No, "0", 0, True, False]
-        self.m_blk_b[Field.Power_Factor_Ln_2] = [4, FieldType.Int, ScaleType.No, "0", 0, True, False]
-        self.m_blk_b[Field.Power_Factor_Ln_3] = [4, FieldType.Int, ScaleType.No, "0", 0, True, False]
+        frame_schemas["V4B"].fillBlock(self.m_blk_b)
         pass
 
     def initLcdLookup(self):
@@ -3471,7 +5745,89 @@ class V4Meter(Meter):
         self.m_lcd_lookup["Max_Demand"] = LCDItems.Max_Demand
 
     def openMeter(self):
-        return self.requestA()
+        if self.sessionSkip("open"):
+            return True
+        result = self.openRead()
+        if self.m_session is not None:
+            self.m_session.opened(result)
+        return result
+
+    def openRead(self):
+        """ A read opening a command exchange, without decoding the frame.
+
+        Keeps the raw frame and its CRC verdict and defers every field,
+        whether or not lazy decoding is on, so a set command does not pay
+        for converting an A read nobody looks at.  The frame is still a
+        complete A read: fields asked for later, getReading() and the
+        session's caller see it decoded on demand.
+
+        Returns:
+            bool: True if CRC match at end of call.
+        """
+        work_context = self.getContext()
+        self.setContext("openMeter")
+        for attempt in range(self.m_read_retries + 1):
+            self.m_serial_port.write(self.buildReadCommand("00"))
+            if self.finishOpenRead(self.m_serial_port.getResponseBytes(self.getContext())) or not self.retryRead(attempt):
+                break
+        self.setContext(work_context)
+        return self.m_a_crc
+
+    def finishOpenRead(self, raw_read):
+        """ Keep an opening A read undecoded and check its CRC.
+
+        Only kWh_Scale is decoded, as B reads are scaled by it.  The CRC is
+        the one the port accumulated while the frame arrived.
+
+        Args:
+            raw_read (bytes): Response from getResponseBytes().
+
+        Returns:
+            bool: True on CRC match, also kept in m_a_crc.
+        """
+        self.m_raw_bytes_a = raw_read
+        self.m_read_time = time.time()
+        self.m_reading = None
+        self.m_read_ab = False
+        self.deferData(self.unpackStruct(self.m_raw_bytes_a, self.m_blk_a), self.m_blk_a)
+        self.m_blk_a.decodeField(Field.kWh_Scale)
+        self.m_kwh_precision = int(self.m_blk_a[Field.kWh_Scale][MeterData.NativeValue])
+        self.m_a_crc = self.frameCrcOk(self.m_raw_bytes_a)
+        return self.m_a_crc
+
+    def setLazyDecode(self, lazy):
+        """ Decode A and B read fields only when they are asked for.
+
+        In lazy mode requestA() and requestB() keep the unpacked read and
+        getFieldA(), getFieldANative() and getFieldB() convert (once) just
+        the requested field.  getReadBuffer(), getField(), jsonRender(),
+        insert() and observers see a fully decoded read.
+
+        Args:
+            lazy (bool): True for lazy decoding.
+        """
+        self.m_lazy_decode = lazy
+        if not lazy:
+            self.decodePending()
+
+    def decodePending(self):
+        """ Finish decoding of any deferred A and B reads. """
+        self.m_blk_a.decodePending()
+        self.m_blk_b.decodePending()
+
+    def readingSource(self):
+        """ Buffer, raw frames and CRC result for :func:`~ekmmeters.Meter.getReading`.
+
+        After request() the snapshot holds the combined A and B read; after
+        requestA() alone it holds the A read.
+
+        Returns:
+            tuple: (SerialBlock, raw A bytes, raw B bytes, bool CRC ok)
+        """
+        self.decodePending()
+        if self.m_read_ab:
+            return self.m_req, self.m_raw_bytes_a, self.m_raw_bytes_b, self.m_a_crc and self.m_b_crc
+        return self.m_blk_a, self.m_raw_bytes_a, b"", self.m_a_crc
 
     def request(self, send_terminator = False):
         """ Combined A and B read for V4 meter.
@@ -3484,9 +5840,7 @@ class V4Meter(Meter):
         """
         try:
             if self.requestA() and self.requestB():
-                self.makeAB()
-                self.calculateFields()
-                self.updateObservers()
+                self.finishReadAB()
                 if send_terminator:
                     self.serialPostEnd()
                 return True
@@ -3503,15 +5857,48 @@ class V4Meter(Meter):
         """
         work_context = self.getContext()
         self.setContext("request[v4A]")
-        self.m_serial_port.write("2f3f" + self.m_meter_address.encode('ascii').hex() + "3030210d0a")
-        self.m_raw_read_a = self.m_serial_port.getResponse(self.getContext())
-        unpacked_read_a = self.unpackStruct(self.m_raw_read_a, self.m_blk_a)
-        self.convertData(unpacked_read_a, self.m_blk_a)
-        self.m_kwh_precision = int(self.m_blk_a[Field.kWh_Scale][MeterData.NativeValue])
-        self.m_a_crc = self.crcMeterRead(self.m_raw_read_a, self.m_blk_a)
+        for attempt in range(self.m_read_retries + 1):
+            self.m_serial_port.write(self.buildReadCommand("00"))
+            if self.finishReadA(self.m_serial_port.getResponseBytes(self.getContext())) or not self.retryRead(attempt):
+                break
         self.setContext(work_context)
         return self.m_a_crc
 
+    def buildReadCommand(self, block):
+        """ Read request bytes for this meter.
+
+        Args:
+            block (str): "00" for an A read, "01" for a B read.
+
+        Returns:
+            bytes: Command to write to the port.
+        """
+        return self.m_encoder.readRequest(block)
+
+    def finishReadA(self, raw_read):
+        """ Decode an A read response into m_blk_a and check its CRC.
+
+        Args:
+            raw_read (bytes): Response from getResponseBytes().
+
+        Returns:
+            bool: True on CRC match, also kept in m_a_crc.
+        """
+        self.m_raw_bytes_a = raw_read
+        self.m_read_time = time.time()
+        self.m_reading = None
+        self.m_read_ab = False
+        unpacked_read_a = self.unpackStruct(self.m_raw_bytes_a, self.m_blk_a)
+        if self.m_lazy_decode:
+            self.deferData(unpacked_read_a, self.m_blk_a)
+            self.m_blk_a.decodeField(Field.kWh_Scale)
+            self.m_blk_a.decodeField("crc16")
+        else:
+            self.convertData(unpacked_read_a, self.m_blk_a)
+        self.m_kwh_precision = int(self.m_blk_a[Field.kWh_Scale][MeterData.NativeValue])
+        self.m_a_crc = self.crcMeterRead(self.m_raw_bytes_a, self.m_blk_a)
+        return self.m_a_crc
+
     def requestB(self):
         """ Issue a B read on V4 meter.
 
@@ -3520,14 +5907,41 @@ class V4Meter(Meter):
         """
         work_context = self.getContext()
         self.setContext("request[v4B]")
-        self.m_serial_port.write(a2b_hex("2f3f" + self.m_meter_address.encode('ascii').hex() + "3031210d0a"))
-        self.m_raw_read_b = self.m_serial_port.getResponse(self.getContext())
-        unpacked_read_b = self.unpackStruct(self.m_raw_read_b, self.m_blk_b)
-        self.convertData(unpacked_read_b, self.m_blk_b, self.m_kwh_precision)
-        self.m_b_crc = self.crcMeterRead(self.m_raw_read_b, self.m_blk_b)
+        for attempt in range(self.m_read_retries + 1):
+            self.m_serial_port.write(self.buildReadCommand("01"))
+            if self.finishReadB(self.m_serial_port.getResponseBytes(self.getContext())) or not self.retryRead(attempt):
+                break
         self.setContext(work_context)
         return self.m_b_crc
 
+    def finishReadB(self, raw_read):
+        """ Decode a B read response into m_blk_b and check its CRC.
+
+        Args:
+            raw_read (bytes): Response from getResponseBytes().
+
+        Returns:
+            bool: True on CRC match, also kept in m_b_crc.
+        """
+        self.m_raw_bytes_b = raw_read
+        self.m_reading = None
+        unpacked_read_b = self.unpackStruct(self.m_raw_bytes_b, self.m_blk_b)
+        if self.m_lazy_decode:
+            self.deferData(unpacked_read_b, self.m_blk_b, self.m_kwh_precision)
+            self.m_blk_b.decodeField("crc16")
+        else:
+            self.convertData(unpacked_read_b, self.m_blk_b, self.m_kwh_precision)
+        self.m_b_crc = self.crcMeterRead(self.m_raw_bytes_b, self.m_blk_b)
+        return self.m_b_crc
+
+    def finishReadAB(self):
+        """ Combine finished A and B reads and notify observers. """
+        self.makeAB()
+        self.calculateFields()
+        self.m_read_ab = True
+        self.m_reading = None
+        self.updateObservers()
+
     def makeAB(self):
         """ Munge A and B reads into single serial block with only unique fields."""
         for fld in self.m_blk_b:
@@ -3550,6 +5964,7 @@ class V4Meter(Meter):
         Returns:
             SerialBlock: A :class:`~ekmmeters.SerialBlock`  containing both A and B reads.
         """
+        self.decodePending()
         return self.m_req
 
     def getField(self, fld_name):
@@ -3562,6 +5977,8 @@ class V4Meter(Meter):
             str: String value (scaled if numeric) for the field.
         """
         result = ""
+        self.m_blk_a.decodeField(fld_name)
+        self.m_blk_b.decodeField(fld_name)
         if fld_name in self.m_req:
             result = self.m_req[fld_name][MeterData.StringValue]
         else:
@@ -3579,6 +5996,7 @@ class V4Meter(Meter):
             str: String value (scaled if numeric) for the field.
         """
         result = ""
+        self.m_blk_a.decodeField(fld_name)
         if fld_name in self.m_blk_a:
             result = self.m_blk_a[fld_name][MeterData.StringValue]
         else:
@@ -3596,6 +6014,7 @@ class V4Meter(Meter):
             str: String value (scaled if numeric) for the field.
         """
         result = None
+        self.m_blk_a.decodeField(fld_name)
         if fld_name in self.m_blk_a:
             result = self.m_blk_a[fld_name][MeterData.NativeValue]
         else:
@@ -3613,6 +6032,7 @@ class V4Meter(Meter):
             str: String value (scaled if numeric) for the field.
         """
         result = ""
+        self.m_blk_b.decodeField(fld_name)
         if fld_name in self.m_blk_b:
             result = self.m_blk_b[fld_name][MeterData.StringValue]
         else:
@@ -3622,6 +6042,10 @@ class V4Meter(Meter):
 
     def calculateFields(self):
         """Write calculated fields for read buffer."""
+        for fld in (Field.Cos_Theta_Ln_1, Field.Cos_Theta_Ln_2, Field.Cos_Theta_Ln_3,
+                    Field.RMS_Watts_Ln_1, Field.RMS_Watts_Ln_2, Field.RMS_Watts_Ln_3):
+            self.m_blk_b.decodeField(fld)
+        self.m_blk_a.decodeField(Field.State_Watts_Dir)
         pf1 = self.m_blk_b[Field.Cos_Theta_Ln_1][MeterData.StringValue]
         pf2 = self.m_blk_b[Field.Cos_Theta_Ln_2][MeterData.StringValue]
         pf3 = self.m_blk_b[Field.Cos_Theta_Ln_3][MeterData.StringValue]
@@ -3700,8 +6124,11 @@ class V4Meter(Meter):
 
         Called internally after request().
         """
+        if self.m_observers:
+            self.decodePending()
         for observer in self.m_observers:
             observer.update(self.m_req)
+            self.notifyReading(observer)
 
     def insert(self, meter_db):
         """ Insert to :class:`~ekmmeters.MeterDB`  subclass.
@@ -3712,7 +6139,8 @@ class V4Meter(Meter):
             meter_db (MeterDB): Instance of subclass of MeterDB.
         """
         if meter_db:
-            meter_db.dbInsert(self.m_req, self.m_raw_read_a, self.m_raw_read_b)
+            self.decodePending()
+            meter_db.dbInsert(self.m_req, self.m_raw_bytes_a, self.m_raw_bytes_b)
         else:
             ekm_log("Attempt to insert when no MeterDB assigned.")
         pass
@@ -3779,13 +6207,9 @@ class V4Meter(Meter):
         try:
             self.clearCmdMsg()
 
-            if len(password) != 8:
-                self.writeCmdMsg("Invalid password length.")
-                self.setContext("")
-                return result
-
-            if seconds < 0 or seconds > 9999:
-                self.writeCmdMsg("Relay duration must be between 0 and 9999.")
+            error_msg = self.checkRelayArgs(seconds, password)
+            if error_msg:
+                self.writeCmdMsg(error_msg)
                 self.setContext("")
                 return result
 
@@ -3795,15 +6219,8 @@ class V4Meter(Meter):
                 if not self.serialCmdPwdAuth(password):
                     self.writeCmdMsg("Password failure")
                 else:
-                    req_str = ""
-                    req_str = ("01573102303038" +
-                               str(relay).encode().hex() +
-                               "28" +
-                               str(status).encode().hex() +
-                               str(seconds).zfill(4).encode().hex() + "2903")
-                    req_str += self.calc_crc16(a2b_hex(req_str[2:]))
-                    self.m_serial_port.write(a2b_hex(req_str))
-                    if self.m_serial_port.getResponse(self.getContext()).encode() == "06":
+                    self.m_serial_port.write(self.buildRelayCommand(seconds, relay, status))
+                    if self.m_serial_port.getResponse(self.getContext()) == "06":
                         self.writeCmdMsg("Success: 06 returned.")
                         result = True
             self.serialPostEnd()
@@ -3813,12 +6230,34 @@ class V4Meter(Meter):
         self.setContext("")
         return result
 
+    def checkRelayArgs(self, seconds, password):
+        """ Range check :func:`~ekmmeters.V4Meter.setRelay` arguments.
+
+        Returns:
+            str: Command message for the first bad argument, empty if all good.
+        """
+        if len(password) != 8:
+            return "Invalid password length."
+        if seconds < 0 or seconds > 9999:
+            return "Relay duration must be between 0 and 9999."
+        return ""
+
+    def buildRelayCommand(self, seconds, relay, status):
+        """ Relay command bytes, see :func:`~ekmmeters.V4Meter.setRelay`.
+
+        Returns:
+            bytes: Command to write to the port.
+        """
+        return self.m_encoder.writeCommand("008" + str(relay), str(status) + str(seconds).zfill(4))
+
     def serialPostEnd(self):
         """ Send termination string to implicit current meter."""
+        if self.sessionSkip("end"):
+            return
         ekm_log("Termination string sent (" + self.m_context + ")")
 
         try:
-            self.m_serial_port.write(a2b_hex("0142300375"))
+            self.m_serial_port.write(termination_command)
         except:
             ekm_log(traceback.format_exc(sys.exc_info()))
 
@@ -3845,11 +6284,7 @@ class V4Meter(Meter):
                 if not self.serialCmdPwdAuth(password):
                     self.writeCmdMsg("Password failure")
                 else:
-                    req_const = str(new_cnst).zfill(4).encode().hex()
-                    line_const = str(line_in - 1).encode().hex()
-                    req_str = "01573102303041" + line_const + "28" + req_const + "2903"
-                    req_str += self.calc_crc16(a2b_hex(req_str[2:]))
-                    self.m_serial_port.write(a2b_hex(req_str))
+                    self.m_serial_port.write(self.m_encoder.writeCommand("00A" + str(line_in - 1), str(new_cnst).zfill(4)))
                     if self.m_serial_port.getResponse(self.getContext()) == "06":
                         self.writeCmdMsg("Success: 06 returned.")
                         result = True
@@ -3879,9 +6314,7 @@ class V4Meter(Meter):
                 if not self.serialCmdPwdAuth(password):
                     self.writeCmdMsg("Password failure")
                 else:
-                    req_str = "0157310230304433282903"
-                    req_str += self.calc_crc16(a2b_hex(req_str[2:]))
-                    self.m_serial_port.write(a2b_hex(req_str))
+                    self.m_serial_port.write(self.m_encoder.writeCommand("00D3", b""))
                     if self.m_serial_port.getResponse(self.getContext()) == "06":
                         self.writeCmdMsg("Success: 06 returned.")
                         result = True
@@ -3912,9 +6345,7 @@ class V4Meter(Meter):
                 if not self.serialCmdPwdAuth(password):
                     self.writeCmdMsg("Password failure")
                 else:
-                    req_str = "015731023030443428" + str(new_pout).zfill(4).encode().hex() + "2903"
-                    req_str += self.calc_crc16(a2b_hex(req_str[2:]))
-                    self.m_serial_port.write(a2b_hex(req_str))
+                    self.m_serial_port.write(self.m_encoder.writeCommand("00D4", str(new_pout).zfill(4)))
                     if self.m_serial_port.getResponse(self.getContext()) == "06":
                         self.writeCmdMsg("Success: 06 returned.")
                         result = True
@@ -3985,9 +6416,7 @@ class V4Meter(Meter):
                         append_val = str(0).zfill(2).encode().hex()
                         req_table += append_val
 
-                    req_str = "015731023030443228" + req_table + "2903"
-                    req_str += self.calc_crc16(a2b_hex(req_str[2:]))
-                    self.m_serial_port.write(a2b_hex(req_str))
+                    self.m_serial_port.write(self.m_encoder.writeCommand("00D2", a2b_hex(req_table)))
                     if self.m_serial_port.getResponse(self.getContext()) == "06":
                         self.writeCmdMsg("Success: 06 returned.")
                         result = True
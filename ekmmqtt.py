@@ -0,0 +1,196 @@
+""" ekmmqtt.py
+
+Long lived MQTT publisher for ReadEKM.
+
+paho.mqtt.publish.single() connects, handshakes, publishes and disconnects
+on every call, on the caller's thread.  MqttPublisher keeps one client
+connected instead, with paho's network loop in its own thread, so a
+publish only hands the message over.  Lost connections are retried by the
+network loop with exponential backoff.  Messages published while the
+broker is unreachable wait in a bounded queue (oldest dropped first) and
+are sent when the connection comes back.
+
+This software is provided under an MIT license:
+    https://opensource.org/licenses/MIT
+"""
+import threading
+from collections import deque
+
+import paho.mqtt.client as mqtt
+
+from ekmmeters import ekm_log
+
+
+def new_client(client_id):
+    """ paho client for paho 1.x and 2.x.
+
+    The callbacks below take the extra 2.x arguments as *args.
+
+    Args:
+        client_id (str): MQTT client id, empty for a broker assigned one.
+
+    Returns:
+        paho.mqtt.client.Client: Unconnected client.
+    """
+    if hasattr(mqtt, "CallbackAPIVersion"):
+        return mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, client_id=client_id)
+    return mqtt.Client(client_id=client_id)
+
+
+class MqttPublisher(object):
+    """ One persistent MQTT connection with a bounded outgoing queue.
+
+    Use as a context manager, or call start() and stop().
+    """
+
+    def __init__(self, host, port=1883, client_id="", keepalive=60, queue_size=1000,
+                 min_delay=1, max_delay=120):
+        """
+        Args:
+            host (str): Broker host name.
+            port (int): Broker port.
+            client_id (str): MQTT client id, empty for a broker assigned one.
+            keepalive (int): Seconds between keepalive pings.
+            queue_size (int): Messages held while disconnected.
+            min_delay (int): First reconnect delay in seconds.
+            max_delay (int): Longest reconnect delay in seconds.
+        """
+        self.m_host = host
+        self.m_port = port
+        self.m_keepalive = keepalive
+        self.m_pending = deque(maxlen=queue_size)
+        self.m_lock = threading.Lock()
+        self.m_connected = False
+        self.m_started = False
+        self.m_published = 0
+        self.m_queued = 0
+        self.m_dropped = 0
+        self.m_connects = 0
+        self.m_disconnects = 0
+        self.m_client = new_client(client_id)
+        self.m_client.reconnect_delay_set(min_delay, max_delay)
+        self.m_client.on_connect = self.onConnect
+        self.m_client.on_disconnect = self.onDisconnect
+        pass
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.stop()
+
+    def start(self):
+        """ Start the network loop thread and connect in the background. """
+        if self.m_started:
+            return
+        self.m_started = True
+        self.m_client.connect_async(self.m_host, self.m_port, self.m_keepalive)
+        self.m_client.loop_start()
+
+    def stop(self):
+        """ Send what is already handed to paho, disconnect, stop the loop. """
+        if not self.m_started:
+            return
+        self.m_started = False
+        self.m_client.disconnect()
+        self.m_client.loop_stop()
+        with self.m_lock:
+            self.m_connected = False
+
+    def isConnected(self):
+        """ True while the broker connection is up.
+
+        Returns:
+            bool: Connection state as last reported by the network loop.
+        """
+        return self.m_connected
+
+    def publish(self, topic, payload, qos=0, retain=False):
+        """ Hand a message to the network loop, or queue it if disconnected.
+
+        Does not wait for the broker.
+
+        Args:
+            topic (str): MQTT topic.
+            payload (str): Message body.
+            qos (int): MQTT quality of service.
+            retain (bool): Broker retain flag.
+
+        Returns:
+            bool: True if handed to the client, False if queued.
+        """
+        message = (topic, payload, qos, retain)
+        with self.m_lock:
+            if self.m_connected and not self.m_pending:
+                if self.sendLocked(message):
+                    return True
+            self.queueLocked(message)
+            return False
+
+    def sendLocked(self, message):
+        """ Pass one message to paho; caller holds m_lock.
+
+        Args:
+            message (tuple): (topic, payload, qos, retain)
+
+        Returns:
+            bool: True if paho accepted it.
+        """
+        topic, payload, qos, retain = message
+        info = self.m_client.publish(topic, payload, qos, retain)
+        if info.rc != mqtt.MQTT_ERR_SUCCESS:
+            return False
+        self.m_published += 1
+        return True
+
+    def queueLocked(self, message):
+        """ Hold one message until reconnected; caller holds m_lock.
+
+        Args:
+            message (tuple): (topic, payload, qos, retain)
+        """
+        if len(self.m_pending) == self.m_pending.maxlen:
+            self.m_dropped += 1
+        self.m_pending.append(message)
+        self.m_queued += 1
+
+    def onConnect(self, client, userdata, flags, rc, *args):
+        """ paho callback, network thread.  Sends the queued messages. """
+        if rc != 0:
+            ekm_log("MQTT connect to %s:%d refused: %s" % (self.m_host, self.m_port, rc))
+            return
+        with self.m_lock:
+            self.m_connected = True
+            self.m_connects += 1
+            while self.m_pending:
+                if not self.sendLocked(self.m_pending[0]):
+                    break
+                self.m_pending.popleft()
+        if self.m_connects > 1:
+            ekm_log("MQTT reconnected to %s:%d" % (self.m_host, self.m_port))
+
+    def onDisconnect(self, client, userdata, *args):
+        """ paho callback, network thread.  paho reconnects after this. """
+        with self.m_lock:
+            was_connected = self.m_connected
+            self.m_connected = False
+        if was_connected and self.m_started:
+            self.m_disconnects += 1
+            ekm_log("MQTT connection to %s:%d lost, reconnecting" % (self.m_host, self.m_port))
+
+    def getStats(self):
+        """ Publish counters.
+
+        Returns:
+            dict: published, queued, dropped, pending, connects, disconnects
+            and connected.
+        """
+        with self.m_lock:
+            return {"published": self.m_published,
+                    "queued": self.m_queued,
+                    "dropped": self.m_dropped,
+                    "pending": len(self.m_pending),
+                    "connects": self.m_connects,
+                    "disconnects": self.m_disconnects,
+                    "connected": self.m_connected}
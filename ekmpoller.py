@@ -0,0 +1,499 @@
+""" ekmpoller.py
+
+Poll many EKM Omnimeters sharing one serial port (RS-485 bus).
+
+Meters are addressed by their 12 digit id, so one SerialPort can serve a
+whole line of meters.  BusPoller keeps one Meter object per address and,
+once per interval, walks the meters which are due: each gets one session
+(open, password and termination string once) holding its A read, or its
+combined A and B read when B is due, plus any commands queued for it.
+Meters with the same B ratio get staggered offsets so their B reads are
+spread over the B period instead of all landing on the same interval.
+
+Bus utilization (time spent in meter exchanges per interval) is measured
+for every poll.
+
+PortSupervisor runs one BusPoller per serial port, each in its own worker
+thread.  Serial waits release the GIL, so polls of separate ports overlap
+almost completely.  Workers hand immutable MeterReading snapshots back to
+the supervisor's caller, so one database writer and one MQTT publisher
+serve every port.
+
+This software is provided under an MIT license:
+    https://opensource.org/licenses/MIT
+"""
+import queue
+import sys
+import threading
+import time
+import traceback
+from collections import namedtuple
+
+from ekmmeters import SerialPort, V3Meter, V4Meter, ekm_log
+from ekmschedule import IntervalScheduler
+
+# One meter's part of a poll.
+#   meter_id:  12 character meter address.
+#   meter:     Meter object, see BusPoller.getMeter().
+#   ok:        True if the read CRC checked.
+#   read_b:    True if B was read (V4 only).
+#   ms:        Milliseconds the meter held the bus.
+PollResult = namedtuple("PollResult", ("meter_id", "meter", "ok", "read_b", "ms"))
+
+# One meter's part of a supervised poll, safe to hand between threads.
+#   port_name: Serial port the meter is on.
+#   meter_id:  12 character meter address.
+#   reading:   MeterReading snapshot of the read (A, or A and B).
+#   ok:        True if the read CRC checked.
+#   read_b:    True if B was read.
+PortReading = namedtuple("PortReading", ("port_name", "meter_id", "reading", "ok", "read_b"))
+
+
+def meter_address(meter_id):
+    """ 12 character address for a numeric or string meter id.
+
+    Args:
+        meter_id (int): Meter id, int or numeric string.
+
+    Returns:
+        str: Zero padded 12 character address.
+    """
+    return '%012d' % int(meter_id)
+
+
+def make_meter(meter_id, serial_port):
+    """ V3Meter or V4Meter object for a meter id.
+
+    Ids below 300000000 are V3 meters, as in ReadEKM.
+
+    Args:
+        meter_id (int): Meter id, int or numeric string.
+        serial_port (SerialPort): Shared port.
+
+    Returns:
+        Meter: Meter object attached to serial_port.
+    """
+    if int(meter_id) < 300000000:
+        return V3Meter(meter_address(meter_id), serial_port)
+    return V4Meter(meter_address(meter_id), serial_port)
+
+
+class PolledMeter(object):
+    """ A meter on the bus and its read schedule.
+
+    Schedules count poll intervals: the meter is read on intervals where
+    (interval + offset) % a_every == 0, and B is read with the A read on
+    intervals where (interval + offset) % b_every == 0.
+    """
+
+    def __init__(self, meter, a_every=1, b_every=0, offset=0, cycle_commands=None):
+        """
+        Args:
+            meter (Meter): Meter object.
+            a_every (int): Read every a_every intervals.
+            b_every (int): Also read B every b_every intervals, 0 for never.
+            offset (int): Schedule offset in intervals.
+            cycle_commands (function): Optional cycle_commands(meter, read_b)
+                run inside the meter's session after every read.
+        """
+        self.m_meter = meter
+        self.m_a_every = max(int(a_every), 1)
+        self.m_b_every = max(int(b_every), 0)
+        self.m_offset = int(offset)
+        self.m_cycle_commands = cycle_commands
+        self.m_queued = []
+        self.m_reads = 0
+        self.m_failures = 0
+        self.m_busy_sec = 0.0
+        pass
+
+    def isDue(self, interval):
+        """ Returns:
+            bool: True if the meter is read on this interval.
+        """
+        return (interval + self.m_offset) % self.m_a_every == 0
+
+    def isBDue(self, interval):
+        """ Returns:
+            bool: True if B is read with A on this interval (V4 only).
+        """
+        if self.m_b_every == 0 or not isinstance(self.m_meter, V4Meter):
+            return False
+        return (interval + self.m_offset) % self.m_b_every == 0
+
+
+class BusPoller(object):
+    """ Interleaves reads and commands for many meters on one port. """
+
+    def __init__(self, serial_port, interval_sec=60):
+        """
+        Args:
+            serial_port (SerialPort): Shared, already open, port.
+            interval_sec (float): Poll interval; schedules count these.
+        """
+        self.m_serial_port = serial_port
+        self.m_interval_sec = interval_sec
+        self.m_polled = []
+        self.m_by_address = {}
+        self.m_last_busy_sec = 0.0
+        self.m_total_busy_sec = 0.0
+        self.m_polls = 0
+        pass
+
+    def addMeter(self, meter, a_every=1, b_every=0, offset=None, cycle_commands=None):
+        """ Put a meter object on the poll list.
+
+        Args:
+            meter (Meter): Meter object attached to the poller's port.
+            a_every (int): Read every a_every intervals.
+            b_every (int): Also read B every b_every intervals, 0 for never.
+            offset (int): Schedule offset, default staggered by position.
+            cycle_commands (function): Optional cycle_commands(meter, read_b)
+                run inside the meter's session after every read.
+
+        Returns:
+            PolledMeter: Schedule entry.
+        """
+        if offset is None:
+            offset = len(self.m_polled)
+        polled = PolledMeter(meter, a_every, b_every, offset, cycle_commands)
+        self.m_polled.append(polled)
+        self.m_by_address[meter.getMeterAddress()] = polled
+        return polled
+
+    def addMeterId(self, meter_id, a_every=1, b_every=0, offset=None, cycle_commands=None):
+        """ Create a V3 or V4 meter object for an id and poll it.
+
+        V4 meters are put in lazy decode mode.
+
+        Args:
+            meter_id (int): Meter id, int or numeric string.
+            a_every (int): Read every a_every intervals.
+            b_every (int): Also read B every b_every intervals, 0 for never.
+            offset (int): Schedule offset, default staggered by position.
+            cycle_commands (function): See addMeter().
+
+        Returns:
+            Meter: New meter object.
+        """
+        meter = make_meter(meter_id, self.m_serial_port)
+        if isinstance(meter, V4Meter):
+            meter.setLazyDecode(True)
+        self.addMeter(meter, a_every, b_every, offset, cycle_commands)
+        return meter
+
+    def getMeter(self, meter_id):
+        """ Meter object for a polled meter id.
+
+        Args:
+            meter_id (int): Meter id, int or numeric string.
+
+        Returns:
+            Meter: Meter object, None if not polled.
+        """
+        polled = self.m_by_address.get(meter_address(meter_id))
+        return polled.m_meter if polled is not None else None
+
+    def getMeters(self):
+        """ Returns:
+            list: Polled meter objects in poll order.
+        """
+        return [polled.m_meter for polled in self.m_polled]
+
+    def queueCommand(self, meter_id, command, *args):
+        """ Run a meter command inside the meter's next poll session.
+
+        Example: poller.queueCommand(id, V4Meter.setRelay, 0, Relay.Relay1, RelayState.RelayOpen)
+
+        Args:
+            meter_id (int): Meter id, int or numeric string.
+            command (function): Unbound Meter method, called as command(meter, *args).
+            args: Command arguments.
+        """
+        self.m_by_address[meter_address(meter_id)].m_queued.append((command, args))
+
+    def currentInterval(self, now=None):
+        """ Wall clock interval number, so schedules line up with the clock.
+
+        Args:
+            now (float): Epoch seconds, default time.time().
+
+        Returns:
+            int: Intervals since the epoch.
+        """
+        if now is None:
+            now = time.time()
+        return int(now // self.m_interval_sec)
+
+    def pollMeter(self, polled, interval):
+        """ One meter's session: read, cycle commands and queued commands.
+
+        Args:
+            polled (PolledMeter): Schedule entry.
+            interval (int): Interval number.
+
+        Returns:
+            PollResult: Outcome.
+        """
+        meter = polled.m_meter
+        read_b = polled.isBDue(interval)
+        if isinstance(meter, V4Meter):
+            open_read = meter.request if read_b else meter.openRead
+        else:
+            open_read = meter.request
+        ok = False
+        start = time.time()
+        try:
+            with meter.session(open_read=open_read) as session:
+                ok = session.isOpen()
+                if polled.m_cycle_commands is not None:
+                    polled.m_cycle_commands(meter, read_b)
+                queued, polled.m_queued = polled.m_queued, []
+                for command, args in queued:
+                    command(meter, *args)
+        except:
+            ekm_log(traceback.format_exc(sys.exc_info()))
+        busy_sec = time.time() - start
+        polled.m_reads += 1
+        polled.m_busy_sec += busy_sec
+        if not ok:
+            polled.m_failures += 1
+        return PollResult(meter.getMeterAddress(), meter, ok, read_b and ok, busy_sec * 1000.0)
+
+    def pollOnce(self, interval=None):
+        """ Read every meter due on an interval, one after the other.
+
+        Args:
+            interval (int): Interval number, default the current wall clock interval.
+
+        Returns:
+            list: PollResult per meter read, in poll order.
+        """
+        if interval is None:
+            interval = self.currentInterval()
+        results = []
+        start = time.time()
+        for polled in self.m_polled:
+            if polled.isDue(interval):
+                results.append(self.pollMeter(polled, interval))
+        self.m_last_busy_sec = time.time() - start
+        self.m_total_busy_sec += self.m_last_busy_sec
+        self.m_polls += 1
+        return results
+
+    def getUtilization(self):
+        """ Bus utilization of the last poll and on average.
+
+        Returns:
+            dict: "busy_ms" and "utilization" of the last poll, "mean_utilization"
+            over all polls, and per meter address "reads", "failures" and mean "ms".
+        """
+        interval_sec = float(self.m_interval_sec)
+        meters = {}
+        for polled in self.m_polled:
+            meters[polled.m_meter.getMeterAddress()] = {
+                "reads": polled.m_reads,
+                "failures": polled.m_failures,
+                "ms": polled.m_busy_sec * 1000.0 / polled.m_reads if polled.m_reads else 0.0}
+        return {"busy_ms": self.m_last_busy_sec * 1000.0,
+                "utilization": self.m_last_busy_sec / interval_sec,
+                "mean_utilization": self.m_total_busy_sec / (self.m_polls * interval_sec) if self.m_polls else 0.0,
+                "meters": meters}
+
+    def run(self, count=0, on_results=None, scheduler=None):
+        """ Poll at the top of every interval.
+
+        Args:
+            count (int): Number of polls, 0 for forever.
+            on_results (function): Optional on_results(results) after every poll;
+                return True to stop.
+            scheduler (IntervalScheduler): Deadlines to poll at; default one
+                skipping intervals missed by an overrun.
+        """
+        if scheduler is None:
+            scheduler = IntervalScheduler(self.m_interval_sec)
+        polls = 0
+        while count == 0 or polls < count:
+            tick = scheduler.wait()
+            results = self.pollOnce(tick.interval)
+            polls += 1
+            utilization = self.getUtilization()
+            ekm_log("Bus poll: %d meters, %.0f ms busy, %.1f%% utilization" %
+                    (len(results), utilization["busy_ms"], utilization["utilization"] * 100.0))
+            if on_results is not None and on_results(results):
+                break
+
+
+class PortWorker(threading.Thread):
+    """ Thread owning one serial port and its BusPoller.
+
+    Polls on request from :class:`~ekmpoller.PortSupervisor`: every interval
+    number put in m_requests is polled and the readings are put in the
+    supervisor's output queue.
+    """
+
+    def __init__(self, serial_port, poller, output):
+        """
+        Args:
+            serial_port (SerialPort): Port, opened by the worker.
+            poller (BusPoller): Poller for the port's meters.
+            output (queue.Queue): Where PortReading lists go.
+        """
+        threading.Thread.__init__(self, name="PortWorker " + serial_port.getName())
+        self.daemon = True
+        self.m_serial_port = serial_port
+        self.m_poller = poller
+        self.m_output = output
+        self.m_requests = queue.Queue()
+        pass
+
+    def run(self):
+        if not self.m_serial_port.initPort():
+            ekm_log("PortWorker: cannot open " + self.m_serial_port.getName())
+        try:
+            while True:
+                interval = self.m_requests.get()
+                if interval is None:
+                    self.m_requests.task_done()
+                    break
+                readings = []
+                try:
+                    for result in self.m_poller.pollOnce(interval):
+                        readings.append(PortReading(self.m_serial_port.getName(), result.meter_id,
+                                                    result.meter.getReading(), result.ok, result.read_b))
+                except:
+                    ekm_log(traceback.format_exc(sys.exc_info()))
+                self.m_output.put(readings)
+                self.m_requests.task_done()
+        finally:
+            self.m_serial_port.closePort()
+
+
+class PortSupervisor(object):
+    """ Polls several serial ports in parallel, one worker thread per port.
+
+    Results come back on the calling thread, which is the single place to
+    write them to the database or publish them.
+    """
+
+    def __init__(self, interval_sec=60):
+        """
+        Args:
+            interval_sec (float): Poll interval; schedules count these.
+        """
+        self.m_interval_sec = interval_sec
+        self.m_workers = []
+        self.m_output = queue.Queue()
+        self.m_pending = 0
+        self.m_poll_start = 0.0
+        self.m_last_poll_sec = 0.0
+        pass
+
+    def addPort(self, port_name, meter_ids, a_every=1, b_every=0):
+        """ Add a serial port and the meters on it.
+
+        Args:
+            port_name (str): Port name, ex '/dev/ttyUSB1', 'socket://host:port'.
+            meter_ids (list): Meter ids on the port.
+            a_every (int): Read every a_every intervals.
+            b_every (int): Also read B every b_every intervals, 0 for never.
+
+        Returns:
+            BusPoller: The port's poller, e.g. to queue commands.
+        """
+        serial_port = SerialPort(port_name)
+        poller = BusPoller(serial_port, self.m_interval_sec)
+        for meter_id in meter_ids:
+            poller.addMeterId(meter_id, a_every, b_every)
+        self.m_workers.append(PortWorker(serial_port, poller, self.m_output))
+        return poller
+
+    def getPollers(self):
+        """ Returns:
+            list: BusPoller per port, in the order added.
+        """
+        return [worker.m_poller for worker in self.m_workers]
+
+    def start(self):
+        """ Start the worker threads; each opens its port. """
+        for worker in self.m_workers:
+            worker.start()
+
+    def stop(self):
+        """ Stop the workers after any poll in progress and close the ports. """
+        for worker in self.m_workers:
+            worker.m_requests.put(None)
+        for worker in self.m_workers:
+            worker.join()
+
+    def startPoll(self, interval=None):
+        """ Ask every worker to poll an interval; returns at once.
+
+        Args:
+            interval (int): Interval number, default the current wall clock interval.
+        """
+        if interval is None:
+            interval = int(time.time() // self.m_interval_sec)
+        self.m_poll_start = time.time()
+        for worker in self.m_workers:
+            worker.m_requests.put(interval)
+            self.m_pending += 1
+
+    def waitPoll(self):
+        """ Wait for the polls started by startPoll().
+
+        Returns:
+            list: PortReading per meter read, grouped by port.
+        """
+        readings = []
+        while self.m_pending > 0:
+            readings.extend(self.m_output.get())
+            self.m_pending -= 1
+        self.m_last_poll_sec = time.time() - self.m_poll_start
+        return readings
+
+    def pollAll(self, interval=None):
+        """ Poll every port in parallel and wait for all of them.
+
+        Args:
+            interval (int): Interval number, default the current wall clock interval.
+
+        Returns:
+            list: PortReading per meter read.
+        """
+        self.startPoll(interval)
+        return self.waitPoll()
+
+    def getUtilization(self):
+        """ Bus utilization of every port.
+
+        Returns:
+            dict: "poll_ms" of the last parallel poll, and per port name the
+            :func:`~ekmpoller.BusPoller.getUtilization` dict.
+        """
+        ports = {}
+        for worker in self.m_workers:
+            ports[worker.m_serial_port.getName()] = worker.m_poller.getUtilization()
+        return {"poll_ms": self.m_last_poll_sec * 1000.0, "ports": ports}
+
+    def run(self, count=0, on_readings=None, scheduler=None):
+        """ Poll all ports at the top of every interval.
+
+        Args:
+            count (int): Number of polls, 0 for forever.
+            on_readings (function): Optional on_readings(readings) after every
+                poll, on this thread; return True to stop.
+            scheduler (IntervalScheduler): Deadlines to poll at; default one
+                skipping intervals missed by an overrun.
+        """
+        if scheduler is None:
+            scheduler = IntervalScheduler(self.m_interval_sec)
+        polls = 0
+        while count == 0 or polls < count:
+            tick = scheduler.wait()
+            readings = self.pollAll(tick.interval)
+            polls += 1
+            ekm_log("Supervised poll: %d ports, %d meters, %.0f ms" %
+                    (len(self.m_workers), len(readings), self.m_last_poll_sec * 1000.0))
+            if on_readings is not None and on_readings(readings):
+                break
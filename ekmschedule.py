@@ -0,0 +1,195 @@
+""" ekmschedule.py
+
+Drift free interval scheduling for meter polling loops.
+
+Sleeping "interval - time.time() % interval" after each cycle follows the
+wall clock, so an NTP step or a suspend skips or doubles reads, and the
+sleep only starts after the cycle's serial, database and MQTT work.
+IntervalScheduler keeps its deadlines on the monotonic clock instead,
+aligned once to wall clock boundaries (the top of the minute for a 60 s
+interval).  Each wait() returns a Tick naming the wall clock interval it
+belongs to, so interval based schedules such as BusPoller's B reads stay
+put even when a tick runs late.
+
+A wait() which finds its deadline already passed is an overrun.  Within
+the late tolerance the tick runs at once.  Beyond it, OverrunPolicy.Skip
+drops the missed intervals and waits for the next boundary, while
+OverrunPolicy.CatchUp runs up to max_catch_up of the most recent missed
+intervals back to back; older ones are skipped on every wait(), so cycles
+which always overrun stay at most max_catch_up intervals behind.  When the
+wall clock steps against the monotonic clock the deadlines are realigned.
+Wake up lateness (jitter), overruns, skipped intervals and clock steps are
+counted, see getStats().
+
+This software is provided under an MIT license:
+    https://opensource.org/licenses/MIT
+"""
+import math
+import time
+from collections import namedtuple
+
+from ekmmeters import LatencyHistogram, ekm_log
+
+# One scheduled run.
+#   interval:  Wall clock interval number, int(wall_time // interval_sec).
+#   wall_time: Epoch seconds of the interval's boundary.
+#   late_sec:  Seconds between the deadline and the return from wait().
+#   skipped:   Intervals dropped before this one (OverrunPolicy.Skip).
+#   catch_up:  True if run late to make up a missed interval.
+Tick = namedtuple("Tick", ("interval", "wall_time", "late_sec", "skipped", "catch_up"))
+
+
+class OverrunPolicy():
+    """ What IntervalScheduler does with intervals missed by an overrun. """
+    Skip = "skip"
+    CatchUp = "catch_up"
+
+
+class IntervalScheduler(object):
+    """ Monotonic deadlines every interval_sec, aligned to wall clock boundaries. """
+
+    def __init__(self, interval_sec=60, offset_sec=0.0, policy=OverrunPolicy.Skip,
+                 late_tolerance_sec=None, max_catch_up=3, step_tolerance_sec=2.0, max_sleep_sec=5.0):
+        """
+        Args:
+            interval_sec (float): Seconds between deadlines.
+            offset_sec (float): Deadlines fall offset_sec after each wall clock boundary.
+            policy (str): :class:`~ekmschedule.OverrunPolicy` value.
+            late_tolerance_sec (float): A tick this late still runs at once;
+                default a quarter interval.
+            max_catch_up (int): Most missed intervals run by OverrunPolicy.CatchUp.
+            step_tolerance_sec (float): Wall against monotonic clock change
+                treated as a clock step.
+            max_sleep_sec (float): Longest single sleep, so clock steps are seen
+                during a wait.
+        """
+        self.m_interval_sec = float(interval_sec)
+        self.m_offset_sec = float(offset_sec)
+        self.m_policy = policy
+        if late_tolerance_sec is None:
+            late_tolerance_sec = self.m_interval_sec / 4.0
+        self.m_late_tolerance_sec = late_tolerance_sec
+        self.m_max_catch_up = max_catch_up
+        self.m_step_tolerance_sec = step_tolerance_sec
+        self.m_max_sleep_sec = max_sleep_sec
+        self.m_interval = None
+        self.m_deadline = None
+        self.m_wall_offset = None
+        self.m_catching_up = False
+        self.m_jitter = LatencyHistogram()
+        self.m_ticks = 0
+        self.m_late = 0
+        self.m_overruns = 0
+        self.m_skipped = 0
+        self.m_caught_up = 0
+        self.m_clock_steps = 0
+        pass
+
+    def wallTime(self, interval):
+        """ Wall clock time of an interval boundary.
+
+        Args:
+            interval (int): Interval number.
+
+        Returns:
+            float: Epoch seconds.
+        """
+        return interval * self.m_interval_sec + self.m_offset_sec
+
+    def anchor(self):
+        """ Make the next wall clock boundary the next deadline. """
+        mono = time.monotonic()
+        wall = time.time()
+        self.m_wall_offset = wall - mono
+        self.m_interval = int(math.floor((wall - self.m_offset_sec) / self.m_interval_sec)) + 1
+        self.m_deadline = self.wallTime(self.m_interval) - self.m_wall_offset
+        self.m_catching_up = False
+
+    def checkClock(self):
+        """ Realign the deadlines if the wall clock stepped.
+
+        A forward step (or a suspend) leaves the pending deadline in the past,
+        where the overrun policy deals with it.  A backward step of more than
+        an interval restarts at the next boundary of the new wall clock.
+
+        Returns:
+            bool: True if the wall clock had stepped.
+        """
+        step = (time.time() - time.monotonic()) - self.m_wall_offset
+        if abs(step) <= self.m_step_tolerance_sec:
+            return False
+        self.m_clock_steps += 1
+        ekm_log("Scheduler: wall clock stepped %+.1f s, realigning deadlines" % step)
+        self.m_wall_offset += step
+        if -step > self.m_interval_sec:
+            self.anchor()
+        else:
+            self.m_deadline = self.wallTime(self.m_interval) - self.m_wall_offset
+        return True
+
+    def wait(self):
+        """ Sleep until the next deadline.
+
+        Returns:
+            Tick: The interval to run now.
+        """
+        if self.m_deadline is None:
+            self.anchor()
+        self.checkClock()
+        skipped = 0
+        catch_up = False
+        late = time.monotonic() - self.m_deadline
+        if late > self.m_late_tolerance_sec or (self.m_catching_up and late > 0):
+            missed = int(late // self.m_interval_sec) + 1
+            if not self.m_catching_up:
+                self.m_overruns += 1
+            if self.m_policy == OverrunPolicy.CatchUp and self.m_max_catch_up > 0:
+                if missed > self.m_max_catch_up:
+                    skipped = missed - self.m_max_catch_up
+                catch_up = True
+                self.m_catching_up = True
+            else:
+                skipped = missed
+            if skipped:
+                self.m_deadline += skipped * self.m_interval_sec
+                self.m_interval += skipped
+                self.m_skipped += skipped
+                ekm_log("Scheduler: overrun by %.1f s, skipped %d interval(s)" % (late, skipped))
+        else:
+            self.m_catching_up = False
+
+        while True:
+            remaining = self.m_deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(remaining, self.m_max_sleep_sec))
+            if self.checkClock() and self.m_deadline - time.monotonic() < -self.m_late_tolerance_sec:
+                return self.wait()
+
+        late_sec = time.monotonic() - self.m_deadline
+        tick = Tick(self.m_interval, self.wallTime(self.m_interval), late_sec, skipped, catch_up)
+        self.m_ticks += 1
+        if catch_up:
+            self.m_caught_up += 1
+        elif late_sec > self.m_late_tolerance_sec:
+            self.m_late += 1
+        if not catch_up:
+            self.m_jitter.add(max(late_sec, 0.0))
+        self.m_deadline += self.m_interval_sec
+        self.m_interval += 1
+        return tick
+
+    def getStats(self):
+        """ Scheduling counters and wake up jitter.
+
+        Returns:
+            dict: ticks, late, overruns, skipped, caught_up, clock_steps and
+            jitter (:func:`~ekmmeters.LatencyHistogram.getStats`).
+        """
+        return {"ticks": self.m_ticks,
+                "late": self.m_late,
+                "overruns": self.m_overruns,
+                "skipped": self.m_skipped,
+                "caught_up": self.m_caught_up,
+                "clock_steps": self.m_clock_steps,
+                "jitter": self.m_jitter.getStats()}
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+
+"""  Check ekmmqtt.MqttPublisher against a local stand-in broker.
+
+The broker speaks just enough MQTT 3.1.1 for QoS 0 publishing:  CONNECT is
+answered with CONNACK, PINGREQ with PINGRESP, and PUBLISH payloads are recorded.
+Checks the bounded queue while there is no broker, the flush on the first
+connect, and the flush after the broker drops the connection.
+"""
+
+import socket
+import threading
+import socketserver
+import time
+from ekmmqtt import MqttPublisher
+from ekmmeters import ekm_set_log, ekm_print_log
+
+CONNECT = 1
+PUBLISH = 3
+PINGREQ = 12
+DISCONNECT = 14
+CONNACK = b'\x20\x02\x00\x00'
+PINGRESP = b'\xd0\x00'
+
+class MqttBrokerHandler(socketserver.BaseRequestHandler):
+
+    def recvExactly(self, count):
+        data = b''
+        while len(data) < count:
+            chunk = self.request.recv(count - len(data))
+            if len(chunk) == 0:
+                raise EOFError
+            data += chunk
+        return data
+
+    def handle(self):
+        if self.server.down:
+            return
+        self.server.connections.append(self.request)
+        try:
+            while True:
+                packetType = self.recvExactly(1)[0] >> 4
+                length = 0
+                multiplier = 1
+                while True:
+                    digit = self.recvExactly(1)[0]
+                    length += (digit & 127) * multiplier
+                    multiplier *= 128
+                    if not digit & 128:
+                        break
+                body = self.recvExactly(length) if length else b''
+                if packetType == CONNECT:
+                    self.request.sendall(CONNACK)
+                elif packetType == PUBLISH:
+                    topicLength = (body[0] << 8) | body[1]
+                    topic = body[2:2 + topicLength].decode('utf-8')
+                    self.server.messages.append((topic, body[2 + topicLength:].decode('utf-8')))
+                elif packetType == PINGREQ:
+                    self.request.sendall(PINGRESP)
+                elif packetType == DISCONNECT:
+                    break
+        except (EOFError, OSError):
+            pass
+
+
+class MqttBroker(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address):
+        self.messages = []
+        self.connections = []
+        self.down = False
+        super().__init__(address, MqttBrokerHandler)
+
+    def dropConnections(self):
+        '''  Close every client connection, as a broker restart would.  Connections
+             are refused until down is cleared.  '''
+        self.down = True
+        for conn in self.connections:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self.connections = []
+
+
+def waitFor(condition, timeout=10):
+    start = time.time()
+    while not condition():
+        if time.time() - start > timeout:
+            return False
+        time.sleep(0.05)
+    return True
+
+def payloads(broker):
+    return [payload for topic, payload in broker.messages]
+
+
+if __name__ == "__main__":
+    ekm_set_log(ekm_print_log)
+    HOST = "127.0.0.1"
+    #  Find a free port, and publish to it before any broker is listening there.
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((HOST, 0))
+        PORT = sock.getsockname()[1]
+
+    publisher = MqttPublisher(HOST, PORT, client_id='testMqtt', queue_size=5, min_delay=1, max_delay=2)
+    publisher.start()
+    for i in range(8):
+        assert not publisher.publish('Testing/Meter', 'early%d'%i)
+    stats = publisher.getStats()
+    print('No broker: %s'%stats)
+    assert stats['queued'] == 8 and stats['dropped'] == 3 and stats['pending'] == 5
+    assert stats['published'] == 0 and not stats['connected']
+
+    broker = MqttBroker((HOST, PORT))
+    server_thread = threading.Thread(target=broker.serve_forever, daemon=True)
+    server_thread.start()
+    with broker:
+        #  First connect sends the queued messages, oldest dropped, in order.
+        assert waitFor(publisher.isConnected), 'Never connected to the stand-in broker.'
+        assert waitFor(lambda: len(broker.messages) >= 5)
+        print('Connected: %s'%publisher.getStats())
+        assert payloads(broker) == ['early%d'%i for i in range(3, 8)]
+        assert publisher.getStats()['pending'] == 0
+
+        count = 2000
+        start = time.perf_counter()
+        for i in range(count):
+            publisher.publish('Testing/Meter', '{"n": %d}'%i)
+        print('Publish takes %.1f us.'%((time.perf_counter() - start) / count * 1e6))
+        assert waitFor(lambda: len(broker.messages) >= 5 + count)
+
+        #  Messages published while the broker is away go out after the reconnect.
+        broker.dropConnections()
+        assert waitFor(lambda: not publisher.isConnected())
+        for i in range(3):
+            assert not publisher.publish('Testing/Meter', 'down%d'%i)
+        assert publisher.getStats()['pending'] == 3
+        broker.down = False
+        assert waitFor(publisher.isConnected), 'Never reconnected to the stand-in broker.'
+        assert waitFor(lambda: len(broker.messages) >= 5 + count + 3)
+        stats = publisher.getStats()
+        print('Reconnected: %s'%stats)
+        assert payloads(broker)[-3:] == ['down0', 'down1', 'down2']
+        assert stats['pending'] == 0 and stats['connects'] == 2 and stats['disconnects'] == 1
+        assert stats['published'] == 5 + count + 3 and stats['dropped'] == 3
+
+        publisher.stop()
+        broker.shutdown()
+    print('MqttPublisher checks passed.')